@@ -0,0 +1,478 @@
+"""
+Saved alert rules evaluated against snapshot diffs
+Rules use the /api/vehicles filter vocabulary, e.g.
+    {"name": "cheap NJ fronts", "state": "NJ", "damage": "FRONT END",
+     "year_min": 2021, "odometer_max": 60000, "bid_max": 3000}
+Every published snapshot checks only the lots it added or updated, and only against the
+rules whose state/damage/title could match them, so the cost follows churn rather than
+inventory x rules. New (rule, lot) matches are queued in an outbox that a background
+thread POSTs to ALERT_WEBHOOK_URL in batches, and each pair is delivered once.
+
+Local stand-in receiver for testing:  python alerts.py receive --port 8765
+"""
+import os
+import sys
+import json
+import time
+import sqlite3
+import threading
+
+import requests
+
+from vehicle_index import HASH_FIELDS, vehicle_filter
+from vehicle_fields import normalize_label
+
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'alerts.db')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rules (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    spec TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS delivered (
+    rule_id INTEGER NOT NULL,
+    lot_number TEXT NOT NULL,
+    matched_at REAL NOT NULL,
+    PRIMARY KEY (rule_id, lot_number)
+);
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    claimed_at REAL,
+    last_error TEXT
+);
+"""
+
+# Rule keys: exact-match fields (one value or a list) and min/max ranges (inclusive)
+MATCH_FIELDS = ('state', 'damage', 'title')
+RANGE_FIELDS = ('year', 'odometer', 'bid')
+
+
+def _values(raw):
+    """Normalized set of a rule's match values ("NJ", "NJ,NY" or ["NJ", "NY"])"""
+    if isinstance(raw, str):
+        raw = raw.split(',')
+    values = {normalize_label(value) for value in raw or []}
+    values.discard(None)
+    return values
+
+
+class Rule:
+    """A saved rule compiled into a predicate over one vehicle"""
+
+    def __init__(self, rule_id, spec):
+        unknown = set(spec) - {'name'} - set(MATCH_FIELDS) - {f"{field}_{bound}" for field in RANGE_FIELDS
+                                                             for bound in ('min', 'max')}
+        if unknown:
+            raise ValueError(f"Unknown rule fields: {', '.join(sorted(unknown))}")
+        self.id = rule_id
+        self.name = str(spec.get('name') or f"rule {rule_id}")
+        self.spec = spec
+
+        self.match = {}  # field -> allowed normalized values
+        for field in MATCH_FIELDS:
+            if spec.get(field):
+                self.match[field] = _values(spec[field])
+                if not self.match[field]:
+                    raise ValueError(f"Rule field '{field}' has no usable values")
+
+        self.ranges = []  # (field, low, high)
+        for field in RANGE_FIELDS:
+            low, high = spec.get(f"{field}_min"), spec.get(f"{field}_max")
+            if low is None and high is None:
+                continue
+            try:
+                low = None if low is None else float(low)
+                high = None if high is None else float(high)
+            except (TypeError, ValueError):
+                raise ValueError(f"Rule fields '{field}_min'/'{field}_max' must be numbers")
+            self.ranges.append((field, low, high))
+
+        if not self.match and not self.ranges:
+            raise ValueError("A rule needs at least one condition")
+        self.matches = vehicle_filter(self.match, {field: (low, high) for field, low, high in self.ranges})
+
+    def as_dict(self):
+        return {"id": self.id, "name": self.name, **{k: v for k, v in self.spec.items() if k != 'name'}}
+
+
+class RuleSet:
+    """Rules indexed by one exact-match condition each, so a lot is only checked against
+    rules that could match it"""
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self.index = {field: {} for field in MATCH_FIELDS}  # field -> value -> [rules]
+        self.unindexed = []  # rules with only range conditions
+        for rule in self.rules:
+            field = next((field for field in MATCH_FIELDS if field in rule.match), None)
+            if field is None:
+                self.unindexed.append(rule)
+                continue
+            for value in rule.match[field]:
+                self.index[field].setdefault(value, []).append(rule)
+
+    def candidates(self, vehicle):
+        found = list(self.unindexed)
+        for field, buckets in self.index.items():
+            if buckets:
+                found.extend(buckets.get(HASH_FIELDS[field](vehicle), ()))
+        return found
+
+
+class AlertStore:
+    """Rules, delivered (rule, lot) pairs and the webhook outbox in SQLite"""
+
+    def __init__(self, path=None):
+        self.path = path or os.environ.get('ALERTS_DB', DEFAULT_PATH)
+        self._local = threading.local()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connection(self):
+        """Return this thread's connection (reopened after a fork, e.g. gunicorn --preload)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    # -- rules -----------------------------------------------------------
+
+    def rules_version(self):
+        row = self._connection().execute("SELECT value FROM meta WHERE key = 'rules_version'").fetchone()
+        return row[0] if row else 0
+
+    def _bump_rules_version(self, conn):
+        conn.execute("INSERT INTO meta (key, value) VALUES ('rules_version', 1) "
+                     "ON CONFLICT(key) DO UPDATE SET value = value + 1")
+
+    def add_rule(self, spec):
+        """Validate and save a rule; returns the compiled Rule (ValueError if invalid)"""
+        Rule(0, spec)
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            cursor = conn.execute('INSERT INTO rules (name, spec, created_at) VALUES (?, ?, ?)',
+                                  (str(spec.get('name') or ''), json.dumps(spec), time.time()))
+            self._bump_rules_version(conn)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return Rule(cursor.lastrowid, spec)
+
+    def delete_rule(self, rule_id):
+        """Delete a rule and its delivery records; False if there was no such rule"""
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            deleted = conn.execute('DELETE FROM rules WHERE id = ?', (rule_id,)).rowcount
+            conn.execute('DELETE FROM delivered WHERE rule_id = ?', (rule_id,))
+            if deleted:
+                self._bump_rules_version(conn)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return bool(deleted)
+
+    def rules(self):
+        """All saved rules, compiled (rules that no longer compile are skipped)"""
+        compiled = []
+        for rule_id, spec in self._connection().execute('SELECT id, spec FROM rules ORDER BY id'):
+            try:
+                compiled.append(Rule(rule_id, json.loads(spec)))
+            except ValueError as e:
+                print(f"Warning: Skipping alert rule {rule_id}: {e}")
+        return compiled
+
+    # -- matches and outbox ----------------------------------------------
+
+    def record_matches(self, matches, queue=True):
+        """Keep the (rule, vehicle) pairs not delivered before and queue them as one batch
+
+        Returns the new pairs.
+        """
+        now = time.time()
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            new = [(rule, vehicle) for rule, vehicle in matches
+                   if conn.execute('INSERT OR IGNORE INTO delivered (rule_id, lot_number, matched_at) VALUES (?, ?, ?)',
+                                   (rule.id, str(vehicle.get('lot_number')), now)).rowcount]
+            if new and queue:
+                conn.executemany('INSERT INTO outbox (payload, created_at) VALUES (?, ?)',
+                                 ((json.dumps({"rule": {"id": rule.id, "name": rule.name},
+                                               "lot_number": str(vehicle.get('lot_number')),
+                                               "vehicle": vehicle}), now) for rule, vehicle in new))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return new
+
+    def claim(self, limit, lease=120):
+        """Take up to `limit` queued alerts for delivery (other processes skip them for `lease` seconds)"""
+        now = time.time()
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            rows = conn.execute('SELECT id, payload FROM outbox WHERE claimed_at IS NULL OR claimed_at < ? '
+                                'ORDER BY id LIMIT ?', (now - lease, limit)).fetchall()
+            conn.executemany('UPDATE outbox SET claimed_at = ? WHERE id = ?', ((now, row[0]) for row in rows))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return [(row_id, json.loads(payload)) for row_id, payload in rows]
+
+    def delivered(self, ids):
+        self._connection().executemany('DELETE FROM outbox WHERE id = ?', ((row_id,) for row_id in ids))
+
+    def failed(self, ids, error, max_attempts):
+        """Release the alerts for a later retry; ones that failed max_attempts times are dropped"""
+        conn = self._connection()
+        conn.executemany('UPDATE outbox SET claimed_at = NULL, attempts = attempts + 1, last_error = ? WHERE id = ?',
+                         ((error, row_id) for row_id in ids))
+        return conn.execute('DELETE FROM outbox WHERE attempts >= ?', (max_attempts,)).rowcount
+
+    def pending(self):
+        return self._connection().execute('SELECT COUNT(*) FROM outbox').fetchone()[0]
+
+
+class AlertEngine:
+    """Evaluates saved rules on each snapshot diff and delivers new matches to a webhook
+
+    Hooked into VehicleSnapshot.publish (see snapshot.py), which only records the matches:
+    a daemon thread delivers the outbox, woken after each diff and every retry_interval
+    seconds for failed or leftover batches. Without ALERT_WEBHOOK_URL, matches are only
+    logged (and still recorded, so they are not re-sent later).
+    """
+
+    def __init__(self, store=None, webhook_url=None, batch_size=None, max_attempts=10, timeout=10,
+                 retry_interval=None):
+        self.store = store or AlertStore()
+        self.webhook_url = webhook_url if webhook_url is not None else os.environ.get('ALERT_WEBHOOK_URL')
+        self.batch_size = batch_size or int(os.environ.get('ALERT_BATCH_SIZE', 50))
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.retry_interval = retry_interval or float(os.environ.get('ALERT_RETRY_SECONDS', 30))
+        self.session = requests.Session()
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._sender = None  # (pid, thread) - restarted after a fork
+        self._closing = False
+        self._ruleset = None  # (rules version, RuleSet)
+        self.evaluations = 0
+        self.lots_evaluated = 0
+        self.rule_checks = 0  # predicate calls - stays near churn x matching rules
+        self.matches = 0
+        self.duplicates = 0
+        self.sent = 0
+        self.failures = 0
+        self.dropped = 0
+        self.eval_seconds = 0.0
+
+    def ruleset(self):
+        """The compiled rules, rebuilt only when a rule was added or deleted"""
+        version = self.store.rules_version()
+        with self._lock:
+            if self._ruleset is not None and self._ruleset[0] == version:
+                return self._ruleset[1]
+        ruleset = RuleSet(self.store.rules())
+        with self._lock:
+            self._ruleset = (version, ruleset)
+        return ruleset
+
+    def evaluate(self, entry, vehicles):
+        """Check the lots a published change entry added or updated; returns the new matches
+
+        entry is (version, added, removed, updated) keys and vehicles the new {lot: vehicle} map.
+        """
+        if not entry:
+            return []
+        started = time.perf_counter()
+        version, added, removed, updated = entry
+        ruleset = self.ruleset()
+        if not ruleset.rules:
+            return []
+
+        now = time.time()
+        checks = 0
+        matches = []
+        changed = [vehicles[key] for key in list(added) + list(updated) if key in vehicles]
+        for vehicle in changed:
+            candidates = ruleset.candidates(vehicle)
+            checks += len(candidates)
+            matches.extend((rule, vehicle) for rule in candidates if rule.matches(vehicle, now))
+        new = self.store.record_matches(matches, queue=bool(self.webhook_url)) if matches else []
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.evaluations += 1
+            self.lots_evaluated += len(changed)
+            self.rule_checks += checks
+            self.matches += len(new)
+            self.duplicates += len(matches) - len(new)
+            self.eval_seconds += elapsed
+        print(f"🔔 Alerts for snapshot {version}: {len(changed)} changed lots x {len(ruleset.rules)} rules "
+              f"({checks} checks) -> {len(new)} new matches in {elapsed * 1000:.1f}ms")
+        for rule, vehicle in new[:20]:
+            print(f"   🔔 {rule.name}: lot {vehicle.get('lot_number')} {vehicle.get('year')} "
+                  f"{vehicle.get('damage')} {vehicle.get('location')} {vehicle.get('current_bid')}")
+
+        if self.webhook_url:
+            self.deliver_later()
+        return new
+
+    def start(self):
+        """Start the delivery thread in this process if it is not running (it first sends
+        whatever is already queued); returns True if it was started"""
+        if not self.webhook_url:
+            return False
+        with self._lock:
+            if self._sender is not None and self._sender[0] == os.getpid() and self._sender[1].is_alive():
+                return False
+            thread = threading.Thread(target=self._deliver_loop, name='alert-delivery', daemon=True)
+            self._sender = (os.getpid(), thread)
+            self._closing = False
+        thread.start()
+        return True
+
+    def deliver_later(self):
+        """Wake the delivery thread (starting it in this process if needed)"""
+        self.start()
+        self._wake.set()
+
+    def close(self, timeout=30):
+        """Deliver what is queued before the process exits - the delivery thread is a daemon
+        and would be killed mid-batch. Returns how many alerts were delivered."""
+        with self._lock:
+            sender = self._sender if self._sender is not None and self._sender[0] == os.getpid() else None
+            self._closing = True
+        if sender is not None:
+            self._wake.set()
+            sender[1].join(timeout)
+            if sender[1].is_alive():
+                print(f"Warning: Alert delivery still running after {timeout:.0f}s - the rest is sent by the next run")
+                return 0
+        return self.flush()
+
+    def _deliver_loop(self):
+        while True:
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Warning: Alert delivery failed: {e}")
+            if self._closing:
+                return
+            self._wake.wait(self.retry_interval)
+            self._wake.clear()
+
+    def flush(self):
+        """POST queued alerts to the webhook, batch_size per request; returns how many were delivered"""
+        if not self.webhook_url:
+            return 0
+        delivered = 0
+        while True:
+            batch = self.store.claim(self.batch_size)
+            if not batch:
+                return delivered
+            ids = [row_id for row_id, _ in batch]
+            try:
+                response = self.session.post(self.webhook_url, timeout=self.timeout, json={
+                    "alerts": [payload for _, payload in batch],
+                    "count": len(batch),
+                    "sent_at": time.time(),
+                })
+                response.raise_for_status()
+            except requests.RequestException as e:
+                dropped = self.store.failed(ids, str(e), self.max_attempts)
+                with self._lock:
+                    self.failures += 1
+                    self.dropped += dropped
+                print(f"Warning: Alert webhook failed ({len(batch) - dropped} of {len(batch)} alerts kept for retry): {e}")
+                return delivered
+            self.store.delivered(ids)
+            delivered += len(batch)
+            with self._lock:
+                self.sent += len(batch)
+
+    def stats(self):
+        with self._lock:
+            result = {
+                "webhook": bool(self.webhook_url),
+                "evaluations": self.evaluations,
+                "lots_evaluated": self.lots_evaluated,
+                "rule_checks": self.rule_checks,
+                "matches": self.matches,
+                "duplicates": self.duplicates,
+                "sent": self.sent,
+                "webhook_failures": self.failures,
+                "dropped": self.dropped,
+                "eval_ms": round(self.eval_seconds * 1000, 1),
+            }
+        result["pending"] = self.store.pending()
+        return result
+
+
+_shared_engine = None
+_shared_lock = threading.Lock()
+
+
+def get_engine():
+    """Return the process-wide alert engine (ALERTS=0 disables alerts; returns None)"""
+    global _shared_engine
+    if os.environ.get('ALERTS', '1') == '0':
+        return None
+    with _shared_lock:
+        if _shared_engine is None:
+            _shared_engine = AlertEngine()
+        return _shared_engine
+
+
+def serve_receiver(port=8765):
+    """Stand-in webhook receiver: prints every batch it is sent"""
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    class Receiver(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+            print(f"📨 Received {body.get('count', 0)} alerts")
+            for alert in body.get('alerts', []):
+                vehicle = alert.get('vehicle', {})
+                print(f"   {alert['rule']['name']}: lot {alert['lot_number']} {vehicle.get('year')} "
+                      f"{vehicle.get('damage')} {vehicle.get('location')} {vehicle.get('current_bid')}")
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    print(f"👂 Listening for alert webhooks on http://127.0.0.1:{port}/ (set ALERT_WEBHOOK_URL to it)")
+    HTTPServer(('127.0.0.1', port), Receiver).serve_forever()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) >= 2 and sys.argv[1] == 'receive':
+        port = int(sys.argv[sys.argv.index('--port') + 1]) if '--port' in sys.argv else 8765
+        serve_receiver(port)
+    else:
+        print(__doc__)
@@ -1,17 +1,52 @@
 """
 Flask application for Copart Toyota Corolla Dashboard
 """
-from flask import Flask, render_template, jsonify
+from flask import Flask, render_template, jsonify, request, send_file, abort, stream_with_context
 import os
+import hmac
+import time
 from dotenv import load_dotenv
+from snapshot import VehicleSnapshot, vehicle_key
+from snapshot_store import SnapshotStore
+from vehicle_index import VehicleIndex, vehicle_filter
+from search_index import SearchIndex
+from bid_history import BidHistory
+from market_stats import MarketStats
+from alerts import get_engine
+from throttle import get_limiter
+import profiling
+import export
 
 # Load environment variables from .env file
 load_dotenv()
 
 app = Flask(__name__)
 
-# Store cached data
-cached_data = []
+# Store cached data (versioned so dashboards can fetch only what changed)
+# Persisted in SQLite so restarts start warm and every gunicorn worker sees the same data
+snapshot = VehicleSnapshot(store=SnapshotStore(), history=BidHistory(), alerts=get_engine())
+snapshot.sync()
+if len(snapshot) > 0:
+    print(f"ℹ️  Loaded {len(snapshot)} vehicles from snapshot store (version {snapshot.version})")
+
+# Full-text index over the snapshot, caught up incrementally on each search
+search_index = SearchIndex()
+
+@app.before_request
+def sync_snapshot():
+    """Pick up snapshots written by other workers (cheap when the version is unchanged)"""
+    try:
+        snapshot.sync()
+    except Exception as e:
+        print(f"Warning: Could not sync snapshot store: {e}")
+    if snapshot.alerts is not None:
+        # Started here rather than at import: a thread started before gunicorn's --preload
+        # fork would not run in the worker. It sends alerts left queued by earlier runs.
+        snapshot.alerts.start()
+
+# Seconds a refresh may take - keep it under gunicorn's --timeout (600s) so a slow
+# scrape returns what it has instead of being killed with nothing
+REFRESH_BUDGET = float(os.environ.get('REFRESH_BUDGET', 540))
 
 # Lazy import to avoid Playwright browser initialization on startup
 def get_scraper():
@@ -42,9 +77,11 @@ def index():
 
 @app.route('/api/refresh', methods=['POST'])
 def refresh_data():
-    """Refresh vehicle data by scraping Copart"""
-    global cached_data  # Declare global at the top of the function
-    
+    """Refresh vehicle data by scraping Copart
+
+    ?budget=<seconds> shortens the time budget (default REFRESH_BUDGET). A run that
+    runs out of time returns what it gathered with partial: true.
+    """
     try:
         scrape_func = get_scraper()
         if not scrape_func:
@@ -65,9 +102,12 @@ def refresh_data():
         print("Starting scrape from Flask API...")
         print("=" * 80)
         # Scrape new data (maximum possible)
-        vehicles = scrape_func(limit=1000)  # High limit to scrape as many as possible
+        # High limit to scrape as many as possible; resume picks up a run that died mid-way
+        budget = min(request.args.get('budget', REFRESH_BUDGET, type=float), REFRESH_BUDGET)
+        vehicles = scrape_func(limit=1000, resume=True, budget=budget)
+        partial = getattr(vehicles, 'partial', False)
         print("=" * 80)
-        print(f"Scrape completed. Found {len(vehicles)} vehicles")
+        print(f"Scrape completed{' (partial)' if partial else ''}. Found {len(vehicles)} vehicles")
         print("=" * 80)
         
         if len(vehicles) == 0:
@@ -78,23 +118,33 @@ def refresh_data():
             print("   4. Search criteria too strict")
             print("   5. Playwright/Browserless not properly initialized")
             # Don't clear cached data if scraping fails - keep old data
-            if len(cached_data) > 0:
+            if len(snapshot) > 0:
+                cached_data = snapshot.as_list()
                 print(f"ℹ️  Keeping {len(cached_data)} cached vehicles from previous scrape")
                 return jsonify({
                     'success': False,
                     'error': 'Scraping returned 0 vehicles. Check Browserless connection and server logs. Showing cached data instead.',
                     'data': cached_data,
                     'count': len(cached_data),
+                    'version': snapshot.version,
                     'cached': True
                 })
         
+        # A partial run didn't see every lot - keep the ones it didn't reach
+        if partial:
+            fresh = {vehicle_key(vehicle) for vehicle in vehicles}
+            vehicles = list(vehicles) + [vehicle for vehicle in snapshot.as_list()
+                                         if vehicle_key(vehicle) not in fresh]
+        
         # Update cached data
-        cached_data = vehicles
+        snapshot.publish(vehicles)
         
         return jsonify({
             'success': True,
             'data': vehicles,
-            'count': len(vehicles)
+            'count': len(vehicles),
+            'version': snapshot.version,
+            'partial': partial
         })
     except Exception as e:
         import traceback
@@ -106,16 +156,395 @@ def refresh_data():
             'error': error_msg
         }), 500
 
+@app.route('/api/refresh/due', methods=['POST'])
+def refresh_due():
+    """Re-read bid and sale status of the lots that are due, closing-soon lots first
+
+    ?max_lots= caps the pass (default 50); ?budget= caps its time like /api/refresh.
+    """
+    try:
+        from scraper import CopartScraper
+        from deadline import Deadline
+        from refresh_scheduler import refresh_due_lots, RefreshScheduler
+    except ImportError as e:
+        return jsonify({'success': False, 'error': f'Scraper not available. {e}'}), 500
+
+    budget = min(request.args.get('budget', REFRESH_BUDGET, type=float), REFRESH_BUDGET)
+    max_lots = request.args.get('max_lots', 50, type=int)
+    scheduler = RefreshScheduler()
+    scraper = CopartScraper()
+    scraper.deadline = Deadline(budget)
+    try:
+        if not scraper.page:
+            scraper.setup_browser()
+        vehicles, refreshed = refresh_due_lots(scraper, snapshot.as_list(), scheduler, max_lots=max_lots)
+    except Exception as e:
+        print(f"ERROR in refresh_due: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+    finally:
+        scraper.close()
+
+    if refreshed:
+        snapshot.publish(vehicles)
+    return jsonify({
+        'success': True,
+        'refreshed': refreshed,
+        'version': snapshot.version,
+        'next_due': scheduler.next_due()
+    })
+
 @app.route('/api/data', methods=['GET'])
 def get_data():
-    """Get current vehicle data"""
-    global cached_data
+    """Get current vehicle data
+
+    With ?since=<version>, returns only the lots added, removed or updated
+    since that version. Falls back to the full list if the version is unknown.
+    """
+    since = request.args.get('since', type=int)
+    if since is not None:
+        changes = snapshot.changes_since(since)
+        if changes is not None:
+            return jsonify({
+                'success': True,
+                'delta': True,
+                'version': changes['version'],
+                'added': changes['added'],
+                'removed': changes['removed'],
+                'updated': changes['updated'],
+                'count': len(snapshot)
+            })
+    
+    cached_data = snapshot.as_list()
     return jsonify({
         'success': True,
+        'delta': False,
+        'version': snapshot.version,
         'data': cached_data,
         'count': len(cached_data)
     })
 
+def _list_arg(name):
+    """Read a comma separated (or repeated) query parameter"""
+    values = []
+    for raw in request.args.getlist(name):
+        values.extend(part.strip() for part in raw.split(',') if part.strip())
+    return values
+
+def _filter_args():
+    """Read the /api/vehicles filters: ({hash field: values}, {sorted field: (low, high)})"""
+    equals = {field: _list_arg(field) for field in ('state', 'damage', 'title')}
+    ranges = {
+        'year': (request.args.get('year_min', type=int), request.args.get('year_max', type=int)),
+        'odometer': (request.args.get('odometer_min', type=int), request.args.get('odometer_max', type=int)),
+        'bid': (request.args.get('bid_min', type=int), request.args.get('bid_max', type=int)),
+        'sale_time': (request.args.get('sale_after', type=float), request.args.get('sale_before', type=float)),
+    }
+    return equals, ranges
+
+@app.route('/api/vehicles', methods=['GET'])
+def query_vehicles():
+    """Query the current snapshot with filters, sorting and pagination
+
+    Filters: state, damage, title (comma separated values), year_min/year_max,
+    odometer_min/odometer_max, bid_min/bid_max, sale_after/sale_before (epoch seconds).
+    Sorting: sort=odometer|bid|year|sale_time, order=asc|desc. Paging: offset, limit.
+    """
+    try:
+        equals, ranges = _filter_args()
+        offset = max(0, request.args.get('offset', 0, type=int))
+        limit = min(500, max(1, request.args.get('limit', 50, type=int)))
+        sort = request.args.get('sort') or None
+        descending = request.args.get('order', 'asc').lower() == 'desc'
+        
+        version = snapshot.version
+        index = snapshot.derived('index', VehicleIndex)
+        total, vehicles = index.query(equals=equals, ranges=ranges, sort=sort,
+                                      descending=descending, offset=offset, limit=limit)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    return jsonify({
+        'success': True,
+        'version': version,
+        'total': total,
+        'offset': offset,
+        'limit': limit,
+        'data': vehicles,
+        'count': len(vehicles)
+    })
+
+@app.route('/api/search', methods=['GET'])
+def search_vehicles():
+    """Full-text search over lot number, location, damage, condition, title and sale info
+
+    ?q= words match whole words or prefixes ("tren flood"); every word must match.
+    Results are ranked by relevance. Paging: offset, limit.
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'success': False, 'error': 'Missing ?q='}), 400
+    offset = max(0, request.args.get('offset', 0, type=int))
+    limit = min(200, max(1, request.args.get('limit', 20, type=int)))
+
+    search_index.update(snapshot)
+    started = time.perf_counter()
+    total, hits = search_index.search(query, offset=offset, limit=limit)
+    took_ms = round((time.perf_counter() - started) * 1000, 2)
+    return jsonify({
+        'success': True,
+        'version': search_index.version,
+        'query': query,
+        'total': total,
+        'offset': offset,
+        'limit': limit,
+        'took_ms': took_ms,
+        'data': [{**vehicle, 'score': score} for score, vehicle in hits],
+        'count': len(hits)
+    })
+
+@app.route('/api/export', methods=['GET'])
+def export_data():
+    """Stream the snapshot (or ?source=history, the bid history) as CSV, NDJSON or Parquet
+
+    ?format=csv|ndjson|parquet (default csv). Lots accept the /api/vehicles filters;
+    history accepts ?since=<epoch seconds>. Rows are streamed in chunks, never built
+    into one response.
+    """
+    fmt = request.args.get('format', 'csv').lower()
+    source = request.args.get('source', 'lots').lower()
+    if fmt not in export.FORMATS:
+        return jsonify({'success': False, 'error': f"Unknown format '{fmt}' (use {', '.join(export.FORMATS)})"}), 400
+    if source not in ('lots', 'history'):
+        return jsonify({'success': False, 'error': "Unknown source (use lots or history)"}), 400
+    if fmt == 'parquet' and export.pyarrow is None:
+        return jsonify({'success': False, 'error': 'Parquet export needs pyarrow (pip install pyarrow)'}), 501
+
+    headers = {}
+    if source == 'lots':
+        try:
+            equals, ranges = _filter_args()
+            predicate = vehicle_filter(equals, ranges)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        version, vehicles = export.iter_lots(snapshot.store, predicate)
+        chunks = export.export_lots(fmt, vehicles)
+        headers['X-Snapshot-Version'] = str(version)
+    else:
+        rows = export.iter_history(snapshot.history, since=request.args.get('since', type=float))
+        chunks = export.export_history(fmt, rows)
+
+    extension = 'ndjson' if fmt == 'ndjson' else fmt
+    headers['Content-Disposition'] = f'attachment; filename="copart-{source}.{extension}"'
+    return app.response_class(stream_with_context(chunks), content_type=export.FORMATS[fmt], headers=headers)
+
+@app.route('/api/stats', methods=['GET'])
+def market_stats():
+    """Count, mean, percentiles and histograms of bid and odometer per group
+
+    ?by=year,damage,yard,state picks the grouping (default year; empty for totals only),
+    ?bins= the histogram bin count (default 10, 0 to skip). Built once per snapshot version.
+    """
+    by = _list_arg('by') if 'by' in request.args else ['year']
+    bins = max(0, min(request.args.get('bins', 10, type=int), 100))
+    stats = snapshot.derived('market_stats', MarketStats)
+    try:
+        result = stats.stats(by=[field.lower() for field in by], bins=bins)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({
+        'success': True,
+        'version': snapshot.version,
+        **result
+    })
+
+@app.route('/api/lots/<lot_number>/history', methods=['GET'])
+def lot_history(lot_number):
+    """Every recorded bid/status change of a lot, oldest first"""
+    if not lot_number.isdigit():
+        return jsonify({'success': False, 'error': 'Lot number must be numeric'}), 400
+    history = snapshot.history.lot_history(lot_number)
+    return jsonify({
+        'success': True,
+        'lot_number': lot_number,
+        'history': history,
+        'count': len(history)
+    })
+
+@app.route('/api/history/final-bids', methods=['GET'])
+def final_bid_stats():
+    """Final-bid statistics of sold lots
+
+    ?by=year,damage,yard picks the grouping (default all three); ?since=<epoch seconds>
+    limits it to lots sold after that time.
+    """
+    by = _list_arg('by') or ['year', 'damage', 'yard']
+    try:
+        groups = snapshot.history.aggregate(by=[field.lower() for field in by],
+                                            since=request.args.get('since', type=float))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({
+        'success': True,
+        'groups': groups,
+        'count': len(groups)
+    })
+
+_image_archive = None
+
+def get_image_archive():
+    """Lazily open the local image archive (see image_archive.py)"""
+    global _image_archive
+    if _image_archive is None:
+        from image_archive import ImageArchive
+        _image_archive = ImageArchive()
+    return _image_archive
+
+@app.route('/api/lots/<lot_number>/images', methods=['GET'])
+def archived_lot_images(lot_number):
+    """URLs of the archived photos of a lot (still served after Copart removes them)"""
+    if not lot_number.isdigit():
+        return jsonify({'success': False, 'error': 'Lot number must be numeric'}), 400
+    images = [f"/images/{sha}" for _, sha in get_image_archive().lot_images(lot_number)]
+    return jsonify({
+        'success': True,
+        'lot_number': lot_number,
+        'images': images,
+        'count': len(images)
+    })
+
+@app.route('/images/<sha>', methods=['GET'])
+def archived_image(sha):
+    """Serve an archived photo by content hash (immutable, so cached for a year)"""
+    if len(sha) != 64 or any(c not in '0123456789abcdef' for c in sha):
+        abort(404)
+    found = get_image_archive().open_image(sha)
+    if not found:
+        abort(404)
+    path, content_type = found
+    return send_file(path, mimetype=content_type, max_age=365 * 24 * 3600)
+
+@app.route('/api/browser', methods=['GET'])
+def browser_memory():
+    """Navigation, page/context recycling and JS heap reports of recent scraper runs"""
+    from browser_lifecycle import recent_reports
+    reports = list(recent_reports)
+    return jsonify({
+        'success': True,
+        'reports': reports,
+        'count': len(reports)
+    })
+
+@app.route('/api/throttle', methods=['GET'])
+def throttle_stats():
+    """Rate limiter state and block counters of this process's scraper"""
+    return jsonify(get_limiter().stats())
+
+@app.route('/api/latency', methods=['GET'])
+def latency_stats():
+    """Rolling p50/p95/p99 latency and the learned timeout of each page type and wait"""
+    from latency import get_tracker
+    tracker = get_tracker()
+    tracker.load()  # Pick up what scraper runs saved; scrapers save every 50 waits and on close
+    return jsonify(tracker.stats())
+
+@app.route('/api/hedging', methods=['GET'])
+def hedging_stats():
+    """Hedged lot-page navigations in this process: fired, won by the hedge, lost, skipped"""
+    from hedging import get_policy
+    return jsonify(get_policy().stats())
+
+@app.route('/api/single-flight', methods=['GET'])
+def single_flight_stats():
+    """Lot fetches in this process vs. requests that shared an in-flight fetch of the same lot"""
+    import single_flight
+    return jsonify(single_flight.stats())
+
+@app.route('/api/fetch-paths', methods=['GET'])
+def fetch_path_stats():
+    """Hit rate of the HTTP fast path for lot details vs. browser fallbacks in this process"""
+    from lot_fetcher import get_client
+    client = get_client()
+    if client is None:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **client.stats()})
+
+@app.route('/api/alerts', methods=['GET'])
+def alert_status():
+    """Saved alert rules plus evaluation and webhook delivery counters"""
+    engine = snapshot.alerts
+    if engine is None:
+        return jsonify({'success': False, 'error': 'Alerts are disabled (ALERTS=0)'}), 404
+    return jsonify({
+        'success': True,
+        'rules': [rule.as_dict() for rule in engine.ruleset().rules],
+        'stats': engine.stats()
+    })
+
+@app.route('/api/alerts/rules', methods=['POST'])
+def add_alert_rule():
+    """Save an alert rule, e.g. {"name": "...", "state": "NJ", "year_min": 2021, "bid_max": 3000}
+
+    Fields follow /api/vehicles: state, damage, title (value or list) and
+    year_min/year_max, odometer_min/odometer_max, bid_min/bid_max. The rule is checked
+    against lots as later snapshots add or update them.
+    """
+    engine = snapshot.alerts
+    if engine is None:
+        return jsonify({'success': False, 'error': 'Alerts are disabled (ALERTS=0)'}), 404
+    spec = request.get_json(silent=True)
+    if not isinstance(spec, dict):
+        return jsonify({'success': False, 'error': 'Body must be a JSON object'}), 400
+    try:
+        rule = engine.store.add_rule(spec)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({'success': True, 'rule': rule.as_dict()}), 201
+
+@app.route('/api/alerts/rules/<int:rule_id>', methods=['DELETE'])
+def delete_alert_rule(rule_id):
+    """Delete a saved alert rule"""
+    engine = snapshot.alerts
+    if engine is None or not engine.store.delete_rule(rule_id):
+        return jsonify({'success': False, 'error': 'No such rule'}), 404
+    return jsonify({'success': True})
+
+def _is_admin():
+    """True when the request carries ADMIN_TOKEN (X-Admin-Token header or ?token=)"""
+    token = os.environ.get('ADMIN_TOKEN')
+    given = request.headers.get('X-Admin-Token') or request.args.get('token') or ''
+    return bool(token) and hmac.compare_digest(given.encode(), token.encode())
+
+@app.route('/api/admin/profile', methods=['GET'])
+def latest_profile():
+    """Newest scrape profile report as text (?list=1 for the status and report names)"""
+    if not _is_admin():
+        abort(403)
+    if request.args.get('list'):
+        return jsonify({
+            'success': True,
+            'enabled': profiling.enabled(),
+            'reports': profiling.list_reports()
+        })
+    latest = profiling.latest_report()
+    if not latest:
+        return jsonify({'success': False, 'error': 'No profile reports yet', 'enabled': profiling.enabled()}), 404
+    name, text = latest
+    return app.response_class(text, mimetype='text/plain', headers={'X-Profile-Report': name})
+
+@app.route('/api/admin/profile', methods=['POST'])
+def toggle_profile():
+    """Switch profiling of scrape runs on or off without a restart: {"enabled": true}"""
+    if not _is_admin():
+        abort(403)
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data.get('enabled'), bool):  # "false" would be truthy
+        return jsonify({'success': False, 'error': 'Body must be {"enabled": true|false}'}), 400
+    profiling.set_enabled(data['enabled'])
+    return jsonify({'success': True, 'enabled': profiling.enabled()})
+
 if __name__ == '__main__':
     import os
     port = int(os.environ.get('PORT', 8080))
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""Benchmarks for the scraping pipeline
+
+Usage:
+    python benchmark.py sharded --pages DIR [--workers 1 2 4]
+    python benchmark.py images [--lots 50] [--per-lot 5] [--latency-ms 20] [--workers 1 4 16]
+    python benchmark.py locations --pages DIR [--repeat 3] [--show 5]
+"""
+import os
+import re
+import sys
+import time
+import argparse
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def saved_lot_numbers(pages_dir):
+    """Lot numbers of the saved <lot>.html pages in a directory"""
+    return sorted(name[:-5] for name in os.listdir(pages_dir) if name.endswith('.html'))
+
+
+def bench_sharded(args):
+    """Replay saved lot pages through the sharded runner at several worker counts"""
+    from sharded import iter_lots_sharded, ReplayLotTask
+
+    lots = saved_lot_numbers(args.pages)
+    if not lots:
+        print(f"⚠️  No <lot>.html pages found in {args.pages}")
+        return 1
+
+    print(f"🏁 Replaying {len(lots)} saved lot pages from {args.pages}")
+    print("=" * 80)
+    baseline = None
+    for workers in args.workers:
+        started = time.perf_counter()
+        passed = sum(1 for _, vehicle in iter_lots_sharded(lots, workers=workers, task=ReplayLotTask(args.pages)) if vehicle)
+        elapsed = time.perf_counter() - started
+        baseline = baseline or elapsed
+        print(f"  workers={workers:<3} {elapsed:7.2f}s  {len(lots) / elapsed:8.1f} lots/s  "
+              f"speedup x{baseline / elapsed:.2f}  ({passed} passed filters)")
+    return 0
+
+
+def serve_fake_images(per_lot, size, latency):
+    """Start a local HTTP server standing in for Copart's image CDN; returns (server, url template)
+
+    /<lot>/<n>.jpg returns `size` pseudo-random bytes for n <= per_lot (404 after that),
+    each after `latency` seconds, so downloads behave like a slow remote CDN.
+    """
+    import threading
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive, so the client's connection pool matters
+
+        def do_GET(self):
+            parts = self.path.strip('/').split('/')
+            time.sleep(latency)
+            try:
+                lot, n = int(parts[0]), int(parts[1].split('.')[0])
+            except (IndexError, ValueError):
+                lot, n = 0, per_lot + 1
+            if n > per_lot:
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            body = (f"{lot}-{n}".encode() * (size // 8 + 1))[:size]
+            self.send_response(200)
+            self.send_header('Content-Type', 'image/jpeg')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/{{lot}}/{{n}}.jpg"
+
+
+def bench_images(args):
+    """Download images from a local stand-in CDN at several concurrency levels"""
+    import tempfile
+    from image_archive import ImageArchive
+
+    server, url_template = serve_fake_images(args.per_lot, args.size, args.latency_ms / 1000)
+    vehicles = [{"lot_number": str(50000000 + i)} for i in range(args.lots)]
+    total = args.lots * args.per_lot
+    print(f"🏁 Archiving {args.lots} lots x {args.per_lot} images ({args.size // 1024} KB, "
+          f"{args.latency_ms} ms latency) from {url_template}")
+    print("=" * 80)
+    baseline = None
+    try:
+        for workers in args.workers:
+            with tempfile.TemporaryDirectory() as directory:
+                archive = ImageArchive(directory, workers=workers, url_template=url_template)
+                started = time.perf_counter()
+                archive.archive_vehicles(vehicles, max_images=args.per_lot + 1)
+                elapsed = time.perf_counter() - started
+            baseline = baseline or elapsed
+            print(f"  workers={workers:<3} {elapsed:7.2f}s  {total / elapsed:8.1f} images/s  "
+                  f"{archive.downloaded_bytes / elapsed / 1e6:6.1f} MB/s  speedup x{baseline / elapsed:.2f}  "
+                  f"({archive.downloaded} stored)")
+    finally:
+        server.shutdown()
+    return 0
+
+
+# The per-keyword/per-city location search parse_lot_page used before the gazetteer,
+# kept here only to benchmark against
+_LEGACY_STATES = [
+    ('MD', r'MD|Maryland'),
+    ('NJ', r'NJ|New Jersey'),
+    ('DC', r'DC|District of Columbia|Washington DC'),
+    ('NY', r'NY|New York'),
+]
+_LEGACY_CITIES = {
+    'MD': ['Baltimore', 'Annapolis', 'Frederick', 'Rockville', 'Gaithersburg', 'Columbia', 'Germantown', 'Waldorf', 'Laurel', 'Bethesda', 'Silver Spring', 'Wheaton'],
+    'NJ': ['Newark', 'Jersey City', 'Paterson', 'Elizabeth', 'Edison', 'Woodbridge', 'Lakewood', 'Toms River', 'Hamilton', 'Trenton', 'Clifton', 'Camden'],
+    'DC': ['Washington', 'District'],
+    'NY': ['New York', 'Albany', 'Buffalo', 'Rochester', 'Syracuse', 'Yonkers', 'Utica', 'White Plains', 'Hempstead', 'Troy', 'Binghamton', 'Freeport'],
+}
+_LEGACY_ANY = r'\b(MD|NJ|DC|NY|Maryland|New Jersey|District of Columbia|New York)\b'
+
+
+def _legacy_state(text):
+    for state, names in _LEGACY_STATES:
+        if re.search(rf'\b({names})\b', text, re.IGNORECASE):
+            return state
+    return None
+
+
+def _legacy_state_code(text):
+    text = text.upper()
+    for state, names in _LEGACY_STATES:
+        if text in names.upper().split('|'):
+            return state
+    return None
+
+
+def _legacy_labelled(soup, keywords, separator=r'[:\s]+'):
+    for keyword in keywords:
+        for elem in soup.find_all(string=re.compile(keyword, re.IGNORECASE)):
+            parent = elem.find_parent()
+            if parent:
+                match = re.search(rf'{re.escape(keyword)}{separator}([^\n\r<]+?)(?:\n|$|</)', parent.get_text(), re.IGNORECASE | re.DOTALL)
+                if match:
+                    state = _legacy_state(re.sub(r'\s+', ' ', match.group(1)).strip())
+                    if state:
+                        return state
+    return None
+
+
+def legacy_locations(soup, page_source, body_text):
+    """(state, lane_state, sale_doc_state) the way parse_lot_page used to find them"""
+    text = body_text or page_source
+    state = _legacy_labelled(soup, ['Location', 'yard', 'facility', 'site', 'pickup'])
+    for code, cities in _LEGACY_CITIES.items():
+        if state:
+            break
+        names = dict(_LEGACY_STATES)[code]
+        for city in cities:
+            if re.search(rf'{city}[,\s]*({names})', text, re.IGNORECASE):
+                state = code
+                break
+    if not state:
+        match = re.search(r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)[,\s]+(MD|NJ|DC|NY|Maryland|New Jersey|District of Columbia|New York)', text)
+        state = _legacy_state_code(match.group(2)) if match else _legacy_state(page_source)
+
+    lane = _legacy_labelled(soup, ['Location / Lane', 'Location/Lane', 'Lane', 'Location Lane'])
+    if not lane:
+        for pattern in (rf'(?:Location\s*/\s*Lane|Location/Lane)[:\s]*[^<\n]{{0,50}}?{_LEGACY_ANY}', rf'Lane[:\s]+[^<\n]{{0,50}}?{_LEGACY_ANY}'):
+            match = re.search(pattern, page_source, re.IGNORECASE)
+            if match:
+                lane = _legacy_state_code(match.group(1))
+                break
+
+    sale_doc = _legacy_labelled(soup, ['Sale doc', 'Sale document', 'Sale location', 'Document location', 'Sale yard',
+                                       'Sale Doc', 'Sale Document', 'saleDoc', 'saleDocLocation', 'Document',
+                                       'Doc Location', 'Sale Site'], separator=r'[:\s]*')
+    if not sale_doc:
+        for pattern in (rf'(?:Sale\s+doc[ument]*|saleDoc)[:\s]*[^<\n]{{0,50}}?{_LEGACY_ANY}',
+                        rf'Sale\s+location[:\s]*[^<\n]{{0,50}}?{_LEGACY_ANY}',
+                        rf'Document\s+location[:\s]*[^<\n]{{0,50}}?{_LEGACY_ANY}',
+                        rf'data-sale-doc[^=]*=[^>]*?{_LEGACY_ANY}'):
+            match = re.search(pattern, page_source, re.IGNORECASE)
+            if match:
+                sale_doc = _legacy_state_code(match.group(1))
+                break
+    if not sale_doc:
+        for script in soup.find_all('script'):
+            if script.string:
+                match = re.search(r'(?:sale|doc|location).*?(MD|NJ|DC|NY|Maryland|New Jersey|District of Columbia|New York)', script.string, re.IGNORECASE)
+                if match:
+                    sale_doc = _legacy_state_code(match.group(1))
+                    break
+    return state, lane, sale_doc
+
+
+def gazetteer_locations(page_source, body_text):
+    """(state, lane_state, sale_doc_state) as parse_lot_page finds them now"""
+    from gazetteer import resolve_page
+
+    places = resolve_page(body_text, page_source)
+    return places["state"], places["lane_state"], places["sale_doc_state"]
+
+
+def bench_locations(args):
+    """Time the location/lane/sale doc extraction of saved lot pages, old search vs gazetteer"""
+    from bs4 import BeautifulSoup
+
+    from test_gazetteer import LOCATION_CASES, check_location_cases
+
+    wrong = check_location_cases()
+    print(f"🧪 {len(LOCATION_CASES) - len(wrong)}/{len(LOCATION_CASES)} known location cases resolved correctly")
+    for text, expected, got in wrong:
+        print(f"    ❌ {text!r}: expected {expected}, got {got}")
+
+    lots = saved_lot_numbers(args.pages)
+    if not lots:
+        print(f"⚠️  No <lot>.html pages found in {args.pages}")
+        return 1
+
+    pages = []
+    for lot in lots:
+        with open(os.path.join(args.pages, f"{lot}.html"), encoding='utf-8', errors='replace') as f:
+            page_source = f.read()
+        soup = BeautifulSoup(page_source, 'html.parser')
+        body_text = soup.body.get_text('\n') if soup.body else soup.get_text('\n')
+        pages.append((soup, page_source, body_text))
+
+    print(f"🏁 Resolving locations of {len(pages)} saved lot pages from {args.pages} (best of {args.repeat})")
+    print("=" * 80)
+    results = {}
+    timings = {}
+    for name, run in (("legacy", lambda page: legacy_locations(*page)),
+                      ("gazetteer", lambda page: gazetteer_locations(page[1], page[2]))):
+        best = None
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            results[name] = [run(page) for page in pages]
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        timings[name] = best
+        print(f"  {name:<10} {best:7.3f}s  {best * 1000 / len(pages):8.2f} ms/page")
+
+    # The old search only recognised MD/DC/NJ/NY, so other states count as "not found"
+    allowed = {'MD', 'DC', 'NJ', 'NY'}
+    differ = []
+    for lot, old, new in zip(lots, results["legacy"], results["gazetteer"]):
+        new_allowed = tuple(state if state in allowed else None for state in new)
+        if old != new_allowed:
+            differ.append((lot, old, new))
+    print(f"  speedup x{timings['legacy'] / timings['gazetteer']:.1f}, "
+          f"{len(lots) - len(differ)}/{len(lots)} pages agree on (state, lane, sale doc) within MD/DC/NJ/NY")
+    for lot, old, new in differ[:args.show]:
+        print(f"    lot {lot}: legacy {old}  gazetteer {new}")
+    return 1 if wrong else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    sharded = commands.add_parser('sharded', help='process-pool lot parsing over saved pages')
+    sharded.add_argument('--pages', required=True, help='directory of saved <lot>.html pages')
+    sharded.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    sharded.set_defaults(func=bench_sharded)
+
+    images = commands.add_parser('images', help='pooled concurrent image archiving against a local HTTP server')
+    images.add_argument('--lots', type=int, default=50)
+    images.add_argument('--per-lot', type=int, default=5)
+    images.add_argument('--size', type=int, default=150 * 1024, help='bytes per image')
+    images.add_argument('--latency-ms', type=int, default=20, help='server delay per request')
+    images.add_argument('--workers', type=int, nargs='+', default=[1, 4, 16])
+    images.set_defaults(func=bench_images)
+
+    locations = commands.add_parser('locations', help='location/lane/sale doc extraction, old search vs gazetteer')
+    locations.add_argument('--pages', required=True, help='directory of saved <lot>.html pages')
+    locations.add_argument('--repeat', type=int, default=3)
+    locations.add_argument('--show', type=int, default=5, help='pages that differ to list')
+    locations.set_defaults(func=bench_locations)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
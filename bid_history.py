@@ -0,0 +1,300 @@
+"""
+Append-only bid history
+Every published snapshot appends (lot, time, bid, status) for lots whose bid or status
+changed to a small NDJSON log; compaction folds the log into NumPy column files
+(dictionary-encoded strings) that aggregate queries scan vectorized
+"""
+import os
+import json
+import time
+import threading
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows - single process only
+    fcntl = None
+
+from vehicle_fields import parse_money, parse_year, sale_timestamp, normalize_label
+from market_stats import group_rows
+
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'history')
+
+# Columns of a compacted segment; string columns are stored as codes into a dictionary
+NUMERIC_COLUMNS = {"lot": np.int64, "ts": np.float64, "bid": np.int64, "sale_time": np.float64, "year": np.int32}
+LABEL_COLUMNS = ("status", "damage", "yard")
+GROUP_FIELDS = ("year", "damage", "yard")
+
+
+def history_row(vehicle, now):
+    """Return the log row for a vehicle, or None if it has no numeric lot number"""
+    lot = str(vehicle.get("lot_number", "")).strip()
+    if not lot.isdigit():
+        return None
+    bid = parse_money(vehicle.get("current_bid"))
+    year = parse_year(vehicle.get("year"))
+    return {
+        "lot": int(lot),
+        "ts": now,
+        "bid": -1 if bid is None else bid,
+        "sale_time": sale_timestamp(vehicle, now),
+        "year": -1 if year is None else year,
+        "status": normalize_label(vehicle.get("sale_status")),
+        "damage": normalize_label(vehicle.get("damage")),
+        "yard": normalize_label(vehicle.get("location")),
+    }
+
+
+class _FileLock:
+    """flock() on a sidecar file - shared for readers, exclusive for appends and compaction"""
+
+    def __init__(self, path, exclusive):
+        self.path = path
+        self.exclusive = exclusive
+
+    def __enter__(self):
+        self.handle = open(self.path, 'a')
+        if fcntl:
+            fcntl.flock(self.handle, fcntl.LOCK_EX if self.exclusive else fcntl.LOCK_SH)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl:
+            fcntl.flock(self.handle, fcntl.LOCK_UN)
+        self.handle.close()
+
+
+class BidHistory:
+    """Bid time series for every lot ever published
+
+    Rows live in `columns.npz` (compacted, sorted by lot then time) plus `log.ndjson`
+    (appended since the last compaction). Both are loaded into one set of NumPy columns,
+    refreshed incrementally when another process appends or compacts.
+    """
+
+    def __init__(self, directory=None, compact_every=5000):
+        self.directory = directory or os.environ.get('BID_HISTORY_DIR', DEFAULT_DIR)
+        self.compact_every = compact_every
+        os.makedirs(self.directory, exist_ok=True)
+        self.segment_path = os.path.join(self.directory, 'columns.npz')
+        self.log_path = os.path.join(self.directory, 'log.ndjson')
+        self.lock_path = os.path.join(self.directory, '.lock')
+        self.lock = threading.Lock()
+
+        self._segment_stat = None
+        self._segment = None  # compacted columns
+        self._log_offset = 0
+        self._log_rows = []  # rows read from the log
+        self._columns = None  # segment + log rows, sorted by (lot, ts); None when stale
+        self._last = {}  # lot -> (bid, status) of its newest row, for change detection
+
+    # -- loading ---------------------------------------------------------
+
+    def _refresh(self):
+        """Pick up compactions and appends from any process (call with self.lock held)"""
+        with _FileLock(self.lock_path, exclusive=False):
+            try:
+                stat = os.stat(self.segment_path)
+                segment_stat = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            except FileNotFoundError:
+                segment_stat = None
+            if segment_stat != self._segment_stat:
+                self._segment_stat = segment_stat
+                self._segment = self._read_segment() if segment_stat else None
+                self._log_offset = 0
+                self._log_rows = []
+                self._columns = None
+                self._last = self._last_from_segment()
+
+            if os.path.exists(self.log_path) and os.path.getsize(self.log_path) > self._log_offset:
+                with open(self.log_path, encoding='utf-8') as f:
+                    f.seek(self._log_offset)
+                    for line in f:
+                        if not line.endswith('\n'):
+                            break  # torn write - read it next time
+                        self._log_offset += len(line.encode('utf-8'))
+                        try:
+                            row = json.loads(line)
+                        except ValueError:
+                            continue
+                        self._log_rows.append(row)
+                        self._last[row["lot"]] = (row["bid"], row["status"])
+                        self._columns = None
+
+    def _read_segment(self):
+        with np.load(self.segment_path, allow_pickle=False) as data:
+            return {name: data[name] for name in data.files}
+
+    def _last_from_segment(self):
+        segment = self._segment
+        if segment is None or not len(segment["lot"]):
+            return {}
+        lots = segment["lot"]
+        last = np.flatnonzero(np.r_[lots[1:] != lots[:-1], True])
+        statuses = segment["status_values"]
+        return {int(lot): (int(bid), statuses[code] if code >= 0 else None)
+                for lot, bid, code in zip(lots[last], segment["bid"][last], segment["status"][last])}
+
+    def columns(self):
+        """Return all rows as NumPy columns sorted by (lot, ts); labels as codes + `<name>_values`"""
+        with self.lock:
+            self._refresh()
+            if self._columns is None:
+                self._columns = self._merge(self._segment, self._log_rows)
+            return self._columns
+
+    @staticmethod
+    def _merge(segment, rows):
+        """Combine a compacted segment and log rows into sorted, dictionary-encoded columns"""
+        columns = {}
+        for name, dtype in NUMERIC_COLUMNS.items():
+            tail = np.array([np.nan if row[name] is None else row[name] for row in rows], dtype=np.float64)
+            if dtype is not np.float64:
+                tail = tail.astype(dtype)
+            head = segment[name] if segment is not None else np.empty(0, dtype)
+            columns[name] = np.concatenate([head, tail]).astype(dtype, copy=False)
+        for name in LABEL_COLUMNS:
+            values = list(segment[f"{name}_values"]) if segment is not None else []
+            lookup = {value: code for code, value in enumerate(values)}
+            tail_codes = []
+            for row in rows:
+                value = row[name]
+                if value is None:
+                    tail_codes.append(-1)
+                    continue
+                if value not in lookup:
+                    lookup[value] = len(values)
+                    values.append(value)
+                tail_codes.append(lookup[value])
+            head = segment[name] if segment is not None else np.empty(0, np.int32)
+            columns[name] = np.concatenate([head, np.array(tail_codes, dtype=np.int32)])
+            columns[f"{name}_values"] = np.array(values, dtype=str)
+
+        order = np.lexsort((columns["ts"], columns["lot"]))
+        if rows and not np.array_equal(order, np.arange(len(order))):
+            for name in list(NUMERIC_COLUMNS) + list(LABEL_COLUMNS):
+                columns[name] = columns[name][order]
+        return columns
+
+    # -- writing ---------------------------------------------------------
+
+    def record(self, vehicles, now=None):
+        """Append a row for every vehicle whose bid or status changed; returns rows written"""
+        now = now if now is not None else time.time()
+        with self.lock:
+            self._refresh()
+            lines = []
+            for vehicle in vehicles:
+                row = history_row(vehicle, now)
+                if row is None or self._last.get(row["lot"]) == (row["bid"], row["status"]):
+                    continue
+                self._last[row["lot"]] = (row["bid"], row["status"])
+                lines.append(json.dumps(row) + "\n")
+            if lines:
+                with _FileLock(self.lock_path, exclusive=True):
+                    with open(self.log_path, 'a', encoding='utf-8') as f:
+                        f.write(''.join(lines))
+            pending = len(self._log_rows) + len(lines)
+        if pending >= self.compact_every:
+            self.compact()
+        return len(lines)
+
+    def compact(self):
+        """Fold the log into the column file (atomic replace) and truncate the log"""
+        with self.lock:
+            with _FileLock(self.lock_path, exclusive=True):
+                segment = self._read_segment() if os.path.exists(self.segment_path) else None
+                rows = []
+                if os.path.exists(self.log_path):
+                    with open(self.log_path, encoding='utf-8') as f:
+                        for line in f:
+                            try:
+                                rows.append(json.loads(line))
+                            except ValueError:
+                                continue
+                if not rows:
+                    return 0
+                columns = self._merge(segment, rows)
+                tmp_path = self.segment_path + '.tmp.npz'
+                np.savez(tmp_path, **columns)
+                os.replace(tmp_path, self.segment_path)
+                open(self.log_path, 'w').close()
+            self._segment_stat = None  # reload on next access
+            print(f"🗜️  Compacted {len(rows)} bid history rows ({len(columns['lot'])} total)")
+            return len(rows)
+
+    # -- queries ---------------------------------------------------------
+
+    def lot_history(self, lot_number):
+        """Return [{ts, bid, status}] for a lot, oldest first"""
+        columns = self.columns()
+        lot = int(str(lot_number).strip())
+        start, end = np.searchsorted(columns["lot"], [lot, lot + 1])
+        statuses = columns["status_values"]
+        return [{
+            "ts": float(ts),
+            "bid": int(bid) if bid >= 0 else None,
+            "status": str(statuses[code]) if code >= 0 else None,
+        } for ts, bid, code in zip(columns["ts"][start:end], columns["bid"][start:end],
+                                   columns["status"][start:end])]
+
+    def final_bids(self, now=None, since=None):
+        """Indices of each sold lot's last row (sale time passed, bid known), optionally sold after `since`"""
+        columns = self.columns()
+        lots = columns["lot"]
+        if not len(lots):
+            return np.empty(0, dtype=np.int64)
+        now = now if now is not None else time.time()
+        last = np.flatnonzero(np.r_[lots[1:] != lots[:-1], True])
+        sale_time = columns["sale_time"][last]
+        sold = (sale_time < now) & (columns["bid"][last] >= 0)
+        if since is not None:
+            sold &= sale_time >= since
+        return last[sold]
+
+    def aggregate(self, by=GROUP_FIELDS, now=None, since=None):
+        """Final-bid statistics of sold lots grouped by any of year/damage/yard
+
+        Returns [{<group fields>, count, median, mean, min, max}], largest groups first.
+        """
+        for field in by:
+            if field not in GROUP_FIELDS:
+                raise ValueError(f"Cannot group by {field!r} (use {', '.join(GROUP_FIELDS)})")
+        columns = self.columns()
+        rows = self.final_bids(now, since)
+        if not len(rows):
+            return []
+        bids = columns["bid"][rows]
+        keys = [columns[field][rows] for field in by]
+
+        inverse, groups = group_rows(keys, len(rows))
+
+        # Sort by (group, bid) once; each group's median is then a positional lookup
+        order = np.lexsort((bids, inverse))
+        sorted_bids = bids[order]
+        counts = np.bincount(inverse, minlength=len(groups))
+        starts = np.r_[0, np.cumsum(counts)[:-1]]
+        medians = (sorted_bids[starts + (counts - 1) // 2] + sorted_bids[starts + counts // 2]) / 2
+        sums = np.bincount(inverse, weights=bids, minlength=len(groups))
+        minimums = sorted_bids[starts]
+        maximums = sorted_bids[starts + counts - 1]
+
+        results = []
+        for g in np.argsort(-counts, kind='stable'):
+            group = {}
+            for field, value in zip(by, groups[g]):
+                if field == "year":
+                    group[field] = int(value) if value >= 0 else None
+                else:
+                    group[field] = str(columns[f"{field}_values"][value]) if value >= 0 else None
+            group.update({
+                "count": int(counts[g]),
+                "median": float(medians[g]),
+                "mean": round(float(sums[g] / counts[g]), 2),
+                "min": int(minimums[g]),
+                "max": int(maximums[g]),
+            })
+            results.append(group)
+        return results
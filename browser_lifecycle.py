@@ -0,0 +1,156 @@
+"""
+Browser page/context lifecycle management
+Heavy Angular lot pages leak memory into a long-lived page, so the scraper's page is
+recycled after a number of navigations or once its JS heap (read over CDP with
+Performance.getMetrics) grows too large, and the whole context every few pages.
+Recycling only happens right before a navigation, when no page work is in flight.
+"""
+import os
+import time
+import threading
+from collections import deque
+
+
+# Reports of finished scraper runs in this process, newest last (served by /api/browser)
+recent_reports = deque(maxlen=20)
+_reports_lock = threading.Lock()
+
+
+class BrowserLifecycle:
+    """Tracks navigations and heap size of a CopartScraper's page and recycles it
+
+    max_navigations: navigations before the page is replaced
+    max_heap_mb: JS heap size that triggers a replacement at the next navigation
+    pages_per_context: page replacements before the whole context is replaced too
+    """
+
+    def __init__(self, scraper, max_navigations=None, max_heap_mb=None, pages_per_context=None):
+        self.scraper = scraper
+        self.max_navigations = max_navigations or int(os.environ.get('BROWSER_MAX_NAVIGATIONS', 25))
+        self.max_heap_mb = max_heap_mb or float(os.environ.get('BROWSER_MAX_HEAP_MB', 300))
+        self.pages_per_context = pages_per_context or int(os.environ.get('BROWSER_PAGES_PER_CONTEXT', 4))
+
+        self.started_at = time.time()
+        self.navigations = 0  # total
+        self.page_navigations = 0  # since the current page was opened
+        self.context_pages = 0  # pages opened in the current context
+        self.pages_recycled = 0
+        self.contexts_recycled = 0
+        self.recycle_reason = None  # set when the page should be replaced before the next navigation
+        self.samples = []  # (seconds since start, JS heap used MB, DOM nodes)
+        self._cdp = None
+        self._cdp_page = None
+
+    # -- metrics ---------------------------------------------------------
+
+    def _metrics(self):
+        """Return Performance.getMetrics as {name: value}, or None when CDP is unavailable"""
+        page = self.scraper.page
+        try:
+            if self._cdp is None or self._cdp_page is not page:
+                self._cdp = page.context.new_cdp_session(page)
+                self._cdp.send('Performance.enable')
+                self._cdp_page = page
+            result = self._cdp.send('Performance.getMetrics')
+        except Exception:
+            self._cdp = None
+            return None
+        return {metric['name']: metric['value'] for metric in result.get('metrics', [])}
+
+    def sample(self):
+        """Record the current JS heap size; returns it in MB (None if unknown)"""
+        metrics = self._metrics()
+        if not metrics:
+            return None
+        heap_mb = metrics.get('JSHeapUsedSize', 0) / (1024 * 1024)
+        self.samples.append((round(time.time() - self.started_at, 1), round(heap_mb, 1), int(metrics.get('Nodes', 0))))
+        return heap_mb
+
+    # -- hooks called by CopartScraper._goto -----------------------------
+
+    def before_navigation(self):
+        """Recycle the page (and maybe the context) if a threshold was crossed"""
+        if self.page_navigations >= self.max_navigations and not self.recycle_reason:
+            self.recycle_reason = f"{self.page_navigations} navigations"
+        if self.recycle_reason:
+            self.recycle()
+        self.navigations += 1
+        self.page_navigations += 1
+
+    def after_navigation(self):
+        """Sample the heap after a page load and schedule a recycle if it grew too large"""
+        heap_mb = self.sample()
+        if heap_mb is not None and heap_mb > self.max_heap_mb and not self.recycle_reason:
+            self.recycle_reason = f"JS heap {heap_mb:.0f} MB"
+
+    # -- recycling -------------------------------------------------------
+
+    def recycle(self):
+        """Open a fresh page (in a fresh context every pages_per_context pages), then close the old one"""
+        scraper = self.scraper
+        old_page = scraper.page
+        old_context = old_page.context
+        reason, self.recycle_reason = self.recycle_reason, None
+        new_context = self.context_pages + 1 >= self.pages_per_context
+        try:
+            context = scraper.new_context() if new_context else old_context
+            scraper.page = context.new_page()
+        except Exception as e:
+            print(f"⚠️  Could not recycle browser page ({reason}): {e}")
+            scraper.page = old_page
+            return
+
+        try:
+            old_page.close()
+            if new_context:
+                old_context.close()
+        except Exception:
+            pass  # e.g. Browserless' default context cannot be closed
+        self._cdp = None
+        self.page_navigations = 0
+        self.pages_recycled += 1
+        if new_context:
+            self.context_pages = 0
+            self.contexts_recycled += 1
+        else:
+            self.context_pages += 1
+        print(f"♻️  Recycled browser {'context' if new_context else 'page'} ({reason})")
+
+    def page_replaced(self):
+        """The scraper swapped in another page of the current context (a hedged navigation that won)"""
+        self._cdp = None
+        self.page_navigations = 1
+        self.context_pages += 1
+
+    # -- reporting -------------------------------------------------------
+
+    def report(self):
+        """Summary of the run's navigations, recycles and heap samples"""
+        heaps = [heap for _, heap, _ in self.samples]
+        return {
+            "started_at": self.started_at,
+            "duration": round(time.time() - self.started_at, 1),
+            "navigations": self.navigations,
+            "pages_recycled": self.pages_recycled,
+            "contexts_recycled": self.contexts_recycled,
+            "heap_mb": {
+                "first": heaps[0] if heaps else None,
+                "last": heaps[-1] if heaps else None,
+                "peak": max(heaps) if heaps else None,
+                "mean": round(sum(heaps) / len(heaps), 1) if heaps else None,
+            },
+            "samples": self.samples[-200:],
+        }
+
+    def finish(self):
+        """Print and keep the run's report (called when the scraper closes)"""
+        if not self.navigations:
+            return None
+        report = self.report()
+        heap = report["heap_mb"]
+        print(f"🧠 Browser memory: {report['navigations']} navigations, {report['pages_recycled']} pages / "
+              f"{report['contexts_recycled']} contexts recycled, JS heap first {heap['first']} MB, "
+              f"peak {heap['peak']} MB, last {heap['last']} MB")
+        with _reports_lock:
+            recent_reports.append(report)
+        return report
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""Command-line batch scraper - writes one NDJSON vehicle per line to stdout as each is ready
+
+Usage:
+    python cli.py search [--search-url URL ...] [--states MD,NJ] [--limit N] [--resume]
+    python cli.py lots [FILE ...] [--states MD,NJ] [--workers N] [--limit N] [--resume]
+    python cli.py watch [--max-lots N] [--once]
+    python cli.py reextract [--kind search|lot|json] [--since EPOCH] [--workers N]
+    python cli.py images [--workers N] [--max-per-lot N]
+
+Lot lists are read from the given files, or stdin when no file (or "-") is given.
+Scraper progress goes to stderr, so stdout can be piped straight into other tools.
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import contextlib
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+class NDJSONWriter:
+    """Write vehicles to a stream, one JSON document per line, flushed immediately"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.count = 0
+
+    def __call__(self, vehicle):
+        if not vehicle:
+            return
+        self.stream.write(json.dumps(vehicle) + "\n")
+        self.stream.flush()
+        self.count += 1
+
+
+def read_lot_numbers(paths):
+    """Read lot numbers (one or more per line, '#' comments allowed) from files or stdin"""
+    lots = []
+    seen = set()
+    for path in paths or ['-']:
+        handle = sys.stdin if path == '-' else open(path, encoding='utf-8')
+        try:
+            for line in handle:
+                line = line.split('#', 1)[0]
+                for lot_number in re.findall(r'(?:1-)?(\d{6,9})', line):
+                    if lot_number not in seen:
+                        seen.add(lot_number)
+                        lots.append(lot_number)
+        finally:
+            if handle is not sys.stdin:
+                handle.close()
+    return lots
+
+
+def open_journal(args):
+    """Return a RunJournal when --resume was given"""
+    if not args.resume:
+        return None
+    from journal import RunJournal
+    return RunJournal.resume_or_start(args.journal_dir)
+
+
+def publish(vehicles, args):
+    """Write the run's vehicles to the shared snapshot store when --publish was given"""
+    if not args.publish:
+        return
+    from snapshot import VehicleSnapshot
+    from snapshot_store import SnapshotStore
+    from bid_history import BidHistory
+    from alerts import get_engine
+    snapshot = VehicleSnapshot(store=SnapshotStore(args.snapshot_db), history=BidHistory(), alerts=get_engine())
+    entry = snapshot.publish(vehicles)
+    if entry:
+        version, added, removed, updated = entry
+        print(f"💾 Published snapshot version {version}: +{len(added)} -{len(removed)} ~{len(updated)}")
+    else:
+        print("💾 Snapshot unchanged")
+    if snapshot.alerts is not None:
+        snapshot.alerts.close()  # Send the new alerts before the process exits
+
+
+def parse_states(args):
+    """States from --states ("MD,NJ"), or None for the scraper's default"""
+    return [state.strip().upper() for state in args.states.split(',')] if args.states else None
+
+
+def run_search(args, emit):
+    from scraper import scrape_copart_corolla, DEFAULT_SEARCHES
+
+    searches = DEFAULT_SEARCHES
+    if args.search_url:
+        searches = [(f"search {i}", url, args.per_search) for i, url in enumerate(args.search_url, 1)]
+    states = parse_states(args)
+
+    journal = open_journal(args)
+    try:
+        vehicles = scrape_copart_corolla(limit=args.limit, journal=journal, searches=searches,
+                                         states=states, on_vehicle=emit, budget=args.budget)
+    finally:
+        if journal:
+            journal.close()
+    return vehicles
+
+
+def run_lots(args, emit):
+    lot_numbers = read_lot_numbers(args.files)[:args.limit]
+    print(f"📋 {len(lot_numbers)} lots to scrape")
+    journal = open_journal(args)
+    try:
+        if args.workers > 1:
+            from sharded import iter_lots_sharded, LiveLotTask
+
+            vehicles = []
+            todo = []
+            for lot_number in lot_numbers:
+                if journal and journal.has_lot(lot_number):
+                    emit(journal.lot_result(lot_number))
+                else:
+                    todo.append(lot_number)
+            failed = set()  # Lots that errored, ran out of budget or were lost with a worker - left for --resume
+            task = LiveLotTask(log_to_stderr=True, states=parse_states(args), budget=args.budget)
+            for lot_number, vehicle in iter_lots_sharded(todo, workers=args.workers, failed=failed, task=task):
+                if lot_number in failed:
+                    continue
+                if journal:
+                    journal.record_lot(lot_number, vehicle)
+                if vehicle:
+                    vehicles.append(vehicle)
+                emit(vehicle)
+            if failed:
+                print(f"⚠️  {len(failed)} lots could not be scraped" +
+                      (" - the run journal stays open for --resume" if journal else ""))
+            if journal:
+                if not failed:
+                    journal.finish()
+                vehicles = journal.vehicles(lot_numbers)
+            return vehicles
+
+        from scraper import CopartScraper
+        from deadline import Deadline
+        scraper = CopartScraper(states=parse_states(args))
+        scraper.deadline = Deadline(args.budget)
+        try:
+            return scraper.scrape_multiple_lots(lot_numbers, limit=len(lot_numbers),
+                                                journal=journal, on_vehicle=emit)
+        finally:
+            scraper.close()
+    finally:
+        if journal:
+            journal.close()
+
+
+def run_watch(args, emit):
+    """Keep the snapshot's bids and sale status fresh, closing-soon lots first"""
+    from scraper import CopartScraper
+    from deadline import Deadline
+    from snapshot import VehicleSnapshot, vehicle_key
+    from snapshot_store import SnapshotStore
+    from refresh_scheduler import RefreshScheduler, refresh_due_lots
+    from bid_history import BidHistory
+    from alerts import get_engine
+
+    snapshot = VehicleSnapshot(store=SnapshotStore(args.snapshot_db), history=BidHistory(), alerts=get_engine())
+    scheduler = RefreshScheduler()
+    scraper = CopartScraper()
+    scraper.setup_browser()
+    try:
+        while True:
+            snapshot.sync()
+            scraper.deadline = Deadline(args.budget)
+            vehicles, refreshed = refresh_due_lots(scraper, snapshot.as_list(), scheduler, max_lots=args.max_lots)
+            if refreshed:
+                snapshot.publish(vehicles)
+                fresh = set(refreshed)
+                for vehicle in vehicles:
+                    if vehicle_key(vehicle) in fresh:
+                        emit(vehicle)
+                print(f"🔄 Refreshed {len(refreshed)} lots (snapshot version {snapshot.version})")
+            if args.once:
+                return []
+            next_due = scheduler.next_due()
+            wait = 60 if next_due is None else next_due - time.time()
+            time.sleep(min(max(wait, 1), 300))
+    finally:
+        scraper.close()
+        if snapshot.alerts is not None:
+            snapshot.alerts.close()
+
+
+def run_reextract(args, emit):
+    """Rerun the current extractors over archived pages - no browser, all CPUs"""
+    from page_archive import PageArchive, SEARCH, LOT, JSON
+    from lot_fetcher import is_lot_details_url
+    from sharded import iter_lots_sharded, resolve_worker_count, ArchiveTask
+    from scraper import passes_search_filters
+    from snapshot import vehicle_key
+
+    archive = PageArchive(args.archive_dir)
+    entries = [entry for entry in archive.entries(kind=args.kind, since=args.since, latest_only=not args.all_fetches)
+               if entry['kind'] in (SEARCH, LOT) or (entry['kind'] == JSON and is_lot_details_url(entry['url']))]
+    workers = resolve_worker_count(args.workers)
+    print(f"📦 Re-extracting {len(entries)} archived pages across {workers} workers")
+
+    # Search rows are merged first and lot pages/JSON over them, each oldest first (entries are
+    # in fetch order), so a lot page's fields win over any search row and newer fetches win
+    kinds = {entry['id']: entry['kind'] for entry in entries}
+    search_rows, lot_results = [], []
+    for entry_id, vehicles in iter_lots_sharded([entry['id'] for entry in entries], workers=workers,
+                                                task=ArchiveTask(args.archive_dir)):
+        for vehicle in vehicles or []:
+            if kinds[entry_id] == SEARCH:
+                if passes_search_filters(vehicle):
+                    search_rows.append(vehicle)
+            else:
+                lot_results.append(vehicle)
+    merged = {}
+    for vehicle in search_rows + lot_results:
+        key = vehicle_key(vehicle)
+        merged[key] = {**merged.get(key, {}), **vehicle}
+    for vehicle in merged.values():
+        emit(vehicle)
+    return list(merged.values())
+
+
+def run_images(args, emit):
+    """Download the photos of every lot in the snapshot store into the local image archive"""
+    from snapshot import VehicleSnapshot
+    from snapshot_store import SnapshotStore
+    from image_archive import ImageArchive
+
+    snapshot = VehicleSnapshot(store=SnapshotStore(args.snapshot_db))
+    snapshot.sync()
+    archive = ImageArchive(workers=args.workers)
+    vehicles = snapshot.as_list()
+    print(f"📸 Archiving photos of {len(vehicles)} lots with {args.workers} download threads...")
+    started = time.time()
+    stored = archive.archive_vehicles(vehicles, max_images=args.max_per_lot)
+    print(f"✅ Stored {stored} new images ({archive.downloaded_bytes / 1e6:.1f} MB, "
+          f"{archive.deduplicated} duplicates, {archive.skipped} already archived) in {time.time() - started:.1f}s")
+    print(f"   Archive: {archive.stats()}")
+    return []
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--resume', action='store_true', help='continue the newest unfinished run journal')
+    parser.add_argument('--journal-dir', default=None, help='run journal directory (default: SCRAPE_JOURNAL_DIR or data/runs)')
+    parser.add_argument('--publish', action='store_true', help='also write the results to the snapshot store')
+    parser.add_argument('--budget', type=float, default=None, help='stop after this many seconds and output what was scraped so far')
+    parser.add_argument('--profile', action='store_true', help='profile the run and write a report to PROFILE_DIR (default data/profiles)')
+    parser.add_argument('--snapshot-db', default=None, help='snapshot store path (default: SNAPSHOT_DB or data/snapshot.db)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    search = commands.add_parser('search', help='run Copart searches and enrich each lot')
+    search.add_argument('--search-url', action='append', help='lotSearchResults URL to run (repeatable; default: the Corolla search)')
+    search.add_argument('--per-search', type=int, default=20, help='max vehicles taken from each search page')
+    search.add_argument('--states', help='comma separated states to keep (default: MD,DC,NJ,NY)')
+    search.add_argument('--limit', type=int, default=1000)
+    search.set_defaults(func=run_search)
+
+    lots = commands.add_parser('lots', help='scrape a list of lot numbers')
+    lots.add_argument('files', nargs='*', help='files with lot numbers ("-" or nothing for stdin)')
+    lots.add_argument('--states', help='comma separated states to keep (default: MD,DC,NJ,NY)')
+    lots.add_argument('--workers', type=int, default=1, help='worker processes, one browser each')
+    lots.add_argument('--limit', type=int, default=100000)
+    lots.set_defaults(func=run_lots)
+
+    watch = commands.add_parser('watch', help='keep bids/sale status in the snapshot store fresh, closing-soon lots first')
+    watch.add_argument('--max-lots', type=int, default=20, help='lots refreshed per pass')
+    watch.add_argument('--once', action='store_true', help='run a single pass and exit')
+    watch.set_defaults(func=run_watch)
+
+    reextract = commands.add_parser('reextract', help='rerun the extractors over the page archive (no browser)')
+    reextract.add_argument('--kind', choices=['search', 'lot', 'json'], help='only this page kind (json: lot details fetched over HTTP)')
+    reextract.add_argument('--since', type=float, help='only pages fetched after this epoch time')
+    reextract.add_argument('--all-fetches', action='store_true', help='every fetch, not just the newest per page')
+    reextract.add_argument('--workers', type=int, default=None, help='worker processes (default: SCRAPER_WORKERS or CPU count)')
+    reextract.add_argument('--archive-dir', default=None, help='page archive (default: PAGE_ARCHIVE_DIR or data/pages)')
+    reextract.set_defaults(func=run_reextract)
+
+    images = commands.add_parser('images', help='archive the photos of the lots in the snapshot store')
+    images.add_argument('--workers', type=int, default=8, help='concurrent downloads')
+    images.add_argument('--max-per-lot', type=int, default=10, help='photos to keep per lot')
+    images.set_defaults(func=run_images)
+
+    args = parser.parse_args()
+    if args.profile:
+        os.environ['SCRAPE_PROFILE'] = '1'
+
+    # Everything the scraper prints goes to stderr; stdout carries only NDJSON
+    emit = NDJSONWriter(sys.stdout)
+    with contextlib.redirect_stdout(sys.stderr):
+        vehicles = args.func(args, emit)
+        print(f"✅ Wrote {emit.count} vehicles")
+        if args.command not in ('watch', 'images'):
+            publish(vehicles or [], args)
+    return 0 if emit.count or args.command in ('watch', 'images') else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""
+Time budgets for scrape runs
+A Deadline is handed down the pipeline so every wait uses the time that is left instead
+of a fixed timeout, and a run that runs out of time returns what it has, marked partial
+"""
+import math
+import time
+
+
+class DeadlineExceeded(Exception):
+    """Raised instead of starting work that cannot finish before the deadline"""
+
+
+class Deadline:
+    """Absolute time.monotonic() deadline; Deadline(None) never expires"""
+
+    def __init__(self, seconds=None):
+        self.budget = seconds
+        self.at = None if seconds is None else time.monotonic() + seconds
+
+    def remaining(self):
+        """Seconds left (never negative), or None without a budget"""
+        if self.at is None:
+            return None
+        return max(0.0, self.at - time.monotonic())
+
+    def expired(self):
+        return self.at is not None and time.monotonic() >= self.at
+
+    def check(self, what="work"):
+        if self.expired():
+            raise DeadlineExceeded(f"Time budget of {self.budget:.0f}s used up before {what}")
+
+    def timeout_ms(self, default_ms):
+        """A Playwright timeout: `default_ms` capped to the time left (at least 1ms - 0 means no timeout)"""
+        remaining = self.remaining()
+        if remaining is None:
+            return default_ms
+        # Rounded up, so a wait cut short by the deadline ends with the deadline expired()
+        return max(1, math.ceil(min(default_ms, remaining * 1000)))
+
+    def sleep(self, seconds):
+        """Sleep up to `seconds`, cut short by the deadline"""
+        remaining = self.remaining()
+        if remaining is not None:
+            seconds = min(seconds, remaining)
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class ScrapeResult(list):
+    """List of vehicles that also says whether the run stopped early"""
+
+    def __init__(self, vehicles=(), partial=False, reason=None):
+        super().__init__(vehicles)
+        self.partial = partial
+        self.reason = reason
@@ -0,0 +1,181 @@
+"""
+Streaming exports of the snapshot and the bid history for /api/export
+Rows are read in batches and written out in chunks of about CHUNK_BYTES, so an export of
+100k lots is sent with chunked transfer encoding and never held in memory at once.
+Parquet needs pyarrow (optional: pip install pyarrow); CSV and NDJSON have no extra dependencies.
+"""
+import io
+import csv
+import json
+import time
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Optional - only format=parquet needs it
+    pyarrow = None
+
+
+CHUNK_BYTES = 64 * 1024
+PARQUET_ROW_GROUP = 10000
+
+# Columns of a lot export (CSV and Parquet); NDJSON keeps every field
+LOT_COLUMNS = (
+    "lot_number", "year", "make", "model", "damage", "location", "location_state",
+    "odometer", "current_bid", "auction_countdown", "sale_time_utc", "sale_info",
+    "title", "condition", "url", "refreshed_at", "image",
+)
+
+HISTORY_COLUMNS = ("lot", "ts", "bid", "status", "sale_time", "year", "damage", "yard")
+
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def lot_row(vehicle):
+    """Flatten a vehicle for CSV/Parquet (first photo only, missing values as None)"""
+    row = {}
+    for column in LOT_COLUMNS:
+        if column == "image":
+            images = vehicle.get("images") or []
+            value = images[0] if images else None
+        else:
+            value = vehicle.get(column)
+        row[column] = None if value in (None, "N/A") else str(value)
+    return row
+
+
+def iter_lots(store, predicate=None):
+    """Return (version, iterator of vehicles from the snapshot store, optionally filtered)"""
+    version, vehicles = store.iter_vehicles()
+    if predicate is None:
+        return version, vehicles
+    now = time.time()
+    return version, (vehicle for vehicle in vehicles if predicate(vehicle, now))
+
+
+def iter_history(history, since=None, batch=5000):
+    """Bid history rows {lot, ts, bid, status, ...}, sorted by (lot, ts), optionally only after `since`"""
+    columns = history.columns()
+    labels = {name: columns[f"{name}_values"] for name in ("status", "damage", "yard")}
+    for start in range(0, len(columns["lot"]), batch):
+        chunk = {name: columns[name][start:start + batch] for name in HISTORY_COLUMNS}
+        for i in range(len(chunk["lot"])):
+            ts = float(chunk["ts"][i])
+            if since is not None and ts < since:
+                continue
+            row = {"lot": int(chunk["lot"][i]), "ts": ts}
+            bid, year = int(chunk["bid"][i]), int(chunk["year"][i])
+            row["bid"] = bid if bid >= 0 else None
+            sale_time = float(chunk["sale_time"][i])
+            row["sale_time"] = sale_time if sale_time == sale_time else None
+            for name, values in labels.items():
+                code = int(chunk[name][i])
+                row[name] = str(values[code]) if code >= 0 else None
+            row["year"] = year if year >= 0 else None
+            yield {name: row[name] for name in HISTORY_COLUMNS}
+
+
+def stream_ndjson(rows):
+    buffer = []
+    size = 0
+    for row in rows:
+        line = json.dumps(row) + "\n"
+        buffer.append(line)
+        size += len(line)
+        if size >= CHUNK_BYTES:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def stream_csv(rows, columns):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction='ignore')
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= CHUNK_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that collects bytes until they are taken"""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def take(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_parquet(rows, schema, row_group=PARQUET_ROW_GROUP):
+    """Parquet file written one row group at a time; schema is {column: "string"|"int64"|"float64"}"""
+    if pyarrow is None:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+    arrow_schema = pyarrow.schema([(name, getattr(pyarrow, kind)()) for name, kind in schema.items()])
+    sink = _ChunkSink()
+    writer = pyarrow.parquet.ParquetWriter(sink, arrow_schema, compression='zstd')
+    batch = []
+
+    def flush():
+        writer.write_table(pyarrow.Table.from_pylist(batch, schema=arrow_schema), row_group_size=row_group)
+        batch.clear()
+
+    try:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= row_group:
+                flush()
+                yield sink.take()
+        if batch:
+            flush()
+    finally:
+        writer.close()
+    yield sink.take()
+
+
+LOT_SCHEMA = {column: "string" for column in LOT_COLUMNS}
+HISTORY_SCHEMA = {"lot": "int64", "ts": "float64", "bid": "int64", "status": "string",
+                  "sale_time": "float64", "year": "int64", "damage": "string", "yard": "string"}
+
+
+def export_lots(fmt, vehicles):
+    """Chunks of a lot export in `fmt` (csv, ndjson or parquet)"""
+    if fmt == "ndjson":
+        return stream_ndjson(vehicles)
+    rows = (lot_row(vehicle) for vehicle in vehicles)
+    if fmt == "csv":
+        return stream_csv(rows, LOT_COLUMNS)
+    return stream_parquet(rows, LOT_SCHEMA)
+
+
+def export_history(fmt, rows):
+    """Chunks of a bid history export in `fmt`"""
+    if fmt == "ndjson":
+        return stream_ndjson(rows)
+    if fmt == "csv":
+        return stream_csv(rows, HISTORY_COLUMNS)
+    return stream_parquet(rows, HISTORY_SCHEMA)
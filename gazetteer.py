@@ -0,0 +1,290 @@
+"""
+Yard/location gazetteer for lot pages and search rows
+Copart yards, city names, US state names and codes and the page labels that introduce a
+location (Location, Location / Lane, Sale doc) are compiled once into a single regex, so a
+page's text is scanned in one pass instead of one search per keyword, city and state.
+resolve() turns the hits into the lot's yard, city and state plus the states named after
+the Location/Lane and Sale doc labels.
+"""
+import re
+
+
+STATES = {
+    'AL': 'Alabama', 'AK': 'Alaska', 'AZ': 'Arizona', 'AR': 'Arkansas', 'CA': 'California',
+    'CO': 'Colorado', 'CT': 'Connecticut', 'DE': 'Delaware', 'DC': 'District of Columbia',
+    'FL': 'Florida', 'GA': 'Georgia', 'HI': 'Hawaii', 'ID': 'Idaho', 'IL': 'Illinois',
+    'IN': 'Indiana', 'IA': 'Iowa', 'KS': 'Kansas', 'KY': 'Kentucky', 'LA': 'Louisiana',
+    'ME': 'Maine', 'MD': 'Maryland', 'MA': 'Massachusetts', 'MI': 'Michigan', 'MN': 'Minnesota',
+    'MS': 'Mississippi', 'MO': 'Missouri', 'MT': 'Montana', 'NE': 'Nebraska', 'NV': 'Nevada',
+    'NH': 'New Hampshire', 'NJ': 'New Jersey', 'NM': 'New Mexico', 'NY': 'New York',
+    'NC': 'North Carolina', 'ND': 'North Dakota', 'OH': 'Ohio', 'OK': 'Oklahoma', 'OR': 'Oregon',
+    'PA': 'Pennsylvania', 'RI': 'Rhode Island', 'SC': 'South Carolina', 'SD': 'South Dakota',
+    'TN': 'Tennessee', 'TX': 'Texas', 'UT': 'Utah', 'VT': 'Vermont', 'VA': 'Virginia',
+    'WA': 'Washington', 'WV': 'West Virginia', 'WI': 'Wisconsin', 'WY': 'Wyoming',
+}
+
+# Copart yard names ("NJ - TRENTON") by state
+YARDS = {
+    'AL': ['BIRMINGHAM', 'DOTHAN', 'MOBILE', 'MONTGOMERY', 'TANNER'],
+    'AK': ['ANCHORAGE'],
+    'AZ': ['PHOENIX', 'TUCSON'],
+    'AR': ['FAYETTEVILLE', 'LITTLE ROCK'],
+    'CA': ['ANTELOPE', 'BAKERSFIELD', 'FRESNO', 'HAYWARD', 'LONG BEACH', 'LOS ANGELES', 'MARTINEZ',
+           'RANCHO CUCAMONGA', 'REDDING', 'SACRAMENTO', 'SAN BERNARDINO', 'SAN DIEGO', 'SAN JOSE',
+           'SO SACRAMENTO', 'SUN VALLEY', 'VALLEJO', 'VAN NUYS'],
+    'CO': ['COLORADO SPRINGS', 'DENVER', 'DENVER CENTRAL', 'DENVER SOUTH'],
+    'CT': ['HARTFORD', 'HARTFORD SPRINGFIELD'],
+    'DC': ['WASHINGTON DC'],
+    'DE': ['NEW CASTLE', 'SEAFORD'],
+    'FL': ['FT. PIERCE', 'JACKSONVILLE EAST', 'JACKSONVILLE NORTH', 'MIAMI CENTRAL', 'MIAMI NORTH',
+           'MIAMI SOUTH', 'ORLANDO NORTH', 'ORLANDO SOUTH', 'PUNTA GORDA', 'TALLAHASSEE',
+           'TAMPA SOUTH', 'WEST PALM BEACH'],
+    'GA': ['ATLANTA EAST', 'ATLANTA NORTH', 'ATLANTA SOUTH', 'ATLANTA WEST', 'CARTERSVILLE',
+           'FAIRBURN', 'MACON', 'SAVANNAH', 'TIFTON'],
+    'HI': ['HONOLULU'],
+    'ID': ['BOISE'],
+    'IL': ['CHICAGO NORTH', 'CHICAGO SOUTH', 'PEORIA', 'SOUTHERN ILLINOIS', 'WHEELING'],
+    'IN': ['CICERO', 'DYER', 'FORT WAYNE', 'HAMMOND', 'INDIANAPOLIS'],
+    'IA': ['DAVENPORT', 'DES MOINES'],
+    'KS': ['KANSAS CITY', 'WICHITA'],
+    'KY': ['EARLINGTON', 'LEXINGTON EAST', 'LEXINGTON WEST', 'LOUISVILLE', 'WALTON'],
+    'LA': ['BATON ROUGE', 'NEW ORLEANS', 'SHREVEPORT'],
+    'ME': ['LYMAN', 'WINDHAM'],
+    'MD': ['BALTIMORE', 'BALTIMORE EAST'],
+    'MA': ['FREETOWN', 'NORTH BOSTON', 'SOUTH BOSTON', 'WEST WARREN'],
+    'MI': ['DETROIT', 'FLINT', 'IONIA', 'KINCHELOE', 'LANSING', 'WAYLAND'],
+    'MN': ['MINNEAPOLIS', 'MINNEAPOLIS NORTH', 'ST. CLOUD'],
+    'MS': ['GRENADA', 'JACKSON'],
+    'MO': ['COLUMBIA', 'SIKESTON', 'SPRINGFIELD', 'ST. LOUIS'],
+    'MT': ['BILLINGS', 'HELENA'],
+    'NE': ['LINCOLN'],
+    'NV': ['LAS VEGAS', 'RENO'],
+    'NH': ['CANDIA'],
+    'NJ': ['GLASSBORO EAST', 'GLASSBORO WEST', 'SOMERVILLE', 'TRENTON'],
+    'NM': ['ALBUQUERQUE'],
+    'NY': ['ALBANY', 'BUFFALO', 'LONG ISLAND', 'NEWBURGH', 'ROCHESTER', 'SYRACUSE'],
+    'NC': ['CHINA GROVE', 'CONCORD', 'GASTONIA', 'LUMBERTON', 'MEBANE', 'MOCKSVILLE', 'RALEIGH',
+           'RALEIGH NORTH'],
+    'ND': ['BISMARCK'],
+    'OH': ['CLEVELAND EAST', 'CLEVELAND WEST', 'COLUMBUS', 'DAYTON'],
+    'OK': ['OKLAHOMA CITY', 'TULSA'],
+    'OR': ['EUGENE', 'PORTLAND NORTH', 'PORTLAND SOUTH'],
+    'PA': ['ALTOONA', 'CHAMBERSBURG', 'PHILADELPHIA', 'PHILADELPHIA EAST-SUBLOT', 'PITTSBURGH EAST',
+           'PITTSBURGH NORTH', 'PITTSBURGH WEST', 'SCRANTON', 'YORK HAVEN'],
+    'RI': ['EXETER'],
+    'SC': ['COLUMBIA', 'GREER', 'NORTH CHARLESTON', 'SPARTANBURG'],
+    'SD': ['RAPID CITY', 'SIOUX FALLS'],
+    'TN': ['KNOXVILLE', 'MEMPHIS', 'NASHVILLE'],
+    'TX': ['ABILENE', 'AMARILLO', 'AUSTIN', 'CORPUS CHRISTI', 'DALLAS', 'DALLAS SOUTH', 'EL PASO',
+           'FT. WORTH', 'HOUSTON', 'HOUSTON EAST', 'LONGVIEW', 'LUFKIN', 'MCALLEN', 'SAN ANTONIO',
+           'WACO'],
+    'UT': ['OGDEN', 'SALT LAKE CITY'],
+    'VT': ['RUTLAND'],
+    'VA': ['CHESAPEAKE', 'DANVILLE', 'FREDERICKSBURG', 'HAMPTON', 'RICHMOND', 'RICHMOND EAST'],
+    'WA': ['GRAHAM', 'NORTH SEATTLE', 'PASCO', 'SPOKANE'],
+    'WV': ['CHARLESTON'],
+    'WI': ['APPLETON', 'MADISON SOUTH', 'MILWAUKEE', 'MILWAUKEE NORTH', 'MILWAUKEE SOUTH'],
+    'WY': ['CASPER'],
+}
+
+# Cities matched before a state ("Baltimore MD", "TRENTON, New Jersey");
+# any other "City, ST" is still found by the capitalised-words pattern
+CITIES = [
+    'Baltimore', 'Annapolis', 'Frederick', 'Rockville', 'Gaithersburg', 'Columbia', 'Germantown',
+    'Waldorf', 'Laurel', 'Bethesda', 'Silver Spring', 'Wheaton',
+    'Newark', 'Jersey City', 'Paterson', 'Elizabeth', 'Edison', 'Woodbridge', 'Lakewood',
+    'Toms River', 'Hamilton', 'Trenton', 'Clifton', 'Camden', 'Somerville', 'Glassboro',
+    'Washington', 'District',
+    'New York', 'Albany', 'Buffalo', 'Rochester', 'Syracuse', 'Yonkers', 'Utica', 'White Plains',
+    'Hempstead', 'Troy', 'Binghamton', 'Freeport', 'Long Island', 'Newburgh',
+] + sorted({name for names in YARDS.values() for name in names})
+
+# Labels that introduce a location on a lot page, by the field they fill
+LABELS = {
+    'location': ['location', 'yard', 'yard location', 'facility', 'pickup location'],
+    'lane': ['location / lane', 'location lane', 'lane'],
+    'sale_doc': ['sale doc', 'sale document', 'saleDoc', 'saleDocLocation', 'sale location',
+                 'document location', 'doc location', 'sale yard', 'sale site'],
+}
+
+# Codes that are also common words, and names that are also cities: only trusted after a
+# label, inside a yard or after a city - never as a lone mention somewhere on the page
+AMBIGUOUS_CODES = {'AL', 'CO', 'DE', 'HI', 'ID', 'IN', 'LA', 'MA', 'ME', 'OH', 'OK', 'OR'}
+AMBIGUOUS_NAMES = {'WA'}
+
+# How far (characters) after a label its value may start
+LABEL_WINDOW = 80
+
+YARD, CITY, LABEL, NAME, CODE = 'yard', 'city', 'label', 'name', 'code'
+_RANK = {YARD: 0, CITY: 1, NAME: 2, CODE: 3}
+
+
+def _key(text):
+    return re.sub(r'[^A-Z]', '', text.upper())
+
+
+def _spellings(phrase):
+    return {phrase, phrase.lower(), phrase.upper(), phrase.title(), phrase.capitalize()}
+
+
+def _trie_pattern(phrases, space=r'\s+'):
+    """One regex alternation for `phrases` with shared prefixes factored out (longest match first)
+
+    Each phrase matches as written and in lower, UPPER, Title and Capitalized case: explicit
+    spellings keep the whole pattern case-sensitive, which scans about twice as fast as (?i).
+    """
+    trie = {}
+    for phrase in phrases:
+        for spelling in _spellings(phrase):
+            node = trie
+            for char in spelling:
+                node = node.setdefault(char, {})
+            node[''] = True
+
+    def walk(node):
+        branches = []
+        for char, child in sorted(node.items()):
+            if not char:
+                continue
+            if char == ' ':
+                piece = space
+            elif char == '.':
+                piece = r'\.?'
+            else:
+                piece = re.escape(char)
+            branches.append(piece + walk(child))
+        if not branches:
+            return ''
+        group = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return '(?:' + group + ')?' if '' in node else group
+
+    return walk(trie)
+
+
+_CODES = '|'.join(sorted(STATES))
+_NAMES = _trie_pattern(STATES.values())
+_YARD_NAMES = _trie_pattern(sorted({name for names in YARDS.values() for name in names}))
+_CITY_NAMES = _trie_pattern(CITIES)
+_LABEL_NAMES = _trie_pattern([phrase for phrases in LABELS.values() for phrase in phrases], space=r'\s*')
+# A capitalised word that is not a label word ("Location", "Sale", "Doc", ...), so a
+# "City, ST" never starts with the label in front of it
+_PLACE_WORD = r'(?!(?:%s)\b)[A-Z][a-z]+' % '|'.join(sorted(
+    {word.capitalize() for phrases in LABELS.values() for phrase in phrases
+     for word in re.findall(r'[A-Z]?[a-z]+', phrase)}, key=len, reverse=True))
+
+_PATTERN = re.compile(
+    r'\b(?:'
+    rf'(?P<yard_state>{_CODES})(?:\s*-\s*|\s+)(?P<yard>{_YARD_NAMES})'
+    rf'|(?P<city>{_CITY_NAMES})(?:,\s*|\s+)(?P<city_state>{_CODES}|{_NAMES})'
+    rf'|(?P<place>{_PLACE_WORD}(?:[ ]{_PLACE_WORD}){{0,2}}),\s*(?P<place_state>{_CODES}|{_NAMES})'
+    rf'|(?P<label>{_LABEL_NAMES})'
+    rf'|(?P<name>{_NAMES})'
+    rf'|(?P<code>{_CODES})'
+    r')\b'
+)
+
+# Where a page source may name the sale doc outside its visible text ("saleDoc": ..., data-sale-doc=);
+# searched in the lowercased source, which is much faster than an (?i) search
+_SALE_DOC_HINT = re.compile(r'sale[\s_-]*(?:doc|location|yard|site)|document[\s_-]*location')
+
+_YARD_KEYS = {(state, _key(name)): f"{state} - {name}" for state, names in YARDS.items() for name in names}
+_NAME_CODES = {_key(name): code for code, name in STATES.items()}
+_LABEL_KEYS = {_key(phrase): field for field, phrases in LABELS.items() for phrase in phrases}
+
+
+def _state(text):
+    return text if text in STATES else _NAME_CODES.get(_key(text))
+
+
+def scan(text):
+    """Yield (start, end, kind, value, shown) for every gazetteer hit in `text`
+
+    value is the state code - or for a label, the field it introduces - and shown is the
+    hit as it should be displayed ("NJ - TRENTON", "Trenton, NJ", "NJ").
+    """
+    for match in _PATTERN.finditer(text or ''):
+        groups = match.groupdict()
+        start, end = match.span()
+        if groups['yard'] is not None:
+            state = groups['yard_state']
+            shown = _YARD_KEYS.get((state, _key(groups['yard'])))
+            if shown:
+                yield start, end, YARD, state, shown
+            else:  # a yard of another state - keep just the code
+                yield start, match.start('yard_state') + 2, CODE, state, state
+        elif groups['city'] is not None or groups['place'] is not None:
+            city = groups['city'] or groups['place']
+            state = _state(groups['city_state'] or groups['place_state'])
+            yield start, end, CITY, state, f"{' '.join(city.split())}, {state}"
+        elif groups['label'] is not None:
+            yield start, end, LABEL, _LABEL_KEYS[_key(groups['label'])], groups['label']
+        elif groups['name'] is not None:
+            state = _state(groups['name'])
+            yield start, end, NAME, state, state
+        else:
+            yield start, end, CODE, groups['code'], groups['code']
+
+
+def resolve(text):
+    """Return {state, location, yard, lane_state, sale_doc_state} for a page or row text
+
+    The location is the place right after a Location label, else the page's strongest
+    mention: a yard, then a city with its state, then a state name, then a state code.
+    Fields that were not found are None.
+    """
+    found = {"state": None, "location": None, "yard": None, "lane_state": None, "sale_doc_state": None}
+    labelled = {}  # field -> (state, shown) of the first place after its label
+    best = None  # (rank, state, shown)
+    label = None  # (field, end) of the label waiting for its value
+    for start, end, kind, value, shown in scan(text):
+        if kind == LABEL:
+            label = (value, end)
+            continue
+        if label is not None:
+            if start - label[1] <= LABEL_WINDOW:
+                labelled.setdefault(label[0], (value, shown))
+            label = None
+        if kind == YARD and found["yard"] is None:
+            found["yard"] = shown
+        if kind in (NAME, CODE) and value in (AMBIGUOUS_NAMES if kind == NAME else AMBIGUOUS_CODES):
+            continue
+        if best is None or _RANK[kind] < best[0]:
+            best = (_RANK[kind], value, shown)
+    place = labelled.get("location") or (best[1:] if best else None)
+    if place:
+        found["state"], found["location"] = place
+    if "lane" in labelled:
+        found["lane_state"] = labelled["lane"][0]
+    if "sale_doc" in labelled:
+        found["sale_doc_state"] = labelled["sale_doc"][0]
+    return found
+
+
+def resolve_slug(href):
+    """State and yard ("NJ - TRENTON") named in a lot URL slug (...-nj-trenton), or (None, None)"""
+    slug = href.rstrip('/').rsplit('/', 1)[-1].replace('-', ' ').upper()
+    for _, _, kind, value, shown in scan(slug):
+        if kind == YARD:
+            return value, shown
+    return None, None
+
+
+def resolve_page(body_text, page_source):
+    """resolve() a lot page: its visible text first, then the page source for what that missed
+
+    Only a short window after each sale doc mention of the page source is scanned for the
+    sale doc, so JSON and data attributes are covered without a second pass over the page.
+    """
+    found = resolve(body_text)
+    if found["state"] is None:
+        for field, value in resolve(page_source).items():
+            if found[field] is None:
+                found[field] = value
+    if found["sale_doc_state"] is None:
+        for match in _SALE_DOC_HINT.finditer((page_source or '').lower()):
+            window = page_source[match.end():match.end() + LABEL_WINDOW]
+            state = next((value for _, _, kind, value, _ in scan(window) if kind != LABEL), None)
+            if state:
+                found["sale_doc_state"] = state
+                break
+    return found
@@ -0,0 +1,89 @@
+"""
+Hedged lot-page navigations
+A lot page still loading after the p90 latency of its page type gets a duplicate
+navigation on a second page of the same context. Whichever reaches the load state first
+is kept and the other page is closed. Hedges are capped to a share of navigations and
+only fire when the rate limiter has a spare token, so they trim the tail without adding
+much load.
+"""
+import os
+import threading
+
+from latency import get_tracker
+
+
+class HedgePolicy:
+    """When to hedge (p90 of the learned latency) and how often (max_rate of navigations)"""
+
+    def __init__(self, tracker, max_rate=None, percentile=90, min_trigger_ms=3000):
+        self.tracker = tracker
+        self.max_rate = max_rate if max_rate is not None else float(os.environ.get('HEDGE_MAX_RATE', 0.1))
+        self.percentile = percentile
+        self.min_trigger_ms = min_trigger_ms
+
+        self._lock = threading.Lock()
+        self.eligible = 0  # navigations that could have been hedged
+        self.fired = 0
+        self.won = 0  # the hedge finished first
+        self.lost = 0  # the original page finished first
+        self.failed = 0  # neither finished in time, or the hedge could not start
+        self.skipped_cap = 0
+        self.skipped_rate_limit = 0
+
+    def trigger_ms(self, key):
+        """Milliseconds after which a `key` navigation gets hedged, or None (disabled / not enough samples)"""
+        if self.max_rate <= 0:
+            return None
+        p = self.tracker.percentile_ms(key, self.percentile)
+        if p is None:
+            return None
+        with self._lock:
+            self.eligible += 1
+        return int(max(self.min_trigger_ms, p))
+
+    def allow(self, limiter):
+        """Whether a hedge may fire now (takes a rate limiter token if so)"""
+        with self._lock:
+            if self.fired + 1 > self.max_rate * self.eligible:
+                self.skipped_cap += 1
+                return False
+        if not limiter.try_acquire():
+            with self._lock:
+                self.skipped_rate_limit += 1
+            return False
+        with self._lock:
+            self.fired += 1
+        return True
+
+    def count(self, outcome):
+        """Record how a fired hedge ended: 'won', 'lost' or 'failed'"""
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_rate": self.max_rate,
+                "eligible": self.eligible,
+                "fired": self.fired,
+                "won": self.won,
+                "lost": self.lost,
+                "failed": self.failed,
+                "skipped_cap": self.skipped_cap,
+                "skipped_rate_limit": self.skipped_rate_limit,
+                "hedge_rate": round(self.fired / self.eligible, 3) if self.eligible else None,
+                "win_rate": round(self.won / self.fired, 3) if self.fired else None,
+            }
+
+
+_shared_policy = None
+_shared_lock = threading.Lock()
+
+
+def get_policy():
+    """Return the process-wide hedge policy (HEDGE_MAX_RATE=0 disables hedging)"""
+    global _shared_policy
+    with _shared_lock:
+        if _shared_policy is None:
+            _shared_policy = HedgePolicy(get_tracker())
+        return _shared_policy
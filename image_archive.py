@@ -0,0 +1,248 @@
+"""
+Local archive of lot photos
+Copart removes photos after the sale; this downloads each lot's images through a pooled,
+concurrent HTTP client into hash-named files (shared between lots), resumes where it
+stopped, and evicts the least recently used images to stay under a disk quota
+"""
+import os
+import time
+import hashlib
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'images')
+
+# Copart numbers a lot's photos <lot>_1.jpg, <lot>_2.jpg, ... - probed until the first miss
+COPART_IMAGE_URL = "https://cs.copart.com/v1/AUTH_svc.pdoc/00000/{lot}/full/{lot}_{n}.jpg"
+
+# Once over the quota, evict down to this fraction of it so passes do not run on every download
+QUOTA_LOW_WATER = 0.9
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    sha TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    content_type TEXT,
+    last_access REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS images (
+    lot_number TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    sha TEXT,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (lot_number, position)
+);
+CREATE INDEX IF NOT EXISTS images_sha ON images (sha);
+CREATE INDEX IF NOT EXISTS blobs_last_access ON blobs (last_access);
+"""
+
+
+class ImageArchive:
+    """Content-addressed image files plus a SQLite index of lot -> images
+
+    A row with sha NULL records a probed position that does not exist, and sha '' an
+    image evicted for the quota, so resumed runs fetch neither again.
+    """
+
+    def __init__(self, directory=None, quota_bytes=None, workers=8, timeout=20,
+                 url_template=COPART_IMAGE_URL):
+        self.directory = directory or os.environ.get('IMAGE_ARCHIVE_DIR', DEFAULT_DIR)
+        if quota_bytes is None:
+            quota_bytes = int(float(os.environ.get('IMAGE_ARCHIVE_QUOTA_MB', 2048)) * 1024 * 1024)
+        self.quota_bytes = quota_bytes
+        self.workers = workers
+        self.timeout = timeout
+        self.url_template = url_template
+        self._local = threading.local()
+        os.makedirs(os.path.join(self.directory, 'blobs'), exist_ok=True)
+        self._connection().executescript(SCHEMA)
+
+        # One pooled session shared by all download threads
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(workers, 10), max_retries=2)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['User-Agent'] = ('Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 '
+                                              '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+
+        # Counters (updated from the download threads under _counter_lock)
+        self._counter_lock = threading.Lock()
+        self.downloaded = 0
+        self.downloaded_bytes = 0
+        self.deduplicated = 0
+        self.skipped = 0
+        self.evicted = 0
+
+        # Bytes in the archive, kept current as downloads land so the quota is checked per image
+        self._quota_lock = threading.Lock()
+        self._total_bytes = self.total_bytes()
+
+    def _connection(self):
+        """Return this thread's index connection (reopened after a fork)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(os.path.join(self.directory, 'index.db'), timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _count(self, name, amount=1):
+        with self._counter_lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def blob_path(self, sha):
+        return os.path.join(self.directory, 'blobs', sha[:2], sha)
+
+    # -- downloading -----------------------------------------------------
+
+    def _store(self, content, content_type):
+        """Write image bytes under their SHA-256 (once) and return the hash"""
+        sha = hashlib.sha256(content).hexdigest()
+        conn = self._connection()
+        if conn.execute('SELECT 1 FROM blobs WHERE sha = ?', (sha,)).fetchone():
+            self._count('deduplicated')
+            return sha
+        path = self.blob_path(sha)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+        conn.execute('INSERT OR IGNORE INTO blobs (sha, size, content_type, last_access) VALUES (?, ?, ?, ?)',
+                     (sha, len(content), content_type, time.time()))
+        self._count('downloaded_bytes', len(content))
+        with self._counter_lock:
+            self._total_bytes += len(content)
+            over_quota = self._total_bytes > self.quota_bytes
+        if over_quota:
+            self.enforce_quota()
+        return sha
+
+    def _known_positions(self, lot_number):
+        rows = self._connection().execute('SELECT position, sha FROM images WHERE lot_number = ?', (lot_number,))
+        return dict(rows.fetchall())
+
+    def archive_lot(self, lot_number, urls=None, max_images=10):
+        """Download one lot's images in order, stopping at the first missing position
+
+        `urls` (e.g. vehicle["images"]) are tried first for the positions they cover;
+        the rest come from url_template. Positions already in the index are skipped.
+        Returns the number of images newly stored.
+        """
+        lot_number = str(lot_number)
+        known = self._known_positions(lot_number)
+        urls = list(urls or [])
+        stored = 0
+        for position in range(1, max_images + 1):
+            if position in known:
+                if known[position] is None:
+                    break  # Probed before - the lot has no more photos
+                self._count('skipped')
+                continue
+            url = urls[position - 1] if position <= len(urls) else \
+                self.url_template.format(lot=lot_number, n=position)
+            try:
+                response = self.session.get(url, timeout=self.timeout)
+            except requests.RequestException as e:
+                print(f"      ⚠️  Image {position} of lot {lot_number} failed: {e}")
+                break  # Retry on the next run
+            content_type = response.headers.get('content-type', '')
+            if response.status_code == 404 or (response.ok and not content_type.startswith('image/')):
+                self._connection().execute(
+                    'INSERT OR REPLACE INTO images (lot_number, position, url, sha, fetched_at) VALUES (?, ?, ?, NULL, ?)',
+                    (lot_number, position, url, time.time()))
+                break
+            if not response.ok:
+                break  # 5xx / 403 - leave it for the next run
+            sha = self._store(response.content, content_type)
+            self._connection().execute(
+                'INSERT OR REPLACE INTO images (lot_number, position, url, sha, fetched_at) VALUES (?, ?, ?, ?, ?)',
+                (lot_number, position, url, sha, time.time()))
+            self._count('downloaded')
+            stored += 1
+        return stored
+
+    def archive_vehicles(self, vehicles, max_images=10):
+        """Archive the images of many lots concurrently; returns images stored
+
+        The quota is enforced as images land (see _store), and once more at the end for
+        what other processes added.
+        """
+        jobs = [(str(vehicle.get("lot_number")), vehicle.get("images") or []) for vehicle in vehicles
+                if str(vehicle.get("lot_number", "N/A")).isdigit()]
+        stored = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self.archive_lot, lot, urls, max_images): lot for lot, urls in jobs}
+            for future in as_completed(futures):
+                try:
+                    stored += future.result()
+                except Exception as e:
+                    print(f"  ⚠️  Archiving images of lot {futures[future]} failed: {e}")
+        self.enforce_quota()
+        return stored
+
+    # -- quota -----------------------------------------------------------
+
+    def total_bytes(self):
+        return self._connection().execute('SELECT COALESCE(SUM(size), 0) FROM blobs').fetchone()[0]
+
+    def enforce_quota(self):
+        """Delete least recently used images once the archive is over the quota, down to
+        QUOTA_LOW_WATER of it; returns bytes freed"""
+        with self._quota_lock:  # One pass at a time; the others find the archive back under
+            conn = self._connection()
+            total = self.total_bytes()
+            freed = evicted = 0
+            if total > self.quota_bytes:
+                excess = total - int(self.quota_bytes * QUOTA_LOW_WATER)
+                for sha, size in conn.execute('SELECT sha, size FROM blobs ORDER BY last_access').fetchall():
+                    if freed >= excess:
+                        break
+                    try:
+                        os.remove(self.blob_path(sha))
+                    except FileNotFoundError:
+                        pass
+                    conn.execute('DELETE FROM blobs WHERE sha = ?', (sha,))
+                    conn.execute("UPDATE images SET sha = '' WHERE sha = ?", (sha,))
+                    freed += size
+                    evicted += 1
+            with self._counter_lock:
+                self._total_bytes = total - freed
+                self.evicted += evicted
+        if evicted:
+            print(f"🧹 Evicted {evicted} images ({freed / 1e6:.1f} MB) to stay under {self.quota_bytes / 1e6:.0f} MB")
+        return freed
+
+    # -- serving ---------------------------------------------------------
+
+    def lot_images(self, lot_number):
+        """Return [(position, sha)] of the archived images of a lot"""
+        return self._connection().execute(
+            "SELECT position, sha FROM images WHERE lot_number = ? AND sha != '' ORDER BY position",
+            (str(lot_number),)).fetchall()
+
+    def open_image(self, sha):
+        """Return (path, content_type) of an archived image and mark it used, or None"""
+        conn = self._connection()
+        row = conn.execute('SELECT content_type FROM blobs WHERE sha = ?', (sha,)).fetchone()
+        if not row or not os.path.exists(self.blob_path(sha)):
+            return None
+        conn.execute('UPDATE blobs SET last_access = ? WHERE sha = ?', (time.time(), sha))
+        return self.blob_path(sha), row[0] or 'image/jpeg'
+
+    def stats(self):
+        conn = self._connection()
+        return {
+            "lots": conn.execute("SELECT COUNT(DISTINCT lot_number) FROM images WHERE sha != ''").fetchone()[0],
+            "images": conn.execute('SELECT COUNT(*) FROM blobs').fetchone()[0],
+            "bytes": self.total_bytes(),
+            "quota_bytes": self.quota_bytes,
+        }
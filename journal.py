@@ -0,0 +1,119 @@
+"""
+Run journal for resumable scrapes
+Every finished search page and enriched lot is appended (and fsynced) to an NDJSON file,
+so a run that dies halfway can pick up where it stopped
+"""
+import os
+import json
+import time
+import uuid
+
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'runs')
+
+
+class RunJournal:
+    """Append-only NDJSON journal of one scrape run"""
+
+    def __init__(self, path):
+        self.path = path
+        self.searches = {}  # search key -> list of vehicles
+        self.lots = {}  # lot number -> enriched vehicle (None if filtered out)
+        self.finished = False
+        self.started_at = time.time()
+
+        if os.path.exists(path):
+            self._replay()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+        if not os.path.getsize(path):
+            self._append({"type": "start", "ts": self.started_at})
+
+    def _replay(self):
+        """Load the entries of an existing journal (a torn last line is ignored)"""
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                kind = entry.get("type")
+                if kind == "start":
+                    self.started_at = entry.get("ts", self.started_at)
+                elif kind == "search":
+                    self.searches[entry["key"]] = entry["vehicles"]
+                elif kind == "lot":
+                    self.lots[entry["lot_number"]] = entry["vehicle"]
+                elif kind == "done":
+                    self.finished = True
+
+    def _append(self, entry):
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    @classmethod
+    def start(cls, directory=None, keep=20):
+        """Start a new journal in `directory`, deleting all but the newest `keep` old ones"""
+        directory = directory or os.environ.get('SCRAPE_JOURNAL_DIR', DEFAULT_DIR)
+        if os.path.isdir(directory):
+            names = sorted(name for name in os.listdir(directory) if name.endswith('.ndjson'))
+            for name in names[:max(0, len(names) - keep)]:
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}.ndjson"
+        return cls(os.path.join(directory, name))
+
+    @classmethod
+    def resume_or_start(cls, directory=None, max_age=6 * 3600):
+        """Resume the newest unfinished journal younger than `max_age` seconds, else start a new one"""
+        directory = directory or os.environ.get('SCRAPE_JOURNAL_DIR', DEFAULT_DIR)
+        if os.path.isdir(directory):
+            names = sorted((name for name in os.listdir(directory) if name.endswith('.ndjson')), reverse=True)
+            for name in names:
+                journal = cls(os.path.join(directory, name))
+                if journal.finished or time.time() - journal.started_at > max_age:
+                    journal.close()
+                    break
+                print(f"↩️  Resuming scrape run {name}: {len(journal.searches)} searches, {len(journal.lots)} lots already done")
+                return journal
+        return cls.start(directory)
+
+    def search_results(self, key):
+        """Return the journaled vehicles of a search, or None if it hasn't finished yet"""
+        return self.searches.get(key)
+
+    def record_search(self, key, vehicles):
+        self.searches[key] = vehicles
+        self._append({"type": "search", "key": key, "vehicles": vehicles})
+
+    def has_lot(self, lot_number):
+        return lot_number in self.lots
+
+    def lot_result(self, lot_number):
+        """Return the journaled vehicle of a lot (None if it was filtered out)"""
+        return self.lots.get(lot_number)
+
+    def record_lot(self, lot_number, vehicle):
+        self.lots[lot_number] = vehicle
+        self._append({"type": "lot", "lot_number": lot_number, "vehicle": vehicle})
+
+    def vehicles(self, lot_numbers):
+        """Build the run's result from the journal, in the given lot order"""
+        return [self.lots[lot] for lot in lot_numbers if self.lots.get(lot)]
+
+    def finish(self):
+        """Mark the run complete so it is never resumed"""
+        if not self.finished:
+            self.finished = True
+            self._append({"type": "done", "ts": time.time()})
+
+    def close(self):
+        try:
+            self._file.close()
+        except Exception:
+            pass
@@ -0,0 +1,171 @@
+"""
+Adaptive timeouts learned from observed page latency
+Every Playwright wait is keyed by page type and stage ("search:goto", "lot:body", ...).
+The tracker keeps a rolling window of how long each one took and sets its next timeout to
+p99 x factor within bounds. Hung pages then fail fast, and pages that are slow but healthy
+are not cut off. The windows are saved to data/latency.json, so they carry over between runs
+(and between worker processes).
+"""
+import os
+import json
+import math
+import threading
+from collections import deque
+
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'latency.json')
+
+
+def _percentile(ordered, q):
+    """Nearest-rank percentile of an ascending list"""
+    if not ordered:
+        return None
+    rank = max(0, min(len(ordered) - 1, math.ceil(q / 100.0 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class LatencyTracker:
+    """Rolling latency windows per wait and the timeouts derived from them
+
+    window: samples kept per key
+    factor: timeout = p99 x factor once a key has min_samples samples
+    min_ms: lower bound of a learned timeout; the upper bound is max_scale x the default
+    Timed-out waits are not latency samples; a key whose recent waits time out more than
+    max_timeout_rate of the time goes back to its default until that settles.
+    """
+
+    def __init__(self, path=None, window=200, factor=None, min_samples=20, min_ms=None,
+                 max_scale=2.0, max_timeout_rate=0.1):
+        self.path = path or os.environ.get('LATENCY_STATS_PATH', DEFAULT_PATH)
+        self.window = window
+        self.factor = factor or float(os.environ.get('LATENCY_TIMEOUT_FACTOR', 3.0))
+        self.min_samples = min_samples
+        self.min_ms = min_ms or float(os.environ.get('LATENCY_MIN_TIMEOUT_MS', 2000))
+        self.max_scale = max_scale
+        self.max_timeout_rate = max_timeout_rate
+
+        self._lock = threading.Lock()
+        self.samples = {}  # key -> deque of seconds (successful waits)
+        self.outcomes = {}  # key -> deque of 1 (timed out) / 0
+        self.defaults = {}  # key -> default timeout (ms) last asked for
+        self._unsaved = {}  # key -> ([seconds], [outcomes]) recorded since the last save
+        self.load()
+
+    # -- persistence -----------------------------------------------------
+
+    def _read(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f).get('keys', {})
+        except (OSError, ValueError):
+            return {}
+
+    def load(self):
+        """Replace the windows with the saved ones, plus this process's samples not saved yet"""
+        saved = self._read()
+        with self._lock:
+            for key, base in saved.items():
+                seconds, outcomes = self._unsaved.get(key, ([], []))
+                self.samples[key] = deque(base.get('samples', []) + seconds, maxlen=self.window)
+                self.outcomes[key] = deque(base.get('outcomes', []) + outcomes, maxlen=self.window)
+
+    def save(self):
+        """Merge this process's new samples into the saved windows (other processes may have saved too)"""
+        with self._lock:
+            if not self._unsaved:
+                return
+            unsaved, self._unsaved = self._unsaved, {}
+        saved = self._read()
+        with self._lock:
+            for key, (seconds, outcomes) in unsaved.items():
+                base = saved.get(key, {})
+                self.samples[key] = deque(base.get('samples', []) + seconds, maxlen=self.window)
+                self.outcomes[key] = deque(base.get('outcomes', []) + outcomes, maxlen=self.window)
+            for key, base in saved.items():
+                if key not in unsaved:
+                    self.samples[key] = deque(base.get('samples', []), maxlen=self.window)
+                    self.outcomes[key] = deque(base.get('outcomes', []), maxlen=self.window)
+            data = {'keys': {key: {'samples': [round(s, 3) for s in self.samples.get(key, [])],
+                                   'outcomes': list(self.outcomes.get(key, []))}
+                             for key in set(self.samples) | set(self.outcomes)}}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Warning: Could not save latency stats: {e}")
+
+    # -- recording -------------------------------------------------------
+
+    def record(self, key, seconds, timed_out=False):
+        """Record one wait; timed-out waits only count toward the timeout rate"""
+        with self._lock:
+            outcomes = self.outcomes.setdefault(key, deque(maxlen=self.window))
+            outcomes.append(1 if timed_out else 0)
+            unsaved = self._unsaved.setdefault(key, ([], []))
+            unsaved[1].append(1 if timed_out else 0)
+            if not timed_out:
+                self.samples.setdefault(key, deque(maxlen=self.window)).append(seconds)
+                unsaved[0].append(seconds)
+            pending = sum(len(outcomes) for _, outcomes in self._unsaved.values())
+        if pending >= 50:
+            self.save()
+
+    def timeout_ms(self, key, default_ms):
+        """The timeout to use for the next `key` wait: learned, or `default_ms` until there are enough samples"""
+        with self._lock:
+            self.defaults[key] = default_ms
+            samples = self.samples.get(key)
+            outcomes = self.outcomes.get(key)
+            if not samples or len(samples) < self.min_samples:
+                return default_ms
+            if outcomes and sum(outcomes) / len(outcomes) > self.max_timeout_rate:
+                return default_ms
+            p99 = _percentile(sorted(samples), 99) * 1000
+        return int(min(default_ms * self.max_scale, max(self.min_ms, p99 * self.factor)))
+
+    def percentile_ms(self, key, q):
+        """The q-th percentile of `key`'s latency in ms, or None with fewer than min_samples samples"""
+        with self._lock:
+            samples = self.samples.get(key)
+            if not samples or len(samples) < self.min_samples:
+                return None
+            ordered = sorted(samples)
+        return _percentile(ordered, q) * 1000
+
+    def stats(self):
+        """Per key: sample count, p50/p95/p99 (seconds), timeout rate and the current timeout (ms)"""
+        with self._lock:
+            keys = sorted(set(self.samples) | set(self.outcomes))
+            snapshot = {key: (sorted(self.samples.get(key, [])), list(self.outcomes.get(key, [])),
+                              self.defaults.get(key)) for key in keys}
+        result = {}
+        for key, (ordered, outcomes, default_ms) in snapshot.items():
+            result[key] = {
+                "samples": len(ordered),
+                "p50": _round(_percentile(ordered, 50)),
+                "p95": _round(_percentile(ordered, 95)),
+                "p99": _round(_percentile(ordered, 99)),
+                "timeout_rate": round(sum(outcomes) / len(outcomes), 3) if outcomes else None,
+                "timeout_ms": self.timeout_ms(key, default_ms) if default_ms else None,
+            }
+        return result
+
+
+def _round(value):
+    return None if value is None else round(value, 3)
+
+
+_shared_tracker = None
+_shared_lock = threading.Lock()
+
+
+def get_tracker():
+    """Return the process-wide tracker"""
+    global _shared_tracker
+    with _shared_lock:
+        if _shared_tracker is None:
+            _shared_tracker = LatencyTracker()
+        return _shared_tracker
@@ -0,0 +1,160 @@
+"""
+HTTP fast path for Copart lot details
+The Angular lot page gets its data from a JSON endpoint; fetching that directly through a
+pooled keep-alive session (with the browser's cookies) costs one small request instead of
+seconds of Chromium. Blocked or incomplete responses return None and the scraper falls
+back to the browser. Counters of both paths are served at /api/fetch-paths.
+"""
+import os
+import time
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from throttle import detect_block, get_limiter
+
+
+LOT_DETAILS_URL = "https://www.copart.com/public/data/lotdetails/solr/{lot}"
+LOT_IMAGES_URL = "https://www.copart.com/public/data/lotdetails/solr/lotImages/{lot}/USA"
+
+# Fields a lot details response must have to replace the lot page
+REQUIRED_FIELDS = ('lcy', 'orr', 'yn')
+
+
+def is_lot_details_url(url):
+    """True for lot details (not lot images) JSON URLs - those parse_lot_details understands"""
+    return '/lotdetails/solr/' in (url or '') and '/lotImages/' not in url
+
+
+class LotDetailsClient:
+    """Pooled requests.Session for Copart's lot JSON endpoints, sharing the browser's rate limiter"""
+
+    def __init__(self, timeout=15, limiter=None):
+        self.timeout = timeout
+        self.limiter = limiter or get_limiter()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=10)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'User-Agent': ('Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 '
+                           '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'),
+            'Accept': 'application/json, text/plain, */*',
+            'X-Requested-With': 'XMLHttpRequest',
+        })
+        self.cookies_loaded_at = None
+
+        self._lock = threading.Lock()
+        self.http_hits = 0  # lots/image lists served by the fast path
+        self.browser_fallbacks = 0  # lots the browser had to load
+        self.misses = {}  # reason -> count of fast path attempts that fell back
+
+    def load_cookies(self, context):
+        """Copy the browser context's cookies (Incapsula/session) into the session"""
+        try:
+            cookies = context.cookies()
+        except Exception:
+            return 0
+        for cookie in cookies:
+            self.session.cookies.set(cookie['name'], cookie['value'],
+                                     domain=cookie.get('domain'), path=cookie.get('path', '/'))
+        self.cookies_loaded_at = time.time()
+        return len(cookies)
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def miss(self, reason):
+        with self._lock:
+            self.misses[reason] = self.misses.get(reason, 0) + 1
+
+    def fell_back(self):
+        """Count a lot (or image list) the browser had to load"""
+        self._count('browser_fallbacks')
+
+    def get_json(self, url, deadline=None, referer=None):
+        """GET a JSON endpoint through the rate limiter; returns (data, response) or (None, reason)"""
+        self.limiter.acquire(deadline=deadline.at if deadline else None)
+        timeout = self.timeout
+        if deadline is not None:
+            if deadline.expired():
+                return None, 'deadline'
+            timeout = deadline.timeout_ms(timeout * 1000) / 1000
+        try:
+            response = self.session.get(url, timeout=timeout, headers={'Referer': referer} if referer else None)
+        except requests.RequestException as e:
+            return None, f"error-{type(e).__name__}"
+
+        is_json = 'json' in response.headers.get('content-type', '')
+        reason = detect_block(status=response.status_code, html=None if is_json else response.text[:30000],
+                              size=len(response.content))
+        if reason:
+            self.limiter.on_block(reason)
+            return None, reason
+        if not response.ok:
+            return None, f"http-{response.status_code}"
+        if not is_json:
+            return None, 'not-json'
+        try:
+            data = response.json()
+        except ValueError:
+            return None, 'bad-json'
+        self.limiter.on_success()
+        return data, response
+
+    def fetch_lot_details(self, lot_number, deadline=None):
+        """Return (lotDetails dict, raw response) or (None, miss reason)"""
+        url = LOT_DETAILS_URL.format(lot=lot_number)
+        data, response = self.get_json(url, deadline, referer=f"https://www.copart.com/lot/{lot_number}")
+        if data is None:
+            self.miss(response)
+            return None, response
+        details = ((data or {}).get('data') or {}).get('lotDetails') or {}
+        if not all(details.get(field) not in (None, '') for field in REQUIRED_FIELDS):
+            self.miss('incomplete')
+            return None, 'incomplete'
+        self._count('http_hits')
+        return details, response
+
+    def fetch_lot_images(self, lot_number, deadline=None):
+        """Return the lot's full-size image URLs, or None (miss)"""
+        url = LOT_IMAGES_URL.format(lot=lot_number)
+        data, response = self.get_json(url, deadline, referer=f"https://www.copart.com/lot/{lot_number}")
+        if data is None:
+            self.miss(response)
+            return None
+        images_list = ((data or {}).get('data') or {}).get('imagesList') or {}
+        for size in ('HIGH_RESOLUTION_IMAGE', 'FULL_IMAGE'):
+            urls = [image.get('url') for image in images_list.get(size) or [] if image.get('url')]
+            if urls:
+                self._count('http_hits')
+                return urls
+        self.miss('no-images')
+        return None
+
+    def stats(self):
+        with self._lock:
+            attempts = self.http_hits + sum(self.misses.values())
+            return {
+                "http_hits": self.http_hits,
+                "browser_fallbacks": self.browser_fallbacks,
+                "misses": dict(self.misses),
+                "http_hit_rate": round(self.http_hits / attempts, 3) if attempts else None,
+                "cookies_loaded_at": self.cookies_loaded_at,
+            }
+
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+
+def get_client():
+    """Return the process-wide client, or None when LOT_FAST_PATH=0 disables the fast path"""
+    global _shared_client
+    if os.environ.get('LOT_FAST_PATH', '1').lower() in ('0', 'false', 'no', 'off'):
+        return None
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = LotDetailsClient(timeout=float(os.environ.get('LOT_FAST_PATH_TIMEOUT', 15)))
+        return _shared_client
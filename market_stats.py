@@ -0,0 +1,185 @@
+"""
+Market statistics over a vehicle snapshot for the /api/stats endpoint
+The snapshot is turned into NumPy columns once per version; grouped counts,
+percentiles and histograms are then computed without a Python loop over vehicles
+"""
+import threading
+
+import numpy as np
+
+from vehicle_fields import parse_money, parse_odometer, parse_year, normalize_label
+
+
+# Numeric fields summarized per group
+METRICS = {
+    "bid": lambda vehicle: parse_money(vehicle.get("current_bid")),
+    "odometer": lambda vehicle: parse_odometer(vehicle.get("odometer")),
+}
+
+# Fields vehicles can be grouped by
+GROUP_FIELDS = {
+    "year": lambda vehicle: parse_year(vehicle.get("year")),
+    "damage": lambda vehicle: normalize_label(vehicle.get("damage")),
+    "yard": lambda vehicle: normalize_label(vehicle.get("location")),
+    "state": lambda vehicle: normalize_label(vehicle.get("location_state")),
+}
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+class MarketStats:
+    """Column arrays of one snapshot plus a cache of computed groupings"""
+
+    def __init__(self, vehicles):
+        vehicles = list(vehicles)
+        self.count = len(vehicles)
+        # Per metric: positions with a value, sorted by value once per snapshot, and those values
+        self.sorted_positions = {}
+        self.sorted_values = {}
+        for name, extract in METRICS.items():
+            column = np.array([extract(vehicle) for vehicle in vehicles], dtype=float)
+            present = np.flatnonzero(~np.isnan(column))
+            order = present[np.argsort(column[present], kind='stable')]
+            self.sorted_positions[name] = order
+            self.sorted_values[name] = column[order]
+        self.codes = {}  # field -> int code per vehicle (-1 = missing)
+        self.values = {}  # field -> value of each code
+        for field, extract in GROUP_FIELDS.items():
+            lookup = {}
+            codes = np.empty(self.count, dtype=np.int64)
+            for pos, vehicle in enumerate(vehicles):
+                value = extract(vehicle)
+                codes[pos] = -1 if value is None else lookup.setdefault(value, len(lookup))
+            self.codes[field] = codes
+            self.values[field] = list(lookup)
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def stats(self, by=("year",), bins=10):
+        """Return {"by", "total", "groups", "histogram_edges"} for a grouping
+
+        Each group (and the total) has a count plus, per metric, the count of vehicles
+        with a value, mean, percentiles and `bins` histogram counts over shared edges.
+        Raises ValueError for an unknown group field.
+        """
+        by = tuple(by)
+        for field in by:
+            if field not in GROUP_FIELDS:
+                raise ValueError(f"Cannot group by {field!r} (use {', '.join(GROUP_FIELDS)})")
+        key = (by, bins)
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is None:
+            cached = self._compute(by, bins)
+            with self._lock:
+                self._cache[key] = cached
+        return cached
+
+    def _compute(self, by, bins):
+        if not self.count:
+            return {"by": list(by), "total": {"count": 0}, "groups": [], "histogram_edges": {}}
+
+        group_ids, group_codes = group_rows([self.codes[field] for field in by], self.count)
+        group_count = len(group_codes)
+        totals = np.bincount(group_ids, minlength=group_count)
+
+        summaries, overall, histograms, edges = {}, {}, {}, {}
+        for name, values in self.sorted_values.items():
+            ids = group_ids[self.sorted_positions[name]]
+            summaries[name] = _grouped_summary(values, ids, group_count)
+            overall[name] = _grouped_summary(values, np.zeros(len(values), dtype=np.int64), 1)
+            if bins and len(values):
+                edges[name] = np.histogram_bin_edges(values, bins=bins)
+                histograms[name] = _grouped_histogram(values, ids, group_count, edges[name])
+
+        groups = []
+        for g in np.argsort(-totals, kind='stable'):
+            group = {}
+            for field, code in zip(by, group_codes[g]):
+                group[field] = self.values[field][code] if code >= 0 else None
+            group["count"] = int(totals[g])
+            for name in METRICS:
+                group[name] = _summary_entry(summaries[name], g)
+                if name in histograms:
+                    group[name]["histogram"] = histograms[name][g].tolist()
+            groups.append(group)
+
+        total = {"count": self.count}
+        for name in METRICS:
+            total[name] = _summary_entry(overall[name], 0)
+            if name in histograms:
+                total[name]["histogram"] = histograms[name].sum(axis=0).tolist()
+
+        return {
+            "by": list(by),
+            "total": total,
+            "groups": groups,
+            "histogram_edges": {name: [round(float(edge), 2) for edge in values] for name, values in edges.items()},
+        }
+
+
+def group_rows(keys, count):
+    """Group `count` rows by one or more int code columns (codes >= 0, -1 = missing)
+
+    The codes are packed into one int64 per row so grouping is a 1-D unique.
+    Returns (group id per row, [group count x len(keys)] array of each group's codes).
+    Shared by MarketStats and bid_history.BidHistory.aggregate.
+    """
+    packed = np.zeros(count, dtype=np.int64)
+    radixes = []
+    for key in keys:
+        radix = int(key.max()) + 2 if len(key) else 1
+        packed = packed * radix + (key.astype(np.int64) + 1)
+        radixes.append(radix)
+    unique_packed, group_ids = np.unique(packed, return_inverse=True)
+    codes = np.empty((len(unique_packed), len(keys)), dtype=np.int64)
+    remainder = unique_packed
+    for i in range(len(keys) - 1, -1, -1):
+        codes[:, i] = remainder % radixes[i] - 1
+        remainder = remainder // radixes[i]
+    return group_ids.reshape(-1), codes
+
+
+def _grouped_summary(values, group_ids, group_count):
+    """Per-group count, mean and percentiles (linear interpolation, like np.percentile)
+
+    `values` must be in ascending order; a stable sort by group then leaves each
+    group's values contiguous and sorted, so percentiles are positional lookups.
+    """
+    counts = np.bincount(group_ids, minlength=group_count)
+    sums = np.bincount(group_ids, weights=values, minlength=group_count)
+    sorted_values = values[np.argsort(group_ids, kind='stable')]
+    starts = np.r_[0, np.cumsum(counts)[:-1]]
+    summary = {"count": counts, "mean": np.divide(sums, counts, out=np.full(group_count, np.nan), where=counts > 0)}
+    has_values = counts > 0
+    for q in PERCENTILES:
+        position = (counts - 1).clip(min=0) * (q / 100.0)
+        low = np.floor(position).astype(np.int64)
+        high = np.minimum(low + 1, (counts - 1).clip(min=0))
+        fraction = position - low
+        result = np.full(group_count, np.nan)
+        if len(sorted_values):
+            index_low = np.where(has_values, starts + low, 0)
+            index_high = np.where(has_values, starts + high, 0)
+            interpolated = sorted_values[index_low] * (1 - fraction) + sorted_values[index_high] * fraction
+            result = np.where(has_values, interpolated, np.nan)
+        summary[f"p{q}"] = result
+    return summary
+
+
+def _grouped_histogram(values, group_ids, group_count, edges):
+    """Histogram counts per group over shared bin edges -> (group_count, bins) array"""
+    bins = len(edges) - 1
+    bin_ids = np.clip(np.searchsorted(edges, values, side='right') - 1, 0, bins - 1)
+    flat = np.bincount(group_ids * bins + bin_ids, minlength=group_count * bins)
+    return flat.reshape(group_count, bins)
+
+
+def _summary_entry(summary, g):
+    """JSON-friendly summary of one group (None where there were no values)"""
+    entry = {"count": int(summary["count"][g])}
+    for name in ["mean"] + [f"p{q}" for q in PERCENTILES]:
+        value = summary[name][g]
+        entry[name] = None if np.isnan(value) else round(float(value), 2)
+    entry["median"] = entry["p50"]
+    return entry
@@ -0,0 +1,276 @@
+"""
+Raw page archive for offline re-extraction
+Every fetched search page, lot page and intercepted JSON response is stored once
+(content-addressed by SHA-256, zstd-compressed) and indexed by kind, lot and fetch time,
+so fixed extractors can be rerun over history without a browser. Fetches older than
+PAGE_ARCHIVE_MAX_DAYS are pruned, and the oldest go first once PAGE_ARCHIVE_QUOTA_MB is passed
+"""
+import os
+import zlib
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import Counter
+
+try:
+    import zstandard
+except ImportError:  # Optional - fall back to zlib (blobs get a different extension)
+    zstandard = None
+
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'pages')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    url TEXT,
+    fetched_at REAL NOT NULL,
+    sha TEXT NOT NULL,
+    text_sha TEXT,
+    content_type TEXT
+);
+CREATE INDEX IF NOT EXISTS pages_kind_key ON pages (kind, key, fetched_at);
+"""
+
+# kind values
+SEARCH = 'search'
+LOT = 'lot'
+JSON = 'json'
+
+
+class PageArchive:
+    """Content-addressed blob store plus a SQLite index of fetches
+
+    Every `prune_every` puts, fetches older than `max_age` seconds are dropped, then the
+    oldest fetches until the blobs fit `quota_bytes`; blobs no fetch refers to are deleted.
+    """
+
+    def __init__(self, directory=None, level=10, max_age=None, quota_bytes=None, prune_every=500):
+        self.directory = directory or os.environ.get('PAGE_ARCHIVE_DIR', DEFAULT_DIR)
+        self.level = level
+        if max_age is None:
+            max_age = float(os.environ.get('PAGE_ARCHIVE_MAX_DAYS', 30)) * 86400
+        if quota_bytes is None:
+            quota_bytes = int(float(os.environ.get('PAGE_ARCHIVE_QUOTA_MB', 2048)) * 1024 * 1024)
+        self.max_age = max_age
+        self.quota_bytes = quota_bytes
+        self.prune_every = prune_every
+        self._puts = 0
+        self._puts_lock = threading.Lock()
+        self._prune_lock = threading.Lock()
+        self._local = threading.local()
+        os.makedirs(os.path.join(self.directory, 'blobs'), exist_ok=True)
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self):
+        """Return this thread's index connection (reopened after a fork)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(os.path.join(self.directory, 'index.db'), timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    # -- blobs -----------------------------------------------------------
+
+    def _blob_path(self, sha, extension):
+        return os.path.join(self.directory, 'blobs', sha[:2], sha + extension)
+
+    def put_blob(self, content):
+        """Store content (str or bytes) once; returns its SHA-256"""
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        sha = hashlib.sha256(content).hexdigest()
+        for extension in ('.zst', '.z'):
+            path = self._blob_path(sha, extension)
+            if os.path.exists(path):
+                try:
+                    os.utime(path)  # Reused - keeps prune from taking it before the fetch is indexed
+                except OSError:
+                    pass
+                return sha
+
+        if zstandard is not None:
+            path = self._blob_path(sha, '.zst')
+            data = zstandard.ZstdCompressor(level=self.level).compress(content)
+        else:
+            path = self._blob_path(sha, '.z')
+            data = zlib.compress(content, 9)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return sha
+
+    def get_blob(self, sha):
+        """Return the decompressed bytes of a blob"""
+        path = self._blob_path(sha, '.zst')
+        if os.path.exists(path):
+            if zstandard is None:
+                raise RuntimeError("zstandard is not installed - pip install zstandard to read .zst blobs")
+            with open(path, 'rb') as f:
+                return zstandard.ZstdDecompressor().decompress(f.read())
+        with open(self._blob_path(sha, '.z'), 'rb') as f:
+            return zlib.decompress(f.read())
+
+    def get_text(self, sha):
+        return self.get_blob(sha).decode('utf-8')
+
+    # -- index -----------------------------------------------------------
+
+    def put(self, kind, key, url, content, text=None, content_type='text/html', fetched_at=None):
+        """Archive one fetch: `content` is the raw page/response, `text` the page's innerText"""
+        sha = self.put_blob(content)
+        text_sha = self.put_blob(text) if text is not None else None
+        self._connection().execute(
+            'INSERT INTO pages (kind, key, url, fetched_at, sha, text_sha, content_type) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (kind, str(key), url, fetched_at if fetched_at is not None else time.time(), sha, text_sha, content_type))
+        with self._puts_lock:
+            self._puts += 1
+            due = self._puts % self.prune_every == 0
+        if due:
+            try:
+                self.prune()
+            except Exception as e:
+                print(f"Warning: Could not prune the page archive: {e}")
+        return sha
+
+    # -- retention -------------------------------------------------------
+
+    def _blob_files(self):
+        """{sha: [(path, size, mtime)]} of the blob files on disk"""
+        files = {}
+        root = os.path.join(self.directory, 'blobs')
+        for prefix in os.scandir(root):
+            if not prefix.is_dir():
+                continue
+            for blob in os.scandir(prefix.path):
+                sha, extension = os.path.splitext(blob.name)
+                if extension in ('.zst', '.z'):
+                    stat = blob.stat()
+                    files.setdefault(sha, []).append((blob.path, stat.st_size, stat.st_mtime))
+        return files
+
+    def prune(self, now=None):
+        """Drop fetches past max_age, then the oldest until the blobs fit the quota
+
+        Returns (fetches dropped, bytes freed).
+        """
+        if not self._prune_lock.acquire(blocking=False):
+            return 0, 0  # Another thread is pruning
+        try:
+            now = now if now is not None else time.time()
+            conn = self._connection()
+            rows = conn.execute('SELECT id, fetched_at, sha, text_sha FROM pages ORDER BY fetched_at, id').fetchall()
+            refs = Counter()
+            for row in rows:
+                refs[row['sha']] += 1
+                if row['text_sha']:
+                    refs[row['text_sha']] += 1
+            files = self._blob_files()
+            sizes = {sha: sum(size for _, size, _ in paths) for sha, paths in files.items()}
+            total = sum(sizes.values())
+
+            def release(sha):
+                refs[sha] -= 1
+                return sizes.get(sha, 0) if refs[sha] == 0 else 0
+
+            dropped = []
+            for row in rows:
+                if row['fetched_at'] >= now - self.max_age and total <= self.quota_bytes:
+                    break
+                total -= release(row['sha'])
+                if row['text_sha']:
+                    total -= release(row['text_sha'])
+                dropped.append(row['id'])
+
+            for start in range(0, len(dropped), 500):
+                chunk = dropped[start:start + 500]
+                conn.execute(f"DELETE FROM pages WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+            freed = 0
+            for sha, paths in files.items():
+                if refs[sha] > 0:
+                    continue
+                for path, size, mtime in paths:
+                    # A blob written (or reused) in the last 10 minutes may belong to a fetch that
+                    # is not indexed yet; older unreferenced ones are from dropped or failed fetches
+                    if mtime > time.time() - 600:
+                        continue
+                    try:
+                        os.remove(path)
+                        freed += size
+                    except FileNotFoundError:
+                        pass
+        finally:
+            self._prune_lock.release()
+        if dropped or freed:
+            print(f"🧹 Pruned {len(dropped)} archived fetches ({freed / 1e6:.1f} MB) - "
+                  f"keeping {self.max_age / 86400:.0f} days within {self.quota_bytes / 1e6:.0f} MB")
+        return len(dropped), freed
+
+    def entries(self, kind=None, key=None, since=None, latest_only=True):
+        """Return index rows (dicts) oldest first; with latest_only, only the newest fetch per (kind, key)"""
+        clauses, params = [], []
+        if kind:
+            clauses.append('kind = ?')
+            params.append(kind)
+        if key is not None:
+            clauses.append('key = ?')
+            params.append(str(key))
+        if since is not None:
+            clauses.append('fetched_at >= ?')
+            params.append(since)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        if latest_only:
+            sql = (f'SELECT * FROM pages WHERE id IN (SELECT MAX(id) FROM pages {where} GROUP BY kind, key) '
+                   'ORDER BY fetched_at, id')
+        else:
+            sql = f'SELECT * FROM pages {where} ORDER BY fetched_at, id'
+        return [dict(row) for row in self._connection().execute(sql, params)]
+
+    def entry(self, entry_id):
+        row = self._connection().execute('SELECT * FROM pages WHERE id = ?', (entry_id,)).fetchone()
+        return dict(row) if row else None
+
+
+_shared_archive = None
+_shared_lock = threading.Lock()
+
+
+def get_archive():
+    """Return the process-wide archive, or None when PAGE_ARCHIVE=0 disables it"""
+    global _shared_archive
+    if os.environ.get('PAGE_ARCHIVE', '1').lower() in ('0', 'false', 'no', 'off'):
+        return None
+    with _shared_lock:
+        if _shared_archive is None:
+            _shared_archive = PageArchive()
+        return _shared_archive
+
+
+def reextract_entry(archive, entry):
+    """Rerun the current extractors over one archived page; returns a list of vehicles"""
+    from scraper import parse_search_page, parse_lot_page, parse_lot_details
+    from lot_fetcher import is_lot_details_url
+
+    if entry['kind'] == SEARCH:
+        return parse_search_page(archive.get_text(entry['sha']), limit=10 ** 6,
+                                 description=entry['key'], fetched_at=entry['fetched_at'])
+    if entry['kind'] == LOT:
+        body_text = archive.get_text(entry['text_sha']) if entry['text_sha'] else None
+        vehicle = parse_lot_page(entry['key'], archive.get_text(entry['sha']), body_text,
+                                 fetched_at=entry['fetched_at'])
+        return [vehicle] if vehicle else []
+    if entry['kind'] == JSON and is_lot_details_url(entry['url']):
+        import json
+        details = ((json.loads(archive.get_blob(entry['sha'])) or {}).get('data') or {}).get('lotDetails')
+        vehicle = parse_lot_details(entry['key'], details, fetched_at=entry['fetched_at']) if details else None
+        return [vehicle] if vehicle else []
+    return []  # other intercepted JSON is kept for future extractors
@@ -0,0 +1,102 @@
+"""
+Two-stage pipeline for lot pages
+Playwright's sync API has to stay on the thread that started it, so lot pages are loaded
+on the calling thread while the previous page's HTML is parsed on a worker thread. The
+browser no longer waits for BeautifulSoup, and per-lot latency approaches
+max(load, parse) instead of their sum.
+"""
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import profiling
+
+
+class LotPipeline:
+    """Load on the calling thread, parse on a worker, finish in submission order on the calling thread
+
+    finish(item, parsed) is called for every submitted item, in order; `depth` is how
+    many parsed items may be outstanding while the next one loads.
+    """
+
+    def __init__(self, finish, depth=1, name="lot pages"):
+        self.finish = finish
+        self.depth = depth
+        self.name = name
+        self.pending = deque()  # (item, future or None, result when there was nothing to parse)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='lot-parse')
+
+        self.items = 0
+        self.load_seconds = 0.0
+        self.parse_seconds = 0.0
+        self.wait_seconds = 0.0  # calling thread blocked on a parse
+        self.started = None
+        self.finished = None
+
+    def _parse(self, parse, loaded):
+        started = time.perf_counter()
+        try:
+            return parse(loaded)
+        finally:
+            self.parse_seconds += time.perf_counter() - started
+
+    def submit(self, item, load=None, parse=None):
+        """Run load() now, queue parse(loaded) on the worker, and finish whatever is due"""
+        if self.started is None:
+            self.started = time.perf_counter()
+        self.items += 1
+        if load is None:
+            self.pending.append((item, None, None))
+        else:
+            started = time.perf_counter()
+            loaded = load()
+            self.load_seconds += time.perf_counter() - started
+            if parse is None:
+                self.pending.append((item, None, loaded))
+            else:
+                self.pending.append((item, self.executor.submit(self._parse, parse, loaded), None))
+        while len(self.pending) > self.depth:
+            self._finish_next()
+
+    def _finish_next(self):
+        item, future, result = self.pending.popleft()
+        if future is not None:
+            started = time.perf_counter()
+            result = future.result()
+            self.wait_seconds += time.perf_counter() - started
+        self.finish(item, result)
+
+    def drain(self):
+        """Finish everything submitted so far (keeps output in order around items handled elsewhere)"""
+        while self.pending:
+            self._finish_next()
+        if self.started is not None:
+            self.finished = time.perf_counter()
+
+    def close(self):
+        try:
+            self.drain()
+        finally:
+            self.executor.shutdown(wait=True)
+        profiling.record_stage(f"{self.name} parse (worker)", self.parse_seconds, self.items)
+        profiling.record_stage(f"{self.name} parse wait", self.wait_seconds, self.items)
+
+    def report(self):
+        """Stage totals; `overlap` is the parse time hidden behind loading"""
+        wall = (self.finished or time.perf_counter()) - self.started if self.started is not None else 0.0
+        return {
+            "items": self.items,
+            "wall": round(wall, 2),
+            "load": round(self.load_seconds, 2),
+            "parse": round(self.parse_seconds, 2),
+            "parse_wait": round(self.wait_seconds, 2),
+            "overlap": round(max(0.0, self.load_seconds + self.parse_seconds - wall), 2),
+        }
+
+    def print_report(self):
+        if not self.items:
+            return
+        report = self.report()
+        print(f"⚙️  Pipelined {report['items']} {self.name} in {report['wall']}s: loading {report['load']}s, "
+              f"parsing {report['parse']}s on a worker ({report['overlap']}s overlapped, "
+              f"{report['parse_wait']}s waited on parsing)")
@@ -0,0 +1,202 @@
+"""
+Opt-in profiling of scrape runs
+With SCRAPE_PROFILE=1, or after switching it on at runtime through /api/admin/profile
+(a flag file in the report directory, so every worker sees it), each run is wrapped in
+cProfile plus tracemalloc, the scraper's stages are timed, and a text report (plus the
+raw .prof file for snakeviz) is written to data/profiles
+"""
+import io
+import os
+import time
+import pstats
+import cProfile
+import functools
+import threading
+import tracemalloc
+
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'profiles')
+
+_local = threading.local()  # .run - the ProfileRun active in this thread
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+
+
+def report_dir():
+    return os.environ.get('PROFILE_DIR', DEFAULT_DIR)
+
+
+def _flag_path():
+    return os.path.join(report_dir(), 'ENABLED')
+
+
+def enabled():
+    """True when SCRAPE_PROFILE is set or profiling was switched on at runtime (checked per run)"""
+    if os.environ.get('SCRAPE_PROFILE', '0').lower() in ('1', 'true', 'yes', 'on'):
+        return True
+    return os.path.exists(_flag_path())
+
+
+def set_enabled(value):
+    """Switch profiling on or off for runs that start from now on, in every process"""
+    if value:
+        os.makedirs(report_dir(), exist_ok=True)
+        with open(_flag_path(), 'w') as f:
+            f.write(time.strftime('%Y-%m-%d %H:%M:%S\n'))
+    else:
+        try:
+            os.remove(_flag_path())
+        except FileNotFoundError:
+            pass
+
+
+def _start_tracemalloc():
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+        _tracemalloc_users += 1
+
+
+def _stop_tracemalloc():
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0:
+            tracemalloc.stop()
+
+
+class ProfileRun:
+    """One profiled run: cProfile for the calling thread, tracemalloc, and stage timings"""
+
+    def __init__(self, name):
+        self.name = name
+        self.stages = {}  # stage -> [calls, total seconds, max seconds]
+        self.profiler = cProfile.Profile()
+
+    def __enter__(self):
+        _start_tracemalloc()
+        tracemalloc.reset_peak()
+        self.memory_before = tracemalloc.take_snapshot()
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+        _local.run = self
+        self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.disable()
+        _local.run = None
+        self.duration = time.perf_counter() - self.started
+        self.memory_after = tracemalloc.take_snapshot()
+        self.current_memory, self.peak_memory = tracemalloc.get_traced_memory()
+        _stop_tracemalloc()
+        try:
+            path = self.write_report()
+            print(f"📊 Profile of {self.name} written to {path}")
+        except Exception as e:
+            print(f"Warning: Could not write profile report: {e}")
+        return False
+
+    def record_stage(self, stage, seconds, calls=1):
+        entry = self.stages.setdefault(stage, [0, 0.0, 0.0])
+        entry[0] += calls
+        entry[1] += seconds
+        entry[2] = max(entry[2], seconds / calls if calls else seconds)
+
+    def write_report(self, keep=30):
+        """Write <time>-<name>.txt and .prof, deleting all but the newest `keep` reports"""
+        directory = report_dir()
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(self.started_at))}"
+                            f"{int(self.started_at * 1000) % 1000:03d}-{self.name}")
+        self.profiler.dump_stats(base + '.prof')
+
+        out = io.StringIO()
+        out.write(f"Profile of {self.name} started {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started_at))}\n")
+        out.write(f"Duration: {self.duration:.2f}s   traced memory: {self.current_memory / 1e6:.1f} MB now, "
+                  f"{self.peak_memory / 1e6:.1f} MB peak\n\n")
+
+        out.write("Stages (wall time)\n")
+        out.write(f"  {'stage':<36} {'calls':>6} {'total s':>9} {'mean s':>8} {'max s':>8} {'% run':>6}\n")
+        for stage, (calls, total, longest) in sorted(self.stages.items(), key=lambda item: -item[1][1]):
+            out.write(f"  {stage:<36} {calls:>6} {total:>9.2f} {total / calls:>8.2f} {longest:>8.2f} "
+                      f"{100 * total / self.duration if self.duration else 0:>5.1f}%\n")
+
+        out.write("\nTop memory growth (tracemalloc, by line)\n")
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        growth = self.memory_after.filter_traces(ignore).compare_to(self.memory_before.filter_traces(ignore), 'lineno')
+        for stat in growth[:25]:
+            out.write(f"  {stat}\n")
+
+        out.write("\ncProfile (by cumulative time)\n")
+        stats = pstats.Stats(self.profiler, stream=out)
+        stats.sort_stats('cumulative').print_stats(60)
+
+        with open(base + '.txt', 'w', encoding='utf-8') as f:
+            f.write(out.getvalue())
+
+        reports = sorted(name for name in os.listdir(directory) if name.endswith('.txt'))
+        for name in reports[:max(0, len(reports) - keep)]:
+            for extension in ('.txt', '.prof'):
+                try:
+                    os.remove(os.path.join(directory, name[:-4] + extension))
+                except OSError:
+                    pass
+        return base + '.txt'
+
+
+def profile_run(func):
+    """Profile every call of `func` as one run while profiling is enabled (nested calls are stages)"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if getattr(_local, 'run', None) is not None:
+            return _timed(func.__name__, func, args, kwargs)
+        if not enabled():
+            return func(*args, **kwargs)
+        with ProfileRun(func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def profile_stage(func):
+    """Time every call of `func` as a stage of the run active in this thread (if any)"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if getattr(_local, 'run', None) is None:
+            return func(*args, **kwargs)
+        return _timed(func.__name__, func, args, kwargs)
+    return wrapper
+
+
+def _timed(stage, func, args, kwargs):
+    run = _local.run
+    started = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        run.record_stage(stage, time.perf_counter() - started)
+
+
+def list_reports():
+    """Return the report file names, newest first"""
+    directory = report_dir()
+    if not os.path.isdir(directory):
+        return []
+    return sorted((name for name in os.listdir(directory) if name.endswith('.txt')), reverse=True)
+
+
+def record_stage(stage, seconds, calls=1):
+    """Add time measured elsewhere (e.g. on a worker thread) to the run active in this thread"""
+    run = getattr(_local, 'run', None)
+    if run is not None and calls:
+        run.record_stage(stage, seconds, calls)
+
+
+def latest_report():
+    """Return (file name, text) of the newest report, or None"""
+    reports = list_reports()
+    if not reports:
+        return None
+    with open(os.path.join(report_dir(), reports[0]), encoding='utf-8') as f:
+        return reports[0], f.read()
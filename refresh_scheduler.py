@@ -0,0 +1,155 @@
+"""
+Closing-soon refresh scheduler
+Lots are kept in a heap ordered by when they next need their bid and sale status
+re-read; lots selling within the hour come up every minute, lots days away a few times a day
+"""
+import time
+import heapq
+
+from deadline import DeadlineExceeded
+from snapshot import vehicle_key
+from vehicle_fields import parse_timestamp, sale_timestamp, format_utc
+
+
+# (seconds until the sale, refresh interval) - first tier that fits wins
+REFRESH_TIERS = [
+    (15 * 60, 60),
+    (3600, 3 * 60),
+    (6 * 3600, 15 * 60),
+    (24 * 3600, 3600),
+    (None, 6 * 3600),
+]
+
+# Fields re-read on a refresh; everything else comes from the full scrape
+VOLATILE_FIELDS = ("current_bid", "auction_countdown", "sale_time_utc", "sale_info", "sale_status")
+
+# Keep polling a lot this long after its sale time so the final bid / status is captured
+SOLD_GRACE = 30 * 60
+
+
+def refresh_interval(seconds_to_sale, tiers=REFRESH_TIERS):
+    """Seconds between refreshes for a lot selling in `seconds_to_sale` (None = unknown)"""
+    if seconds_to_sale is None:
+        return tiers[-1][1]
+    for horizon, interval in tiers:
+        if horizon is None or seconds_to_sale <= horizon:
+            return interval
+    return tiers[-1][1]
+
+
+class RefreshScheduler:
+    """Min-heap of (due time, lot) with lazy deletion
+
+    Due times come from each vehicle's `refreshed_at` and sale time, so the schedule can
+    be rebuilt from the snapshot in any process.
+    """
+
+    def __init__(self, tiers=REFRESH_TIERS):
+        self.tiers = tiers
+        self._heap = []
+        self._due = {}  # lot -> due time of its live heap entry
+
+    def __len__(self):
+        return len(self._due)
+
+    def due_time(self, vehicle, now=None):
+        """When `vehicle` next needs a refresh, or None once its sale is long over"""
+        now = now if now is not None else time.time()
+        sale_time = sale_timestamp(vehicle, now)
+        if sale_time is not None and sale_time < now - SOLD_GRACE:
+            return None
+        seconds_to_sale = None if sale_time is None else max(0.0, sale_time - now)
+        last = parse_timestamp(vehicle.get("refreshed_at"))
+        if last is None:
+            return now
+        return last + refresh_interval(seconds_to_sale, self.tiers)
+
+    def schedule(self, vehicle, now=None):
+        """(Re)schedule a vehicle; lots whose sale is over are dropped"""
+        lot = vehicle_key(vehicle)
+        due = self.due_time(vehicle, now)
+        if due is None:
+            self._due.pop(lot, None)
+            return None
+        self._due[lot] = due
+        heapq.heappush(self._heap, (due, lot))
+        return due
+
+    def remove(self, lot):
+        self._due.pop(lot, None)
+
+    def sync(self, vehicles, now=None):
+        """Track exactly `vehicles` - new lots are added, missing ones dropped"""
+        keys = set()
+        for vehicle in vehicles:
+            keys.add(vehicle_key(vehicle))
+            self.schedule(vehicle, now)
+        for lot in [lot for lot in self._due if lot not in keys]:
+            del self._due[lot]
+        # Rebuild when stale entries dominate, so the heap stays proportional to the lots
+        if len(self._heap) > 2 * len(self._due) + 64:
+            self._heap = [(due, lot) for lot, due in self._due.items()]
+            heapq.heapify(self._heap)
+
+    def next_due(self):
+        """Earliest due time, or None when nothing is tracked"""
+        while self._heap:
+            due, lot = self._heap[0]
+            if self._due.get(lot) == due:
+                return due
+            heapq.heappop(self._heap)
+        return None
+
+    def pop_due(self, now=None, max_lots=None):
+        """Remove and return the lots due by `now`, most overdue first"""
+        now = now if now is not None else time.time()
+        lots = []
+        while self._heap and (max_lots is None or len(lots) < max_lots):
+            due, lot = self._heap[0]
+            if self._due.get(lot) != due:
+                heapq.heappop(self._heap)
+                continue
+            if due > now:
+                break
+            heapq.heappop(self._heap)
+            del self._due[lot]
+            lots.append(lot)
+        return lots
+
+
+def refresh_due_lots(scraper, vehicles, scheduler=None, max_lots=None, now=None):
+    """Re-scrape the lots that are due and merge their volatile fields
+
+    `vehicles` is the current list (e.g. snapshot.as_list()). Returns (new vehicle list,
+    refreshed lot numbers). Each due lot is re-read with scraper.scrape_copart_lot; a lot
+    the scraper can't read keeps its old data but is still stamped, so it isn't retried
+    in a tight loop. Stops early when scraper.deadline runs out; a lot cut off by it stays due.
+    """
+    scheduler = scheduler or RefreshScheduler()
+    now = now if now is not None else time.time()
+    scheduler.sync(vehicles, now)
+    by_lot = {vehicle_key(vehicle): vehicle for vehicle in vehicles}
+
+    refreshed = []
+    for lot in scheduler.pop_due(now, max_lots):
+        if scraper.deadline.expired():
+            break
+        try:
+            fresh = scraper.scrape_copart_lot(lot)
+        except DeadlineExceeded:
+            scheduler.schedule(by_lot[lot])  # Still due - first in line next pass
+            break
+        except Exception as e:
+            print(f"Error refreshing lot {lot}: {e}")
+            fresh = None
+        vehicle = dict(by_lot[lot])
+        if fresh:
+            for field in VOLATILE_FIELDS:
+                if field in fresh:
+                    vehicle[field] = fresh[field]
+        vehicle["refreshed_at"] = format_utc(time.time())
+        by_lot[lot] = vehicle
+        scheduler.schedule(vehicle)
+        refreshed.append(lot)
+
+    return [by_lot[vehicle_key(vehicle)] for vehicle in vehicles], refreshed
@@ -3,22 +3,94 @@ Copart Toyota Corolla Scraper
 Scrapes vehicle data from bid.cars and Copart with strict filtering
 Uses Playwright for better cloud deployment support
 """
-import time
 import re
 import os
-from playwright.sync_api import sync_playwright, Browser, Page
+import time
+from playwright.sync_api import sync_playwright, Browser, Page, TimeoutError as PlaywrightTimeoutError
 from bs4 import BeautifulSoup
+from throttle import BlockedError, detect_block, get_limiter
+from deadline import Deadline, DeadlineExceeded, ScrapeResult
+from vehicle_fields import stamp_scrape_times, parse_year, format_utc, format_sale_info
+from page_archive import get_archive, SEARCH, LOT, JSON
+from browser_lifecycle import BrowserLifecycle
+from lot_fetcher import get_client
+from latency import get_tracker
+from hedging import get_policy
+from profiling import profile_run, profile_stage
+from pipeline import LotPipeline
+from single_flight import get_group
+from gazetteer import resolve as resolve_places, resolve_page, resolve_slug
+
+
+# Default search: salvage Toyota Corollas in the MD/DC/NJ/NY yards
+COROLLA_SEARCH_URL = "https://www.copart.com/lotSearchResults?free=true&query=&qId=d26e8402-b785-43f7-921c-a63990404e77-1773372919072&index=0&searchCriteria=%7B%22query%22:%5B%22*%22%5D,%22filter%22:%7B%22FETI%22:%5B%22lot_condition_code:CERT-D%22%5D,%22LOC%22:%5B%22yard_name:%5C%22MD%20-%20BALTIMORE%5C%22%22,%22yard_name:%5C%22MD%20-%20BALTIMORE%20EAST%5C%22%22,%22yard_name:%5C%22NJ%20-%20SOMERVILLE%5C%22%22,%22yard_name:%5C%22NJ%20-%20TRENTON%5C%22%22,%22yard_name:%5C%22NY%20-%20SYRACUSE%5C%22%22,%22yard_name:%5C%22DC%20-%20WASHINGTON%20DC%5C%22%22%5D,%22MAKE%22:%5B%22lot_make_desc:%5C%22TOYOTA%5C%22%22%5D,%22MODL%22:%5B%22lot_model_desc:%5C%22COROLLA%5C%22%22%5D,%22NLTS%22:%5B%22expected_sale_assigned_ts_utc:%5BNOW%2FDAY-7DAY%20TO%20NOW%2FDAY%5D%22%5D,%22ODM%22:%5B%22odometer_reading_received:%5B0%20TO%20108000%5D%22%5D,%22PRID%22:%5B%22damage_type_code:DAMAGECODE_FR%22,%22damage_type_code:DAMAGECODE_RR%22,%22damage_type_code:DAMAGECODE_SD%22%5D,%22TITL%22:%5B%22title_group_code:TITLEGROUP_S%22%5D,%22YEAR%22:%5B%22lot_year:%5B2020%20TO%202026%5D%22%5D%7D,%22watchListOnly%22:false,%22searchName%22:%22%22,%22freeFormSearch%22:false%7D"
+
+# (description, search URL, max vehicles) run by extract_vehicles_from_search_results
+DEFAULT_SEARCHES = [
+    ("MD/DC/NJ", COROLLA_SEARCH_URL, 20),
+]
+
+# States a vehicle's location must be in to be kept
+ALLOWED_STATES = ['MD', 'DC', 'NJ', 'NY']
+
+# Gallery images on a lot page
+LOT_IMAGE_SELECTORS = [
+    'img.zoomImgElement',
+    'img.p-image-item-box',
+    'img.img-responsive',
+    '.zoomImgElement img',
+    '.p-image-item-box img',
+    '.img-responsive img',
+    'img.ng-star-inserted',
+]
+
+# Page types whose slow navigations get a hedged duplicate, and how often the race is polled
+HEDGED_KINDS = ('lot', 'lot-images')
+HEDGE_POLL_MS = 250
+
+# Consecutive fast path misses after which a scraper stops trying plain HTTP
+HTTP_MAX_MISS_STREAK = 3
 
 
 class CopartScraper:
     """Main scraper class for Copart vehicles"""
     
-    def __init__(self):
+    def __init__(self, states=None):
+        self.states = states  # Allowed location states of scraped lots (None: ALLOWED_STATES)
         self.browser = None
         self.page = None
         self.playwright = None
+        self.limiter = get_limiter()  # Shared by every page in this process
+        self.deadline = Deadline()  # No time budget unless the caller sets one
+        self.archive = get_archive()  # Raw pages for offline re-extraction (None if disabled)
+        self._captured = []  # JSON responses seen since the last archived page
+        self._hooked_page = None
+        self.lifecycle = BrowserLifecycle(self)  # Recycles the page/context as memory grows
+        self.http = get_client()  # JSON fast path for lot details (None if disabled)
+        self.latency = get_tracker()  # Learned timeouts per page type and wait
+        self.hedging = get_policy()  # Duplicate navigations for lot pages slower than p90
+        self.lot_flights = get_group('lot')  # Shared with other scrapers in this process
+        self.image_flights = get_group('lot-images')
+        self._http_miss_streak = 0
         # Don't initialize browser on creation - do it lazily when needed
     
+    def new_context(self):
+        """Create a browser context with the stealth settings"""
+        context = self.browser.new_context(
+            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            viewport={'width': 1920, 'height': 1080},
+            java_script_enabled=True,
+        )
+        
+        # Add script to hide webdriver property
+        context.add_init_script("""
+            Object.defineProperty(navigator, 'webdriver', {
+                get: () => undefined
+            });
+        """)
+        return context
+    
+    @profile_stage
     def setup_browser(self):
         """Setup Playwright browser with Browserless or local browser"""
         try:
@@ -53,22 +125,18 @@ class CopartScraper:
                         # Use existing context
                         context = contexts[0]
                         print("✅ Using existing Browserless context")
+                        
+                        # Add script to hide webdriver property
+                        context.add_init_script("""
+                            Object.defineProperty(navigator, 'webdriver', {
+                                get: () => undefined
+                            });
+                        """)
                     else:
                         # Create new context if none exists
-                        context = self.browser.new_context(
-                            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                            viewport={'width': 1920, 'height': 1080},
-                            java_script_enabled=True,
-                        )
+                        context = self.new_context()
                         print("✅ Created new Browserless context")
                     
-                    # Add script to hide webdriver property
-                    context.add_init_script("""
-                        Object.defineProperty(navigator, 'webdriver', {
-                            get: () => undefined
-                        });
-                    """)
-                    
                     # Get or create page
                     pages = context.pages
                     if pages:
@@ -100,18 +168,7 @@ class CopartScraper:
                 print("✅ Local browser launched")
                 
                 # Create context with stealth settings
-                context = self.browser.new_context(
-                    user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                    viewport={'width': 1920, 'height': 1080},
-                    java_script_enabled=True,
-                )
-                
-                # Add script to hide webdriver property
-                context.add_init_script("""
-                    Object.defineProperty(navigator, 'webdriver', {
-                        get: () => undefined
-                    });
-                """)
+                context = self.new_context()
                 
                 # Create page
                 self.page = context.new_page()
@@ -126,6 +183,8 @@ class CopartScraper:
     
     def close(self):
         """Close the browser"""
+        self.lifecycle.finish()
+        self.latency.save()
         try:
             if self.page:
                 self.page.close()
@@ -143,6 +202,223 @@ class CopartScraper:
         except:
             pass
     
+    def _wait(self, key, default_ms, wait):
+        """Run wait(timeout_ms) with the timeout learned for `key` (capped by the deadline) and record its latency
+        
+        Keys are "<page type>:<stage>", e.g. "lot:goto"; see latency.LatencyTracker.
+        """
+        learned = self.latency.timeout_ms(key, default_ms)
+        timeout = self.deadline.timeout_ms(learned)
+        started = time.monotonic()
+        try:
+            result = wait(timeout)
+        except PlaywrightTimeoutError:
+            if timeout == learned:  # A wait cut short by the deadline says nothing about the page
+                self.latency.record(key, time.monotonic() - started, timed_out=True)
+            raise
+        self.latency.record(key, time.monotonic() - started)
+        return result
+    
+    def _navigate(self, url, wait_until, timeout, kind):
+        """page.goto with the learned timeout; a lot page slower than its p90 gets a hedged duplicate
+        
+        The duplicate loads on a second page of the same context; whichever reaches
+        `wait_until` first becomes self.page and the other is closed. Returns the
+        navigation's response (None when the original page won after its goto timed out).
+        """
+        key = f"{kind}:goto"
+        trigger = self.hedging.trigger_ms(key) if kind in HEDGED_KINDS else None
+        learned = self.latency.timeout_ms(key, timeout)
+        limit = self.deadline.timeout_ms(learned)
+        if trigger is None or trigger >= limit or wait_until not in ('load', 'domcontentloaded', 'networkidle'):
+            return self._wait(key, timeout, lambda ms: self.page.goto(url, wait_until=wait_until, timeout=ms))
+        
+        # Until the original page commits the new navigation it still shows the previous
+        # document, whose load state must not be taken for this one's
+        original = self.page
+        committed = []
+        on_navigated = lambda frame: committed.append(frame.url) if frame == original.main_frame else None
+        original.on('framenavigated', on_navigated)
+        try:
+            return self._hedged_navigate(url, wait_until, key, trigger, limit, learned, original, committed)
+        finally:
+            original.remove_listener('framenavigated', on_navigated)
+    
+    def _hedged_navigate(self, url, wait_until, key, trigger, limit, learned, original, committed):
+        started = time.monotonic()
+        try:
+            response = original.goto(url, wait_until=wait_until, timeout=trigger)
+            self.latency.record(key, time.monotonic() - started)
+            return response
+        except PlaywrightTimeoutError:
+            pass  # Still loading - the navigation carries on in the page
+        
+        end = started + limit / 1000
+        hedge = None
+        if self.hedging.allow(self.limiter):
+            try:
+                hedge = original.context.new_page()
+                if self.archive:
+                    hedge.on('response', self._capture_response)
+                hedge_started = time.monotonic()
+                hedge.goto(url, wait_until='commit', timeout=max(1, int((end - hedge_started) * 1000)))
+                print(f"      🔀 Hedged slow lot page after {trigger / 1000:.1f}s: {url}")
+            except Exception:
+                self.hedging.count('failed')
+                self._close_quietly(hedge)
+                hedge = None
+        
+        # Poll both pages until one reaches the load state (the browser keeps loading the other)
+        while time.monotonic() < end:
+            for page in (original, hedge):
+                if page is None:
+                    continue
+                try:
+                    if page is original and not committed:
+                        page.wait_for_timeout(HEDGE_POLL_MS)  # Not committed yet: still loading
+                        continue
+                    page.wait_for_load_state(wait_until, timeout=HEDGE_POLL_MS)
+                except PlaywrightTimeoutError:
+                    continue
+                except Exception:
+                    if page is not hedge:
+                        if hedge is not None:
+                            self.hedging.count('failed')
+                            self._close_quietly(hedge)
+                        raise
+                    self.hedging.count('failed')  # The hedge broke; keep waiting on the original
+                    self._close_quietly(hedge)
+                    hedge = None
+                    continue
+                if page is hedge:
+                    self.hedging.count('won')
+                    self.latency.record(key, time.monotonic() - hedge_started)
+                    self.page = hedge
+                    self._hooked_page = hedge if self.archive else self._hooked_page
+                    self.lifecycle.page_replaced()
+                    self._close_quietly(original)
+                else:
+                    if hedge is not None:
+                        self.hedging.count('lost')
+                        self._close_quietly(hedge)
+                    self.latency.record(key, time.monotonic() - started)
+                return None
+        
+        if hedge is not None:
+            self.hedging.count('failed')
+            self._close_quietly(hedge)
+        if limit == learned:
+            self.latency.record(key, time.monotonic() - started, timed_out=True)
+        raise PlaywrightTimeoutError(f"Timeout {limit}ms exceeded loading {url}")
+    
+    @staticmethod
+    def _close_quietly(page):
+        if page is not None:
+            try:
+                page.close()
+            except Exception:
+                pass
+    
+    @profile_stage
+    def _goto(self, url, wait_until='domcontentloaded', timeout=30000, retries=2, kind='page'):
+        """Navigate through the shared rate limiter and fail fast on block pages
+        
+        A block/CAPTCHA page or HTTP 403/429 makes the limiter back off, then the
+        navigation is retried; BlockedError is raised once retries run out.
+        `timeout` is the default until enough "<kind>:goto" latencies are known.
+        Timeouts are capped by self.deadline, and DeadlineExceeded is raised rather
+        than starting a navigation after it has passed.
+        """
+        self.lifecycle.before_navigation()
+        if self.archive and self._hooked_page is not self.page:
+            self.page.on('response', self._capture_response)
+            self._hooked_page = self.page
+        self._captured = []
+        
+        for attempt in range(retries + 1):
+            self.limiter.acquire(deadline=self.deadline.at)
+            self.deadline.check(f"loading {url}")
+            try:
+                response = self._navigate(url, wait_until, timeout, kind)
+            except PlaywrightTimeoutError as e:
+                if self.deadline.expired():  # Cut short by the budget, not a slow page
+                    raise DeadlineExceeded(f"Time budget of {self.deadline.budget:.0f}s used up loading {url}") from e
+                raise
+            status = response.status if response else None
+            try:
+                size, head = self.page.evaluate(
+                    "() => { const html = document.documentElement ? document.documentElement.outerHTML : '';"
+                    " return [html.length, html.slice(0, 30000)]; }"
+                )
+            except Exception:
+                size, head = None, None
+            
+            reason = detect_block(status=status, html=head, size=size)
+            if not reason:
+                self.limiter.on_success()
+                self.lifecycle.after_navigation()
+                if self.http:
+                    self.http.load_cookies(self.page.context)  # Fresh cookies for the fast path
+                return response
+            
+            self.limiter.on_block(reason)
+            if attempt < retries:
+                print(f"   Retrying {url} after backoff (attempt {attempt + 2}/{retries + 1})...")
+        raise BlockedError(reason, url)
+    
+    def _capture_response(self, response):
+        """Remember XHR/fetch JSON responses (lot details, search results) for the archive"""
+        try:
+            if response.request.resource_type in ('xhr', 'fetch') and \
+                    'json' in response.headers.get('content-type', ''):
+                self._captured.append(response)
+        except Exception:
+            pass
+    
+    def _archive_page(self, kind, key, url, page_source, body_text=None):
+        """Store a fetched page and the JSON responses captured while it loaded"""
+        if not self.archive:
+            return
+        captured, self._captured = self._captured, []
+        try:
+            self.archive.put(kind, key, url, page_source, text=body_text)
+            for response in captured:
+                try:
+                    self.archive.put(JSON, key, response.url, response.body(), content_type='application/json')
+                except Exception:
+                    continue  # Body no longer available (redirect, page navigated away)
+        except Exception as e:
+            print(f"      ⚠️  Could not archive {kind} page {key}: {e}")
+    
+    def _use_fast_path(self):
+        """The fast path needs cookies from a browser visit and is dropped after repeated misses"""
+        return bool(self.http) and self.http.cookies_loaded_at is not None and \
+            self._http_miss_streak < HTTP_MAX_MISS_STREAK
+
+    def _fast_path_result(self, hit):
+        if hit:
+            self._http_miss_streak = 0
+            return
+        self._http_miss_streak += 1
+        self.http.fell_back()
+        if self._http_miss_streak == HTTP_MAX_MISS_STREAK:
+            print(f"   ⚠️  HTTP fast path missed {HTTP_MAX_MISS_STREAK} times in a row - using the browser only")
+
+    @profile_stage
+    def _fetch_lot_via_http(self, lot_number):
+        """Read a lot from the lot details JSON; returns (True, vehicle or None if filtered) or (False, None)"""
+        details, response = self.http.fetch_lot_details(lot_number, self.deadline)
+        self._fast_path_result(details is not None)
+        if details is None:
+            return False, None
+        if self.archive:
+            try:
+                self.archive.put(JSON, lot_number, response.url, response.content, content_type='application/json')
+            except Exception as e:
+                print(f"      ⚠️  Could not archive lot details {lot_number}: {e}")
+        return True, parse_lot_details(lot_number, details, states=self.states)
+    
+    @profile_stage
     def extract_vehicles_from_search_url(self, search_url, limit=20, description=""):
         """Extract all vehicle data directly from search results page (MUCH FASTER)"""
         vehicles = []
@@ -167,109 +443,33 @@ class CopartScraper:
         
         try:
             print(f"Navigating to Copart search results ({description})...")
-            self.page.goto(search_url, wait_until='domcontentloaded', timeout=60000)
+            self._goto(search_url, wait_until='domcontentloaded', timeout=60000, kind='search')
             
             # Wait for page to load - Copart uses heavy JavaScript rendering
             print("Waiting for page to load...")
-            time.sleep(10)  # Increased wait time for JavaScript to render
+            self.deadline.sleep(10)  # Increased wait time for JavaScript to render
             
             # Wait for content to be ready
             try:
-                self.page.wait_for_load_state('networkidle', timeout=30000)
+                self._wait('search:networkidle', 30000,
+                           lambda ms: self.page.wait_for_load_state('networkidle', timeout=ms))
             except:
                 pass
             
             # Additional wait for dynamic content
-            time.sleep(5)
+            self.deadline.sleep(5)
             
             # Try to wait for any lot links to appear
             try:
-                self.page.wait_for_selector('a[href*="/lot/"]', timeout=15000, state='attached')
+                self._wait('search:lot-links', 15000,
+                           lambda ms: self.page.wait_for_selector('a[href*="/lot/"]', timeout=ms, state='attached'))
                 print("✅ Lot links detected on page")
             except:
                 print("⚠️  No lot links found after waiting - page may require login or have no results")
             
             page_source = self.page.content()
-            soup = BeautifulSoup(page_source, 'html.parser')
-            
-            # Extract vehicles from search results table/rows
-            # Copart search results are typically in table rows or div containers
-            vehicle_rows = []
-            
-            # Method 1: Look for table rows with lot data
-            table_rows = soup.find_all('tr')
-            method1_count = 0
-            for row in table_rows:
-                row_text = row.get_text()
-                # Check if row contains lot number pattern
-                if re.search(r'Lot\s*#\s*:?\s*\d{8}', row_text, re.IGNORECASE) or re.search(r'1-\d{8}', row_text):
-                    vehicle_rows.append(row)
-                    method1_count += 1
-            if method1_count > 0:
-                print(f"    Method 1 found {method1_count} rows")
-            
-            # Method 2: Look for div containers with lot data
-            if not vehicle_rows:
-                lot_containers = soup.find_all(['div', 'section'], attrs={'data-lot-number': True})
-                vehicle_rows.extend(lot_containers)
-                if lot_containers:
-                    print(f"    Method 2 found {len(lot_containers)} containers")
-            
-            # Method 3: Look for elements with lot links - use link itself (href contains all data)
-            if not vehicle_rows:
-                print(f"    Trying Method 3: Looking for lot links...")
-                lot_links = soup.find_all('a', href=re.compile(r'/lot/\d+'))
-                print(f"    Found {len(lot_links)} lot links in page")
-                seen_lots = set()
-                for link in lot_links:
-                    # Extract lot number from href
-                    href = link.get('href', '')
-                    lot_match = re.search(r'/lot/(\d+)', href)
-                    if lot_match:
-                        lot_num = lot_match.group(1)
-                        if lot_num not in seen_lots:  # Avoid duplicates
-                            seen_lots.add(lot_num)
-                            # Use the link itself - it has the href with lot, year, location data
-                            vehicle_rows.append(link)
-                print(f"    Method 3 added {len(vehicle_rows)} unique links to vehicle_rows")
-            
-            # Method 4: Extract directly from lot links - use link itself as row element
-            if not vehicle_rows:
-                lot_links = soup.find_all('a', href=re.compile(r'/lot/\d+'))
-                seen_lots = set()
-                for link in lot_links[:limit*2]:  # Get more links to account for duplicates
-                    href = link.get('href', '')
-                    lot_match = re.search(r'/lot/(\d+)', href)
-                    if lot_match:
-                        lot_num = lot_match.group(1)
-                        if lot_num not in seen_lots:
-                            seen_lots.add(lot_num)
-                            # Use the link itself as the row element (it contains the href with all data)
-                            vehicle_rows.append(link)
-            
-            print(f"  Found {len(vehicle_rows)} vehicle rows from {description}")
-            
-            # Extract data from each row
-            for i, row in enumerate(vehicle_rows[:limit], 1):
-                try:
-                    # Debug: check what type of element we have
-                    if i <= 3:  # Only debug first 3
-                        if hasattr(row, 'name'):
-                            print(f"    Row {i}: {row.name}, href: {row.get('href', 'N/A')[:50] if row.name == 'a' else 'N/A'}")
-                    
-                    vehicle = self._extract_vehicle_from_row(row, page_source)
-                    if vehicle and vehicle.get("lot_number") != "N/A":
-                        vehicles.append(vehicle)
-                        if len(vehicles) >= limit:
-                            break
-                    elif vehicle:
-                        if i <= 3:
-                            print(f"    Row {i}: Extracted but lot_number is N/A")
-                except Exception as e:
-                    print(f"  Error extracting vehicle {i}: {str(e)}")
-                    continue
-            
-            print(f"  Extracted {len(vehicles)} vehicles from {description}")
+            self._archive_page(SEARCH, description, search_url, page_source)
+            vehicles = parse_search_page(page_source, limit=limit, description=description)
             return vehicles
             
         except Exception as e:
@@ -278,7 +478,8 @@ class CopartScraper:
             traceback.print_exc()
             return vehicles
     
-    def _extract_vehicle_from_row(self, row_element, page_source):
+    @staticmethod
+    def _extract_vehicle_from_row(row_element, page_source, fetched_at=None):
         """Extract vehicle data from a search results row"""
         vehicle = {
             "lot_number": "N/A",
@@ -331,12 +532,11 @@ class CopartScraper:
                     except:
                         pass
                 
-                # Extract location from href: ...-md-baltimore or ...-nj-...
-                location_match = re.search(r'-(md|dc|nj|ny)-', href, re.IGNORECASE)
-                if location_match:
-                    state = location_match.group(1).upper()
+                # Extract location from href: ...-md-baltimore or ...-nj-trenton
+                state, yard = resolve_slug(href)
+                if state:
                     vehicle["location_state"] = state
-                    vehicle["location"] = state
+                    vehicle["location"] = yard
                 
                 # Extract damage from href if present
                 damage_keywords = ['front', 'rear', 'side', 'all-over', 'vandalism', 'hail', 'water', 'flood']
@@ -411,27 +611,11 @@ class CopartScraper:
                 vehicle["damage"] = damage
                 break
         
-        # Extract Location (MD, DC, NJ, NY)
-        location_patterns = [
-            r'\b(MD|DC|NJ|NY|Maryland|District of Columbia|New Jersey|New York)\b',
-        ]
-        for pattern in location_patterns:
-            location_match = re.search(pattern, row_text, re.IGNORECASE)
-            if location_match:
-                state_text = location_match.group(1).upper()
-                if state_text in ['MD', 'MARYLAND']:
-                    vehicle["location_state"] = 'MD'
-                    vehicle["location"] = 'MD'
-                elif state_text in ['DC', 'DISTRICT OF COLUMBIA']:
-                    vehicle["location_state"] = 'DC'
-                    vehicle["location"] = 'DC'
-                elif state_text in ['NJ', 'NEW JERSEY']:
-                    vehicle["location_state"] = 'NJ'
-                    vehicle["location"] = 'NJ'
-                elif state_text in ['NY', 'NEW YORK']:
-                    vehicle["location_state"] = 'NY'
-                    vehicle["location"] = 'NY'
-                break
+        # Extract Location (yard, city or state named in the row)
+        places = resolve_places(row_text)
+        if places["state"] and places["state"] != vehicle["location_state"]:
+            vehicle["location_state"] = places["state"]
+            vehicle["location"] = places["location"]
         
         # Extract Current Bid
         bid_patterns = [
@@ -475,6 +659,7 @@ class CopartScraper:
         
         # Only return vehicle if we have at least a lot number
         if vehicle["lot_number"] != "N/A":
+            stamp_scrape_times(vehicle, fetched_at)
             return vehicle
         else:
             # Debug: check if we have a link but didn't extract lot number
@@ -484,15 +669,31 @@ class CopartScraper:
         
         return None
     
-    def extract_vehicles_from_search_results(self, filter_by_location=False):
+    def extract_vehicles_from_search_results(self, filter_by_location=False, journal=None, searches=None, states=None, on_vehicle=None, limit=None):
         """Extract all vehicle data directly from search results (MUCH FASTER - no individual page visits)
         
         Strategy: Split into two searches to bypass pagination:
         1. Search for MD/DC/NJ (20 cars) - extract all data from search page
         2. Search for NY (20 cars) - extract all data from search page
         3. Merge and filter results
+        
+        searches: list of (description, search URL, limit) - defaults to DEFAULT_SEARCHES
+        states: allowed location states - defaults to ALLOWED_STATES
+        on_vehicle: called with each vehicle as soon as its lot page is done
+        limit: keep at most this many vehicles - lots past it are never visited or emitted
+        
+        With a journal (see journal.RunJournal), every finished search (keyed by its URL)
+        and enriched lot is recorded as it completes, and work already in the journal is skipped.
+        
+        Returns a ScrapeResult. When self.deadline runs out, remaining searches are
+        skipped, remaining lots keep their search-page data with the default image URL,
+        and the result is marked partial (the journal is left open for a resume).
         """
         all_vehicles = []
+        filtered_vehicles = []
+        stopped = None
+        searches = searches or DEFAULT_SEARCHES
+        states = states or ALLOWED_STATES
         
         # Initialize browser if not already done
         if not self.page:
@@ -506,141 +707,113 @@ class CopartScraper:
             return all_vehicles
         
         try:
-            # Search 1: MD, DC, NJ (20 cars)
-            search_url_md_dc_nj = "https://www.copart.com/lotSearchResults?free=true&query=&qId=d26e8402-b785-43f7-921c-a63990404e77-1773372919072&index=0&searchCriteria=%7B%22query%22:%5B%22*%22%5D,%22filter%22:%7B%22FETI%22:%5B%22lot_condition_code:CERT-D%22%5D,%22LOC%22:%5B%22yard_name:%5C%22MD%20-%20BALTIMORE%5C%22%22,%22yard_name:%5C%22MD%20-%20BALTIMORE%20EAST%5C%22%22,%22yard_name:%5C%22NJ%20-%20SOMERVILLE%5C%22%22,%22yard_name:%5C%22NJ%20-%20TRENTON%5C%22%22,%22yard_name:%5C%22NY%20-%20SYRACUSE%5C%22%22,%22yard_name:%5C%22DC%20-%20WASHINGTON%20DC%5C%22%22%5D,%22MAKE%22:%5B%22lot_make_desc:%5C%22TOYOTA%5C%22%22%5D,%22MODL%22:%5B%22lot_model_desc:%5C%22COROLLA%5C%22%22%5D,%22NLTS%22:%5B%22expected_sale_assigned_ts_utc:%5BNOW%2FDAY-7DAY%20TO%20NOW%2FDAY%5D%22%5D,%22ODM%22:%5B%22odometer_reading_received:%5B0%20TO%20108000%5D%22%5D,%22PRID%22:%5B%22damage_type_code:DAMAGECODE_FR%22,%22damage_type_code:DAMAGECODE_RR%22,%22damage_type_code:DAMAGECODE_SD%22%5D,%22TITL%22:%5B%22title_group_code:TITLEGROUP_S%22%5D,%22YEAR%22:%5B%22lot_year:%5B2020%20TO%202026%5D%22%5D%7D,%22watchListOnly%22:false,%22searchName%22:%22%22,%22freeFormSearch%22:false%7D"
-            
-            print("  Starting search 1: MD/DC/NJ...")
-            vehicles_1 = self.extract_vehicles_from_search_url(
-                search_url_md_dc_nj, 
-                limit=20, 
-                description="MD/DC/NJ"
-            )
-            print(f"  Search 1 returned {len(vehicles_1)} vehicles")
-            all_vehicles.extend(vehicles_1)
-            
-            # Search 2: NY (20 cars)
-            
+            search_counts = []
+            for search_number, (description, search_url, search_limit) in enumerate(searches, 1):
+                search_vehicles = journal.search_results(search_url) if journal else None
+                if search_vehicles is not None:
+                    print(f"  Search {search_number} ({description}) already journaled: {len(search_vehicles)} vehicles")
+                elif self.deadline.expired():
+                    stopped = f"time budget used up before search {description}"
+                    print(f"  ⏱️  Skipping search {search_number} ({description}): time budget used up")
+                    continue
+                else:
+                    print(f"  Starting search {search_number}: {description}...")
+                    search_vehicles = self.extract_vehicles_from_search_url(
+                        search_url, 
+                        limit=search_limit, 
+                        description=description
+                    )
+                    print(f"  Search {search_number} returned {len(search_vehicles)} vehicles")
+                    # Only journal searches that found something so an empty/blocked page is retried
+                    if journal and search_vehicles:
+                        journal.record_search(search_url, search_vehicles)
+                search_counts.append((description, len(search_vehicles)))
+                all_vehicles.extend(search_vehicles)
             
             # Filter vehicles by location, title, and odometer
-            filtered_vehicles = []
             for vehicle in all_vehicles:
-                # Check location
-                location_state = vehicle.get("location_state", "N/A")
-                if location_state not in ['MD', 'DC', 'NJ', 'NY']:
-                    continue
-                
-                # Check title (must be Salvage) - also check href for salvage keyword
-                title = vehicle.get("title", "").upper()
-                url = vehicle.get("url", "").upper()
-                if "SALVAGE" not in title and "SALVAGE" not in url:
-                    # Check if href contains salvage (most reliable)
-                    continue
-                
-                # Filter by odometer (must be under 100,000 miles)
-                odometer = vehicle.get('odometer', 'N/A')
-                if odometer != 'N/A':
-                    try:
-                        # Remove commas and convert to int
-                        odometer_value = int(str(odometer).replace(',', '').replace(' ', ''))
-                        if odometer_value >= 100000:
-                            continue  # Skip vehicles with 100,000+ miles
-                    except (ValueError, AttributeError):
-                        # If odometer can't be parsed, skip this vehicle
-                        continue
-                else:
-                    # If odometer is N/A, skip this vehicle (we only want vehicles with known odometer)
-                    continue
-                
-                filtered_vehicles.append(vehicle)
+                if passes_search_filters(vehicle, states):
+                    filtered_vehicles.append(vehicle)
+            if limit and len(filtered_vehicles) > limit:
+                print(f"   - Keeping the first {limit} of {len(filtered_vehicles)} vehicles that passed the filters")
+                filtered_vehicles = filtered_vehicles[:limit]
             
             print(f"\n✅ Total vehicles extracted: {len(all_vehicles)}")
-            print(f"   - From MD/DC/NJ: {len(vehicles_1)}")
-            print(f"   - From NY: {len(vehicles_2)}")
+            for description, count in search_counts:
+                print(f"   - From {description}: {count}")
             print(f"   - After filtering: {len(filtered_vehicles)}")
             
             # Fetch high-quality images from individual lot pages for ALL vehicles
             print(f"\n📸 Fetching high-quality images from individual lot pages for {len(filtered_vehicles)} vehicles...")
             vehicles_with_images = []
-            for i, vehicle in enumerate(filtered_vehicles, 1):
-                lot_number = vehicle.get("lot_number", "N/A")
-                # Clean lot number - remove any prefixes or spaces
-                if lot_number != "N/A":
-                    lot_number = str(lot_number).strip()
-                    # Remove "1-" prefix if present
-                    if lot_number.startswith('1-'):
-                        lot_number = lot_number[2:]
-                    vehicle["lot_number"] = lot_number
-                
+            unvisited = []  # Lots skipped because the time budget ran out
+            
+            def finish_lot(item, lot_images):
+                """Runs in lot order once a lot page has been parsed"""
+                vehicle, lot_number = item
                 if lot_number != "N/A" and lot_number:
-                    try:
-                        print(f"  [{i}/{len(filtered_vehicles)}] Fetching images for lot {lot_number}...")
-                        lot_images = self._fetch_images_from_lot_page(lot_number)
-                        if lot_images and len(lot_images) > 0:
-                            # CRITICAL: Ensure ALL images maintain maximum quality - clean EVERY image URL
-                            high_quality_images = []
-                            for img_url in lot_images:
-                                # Clean URL to ensure maximum quality - apply ALL quality improvements
-                                clean_url = str(img_url).strip()
-                                
-                                # Step 1: Replace ALL size paths with /full/ for maximum quality
-                                clean_url = clean_url.replace('/thumb/', '/full/')
-                                clean_url = clean_url.replace('/small/', '/full/')
-                                clean_url = clean_url.replace('/medium/', '/full/')
-                                clean_url = clean_url.replace('/large/', '/full/')
-                                
-                                # Step 2: Remove ALL size/quality/scale/resize parameters
-                                clean_url = re.sub(r'[?&](width|height|w|h|size|quality|scale|resize|maxwidth|maxheight)=\d+', '', clean_url)
-                                
-                                # Step 3: CRITICAL - For Copart CDN images, reconstruct to maximum quality format
-                                if 'cs.copart.com' in clean_url:
-                                    # Extract lot number and image number from URL
-                                    copart_match = re.search(r'cs\.copart\.com/v1/AUTH_svc\.pdoc/(\d+)/(\d+)/(?:thumb|small|medium|large|full)/(\d+)_(\d+)\.jpg', clean_url, re.IGNORECASE)
-                                    if copart_match:
-                                        account, lot_num, lot_num2, img_num = copart_match.groups()
-                                        # Reconstruct to maximum quality format: /00000/{lot}/full/{lot}_{num}.jpg
-                                        clean_url = f"https://cs.copart.com/v1/AUTH_svc.pdoc/00000/{lot_num}/full/{lot_num}_{img_num}.jpg"
-                                    else:
-                                        # Fallback: replace any size path with /full/
-                                        clean_url = re.sub(r'/(thumb|small|medium|large)/', '/full/', clean_url, flags=re.IGNORECASE)
-                                        # Try to fix account number to 00000
-                                        clean_url = re.sub(r'/v1/AUTH_svc\.pdoc/\d+/(\d+)/', r'/v1/AUTH_svc.pdoc/00000/\1/', clean_url)
-                                
-                                # Step 4: Remove trailing query parameters that might affect quality
-                                if '?' in clean_url:
-                                    base_url = clean_url.split('?')[0]
-                                    clean_url = base_url
-                                
-                                # Step 5: Final validation - ensure it's a valid URL
-                                if clean_url.startswith('http') and 'copart' in clean_url.lower():
-                                    high_quality_images.append(clean_url)
-                            
-                            # Store only the first image
-                            vehicle["images"] = high_quality_images[:1] if high_quality_images else []
-                            print(f"      ✅ Found {len(high_quality_images)} high-quality images, keeping first image only")
-                            if vehicle["images"]:
-                                print(f"      📸 First image URL for lot {lot_number}: {vehicle['images'][0]}")
-                        else:
-                            # Fallback to default high-quality URL (first image only)
-                            first_default_image = f"https://cs.copart.com/v1/AUTH_svc.pdoc/00000/{lot_number}/full/{lot_number}_1.jpg"
-                            vehicle["images"] = [first_default_image]
-                            print(f"      ⚠️  Using default high-quality image URL (first image only)")
-                            print(f"      📸 Default image URL for lot {lot_number}: {first_default_image}")
-                    except Exception as e:
-                        print(f"      ⚠️  Error fetching images: {e}")
-                        import traceback
-                        traceback.print_exc()
-                        # Fallback to default high-quality URL (first image only)
-                        first_default_image = f"https://cs.copart.com/v1/AUTH_svc.pdoc/00000/{lot_number}/full/{lot_number}_1.jpg"
-                        vehicle["images"] = [first_default_image]
-                        print(f"      ✅ Using fallback high-quality URL (first image only)")
-                        print(f"      📸 Fallback image URL for lot {lot_number}: {first_default_image}")
-                else:
-                    # Vehicle has no lot number - use empty images
-                    vehicle["images"] = []
-                    print(f"      ⚠️  No lot number found, skipping image fetch")
+                    self._attach_lot_images(vehicle, lot_number, lot_images)
                 
                 # Always add vehicle, even if no images found (will use defaults)
                 vehicles_with_images.append(vehicle)
+                if journal:
+                    journal.record_lot(lot_number, vehicle)
+                if on_vehicle:
+                    on_vehicle(vehicle)
+            
+            # Lot i is parsed on a worker thread while the browser loads lot i+1
+            pipeline = LotPipeline(finish_lot)
+            try:
+                for i, vehicle in enumerate(filtered_vehicles, 1):
+                    lot_number = vehicle.get("lot_number", "N/A")
+                    # Clean lot number - remove any prefixes or spaces
+                    if lot_number != "N/A":
+                        lot_number = str(lot_number).strip()
+                        # Remove "1-" prefix if present
+                        if lot_number.startswith('1-'):
+                            lot_number = lot_number[2:]
+                        vehicle["lot_number"] = lot_number
+                    
+                    if journal and journal.has_lot(lot_number):
+                        pipeline.drain()  # Keep vehicles in lot order
+                        print(f"  [{i}/{len(filtered_vehicles)}] Lot {lot_number} already journaled")
+                        vehicles_with_images.append(journal.lot_result(lot_number))
+                        if on_vehicle:
+                            on_vehicle(journal.lot_result(lot_number))
+                        continue
+                    
+                    if self.deadline.expired():
+                        # Out of time - keep the search-page data, but don't journal it so a resume enriches it
+                        pipeline.drain()
+                        if not unvisited:
+                            stopped = f"time budget used up after {i - 1}/{len(filtered_vehicles)} lots"
+                            print(f"  ⏱️  Time budget used up - returning the remaining {len(filtered_vehicles) - i + 1} lots without visiting them")
+                        vehicle["images"] = [f"https://cs.copart.com/v1/AUTH_svc.pdoc/00000/{lot_number}/full/{lot_number}_1.jpg"] if lot_number != "N/A" else []
+                        unvisited.append(vehicle)
+                        if on_vehicle:
+                            on_vehicle(vehicle)
+                        continue
+                    
+                    if lot_number != "N/A" and lot_number:
+                        print(f"  [{i}/{len(filtered_vehicles)}] Fetching images for lot {lot_number}...")
+                        pipeline.submit((vehicle, lot_number),
+                                        load=lambda lot=lot_number: self._load_lot_page(lot),
+                                        parse=lambda loaded, lot=lot_number: self._parse_loaded_lot(lot, loaded))
+                    else:
+                        # Vehicle has no lot number - use empty images
+                        vehicle["images"] = []
+                        print(f"      ⚠️  No lot number found, skipping image fetch")
+                        pipeline.submit((vehicle, lot_number))
+            finally:
+                pipeline.close()
+            pipeline.print_report()
+            
+            # The run's result is whatever the journal holds for these lots
+            if journal:
+                unvisited_lots = {v.get("lot_number") for v in unvisited}
+                vehicles_with_images = journal.vehicles([v.get("lot_number") for v in filtered_vehicles
+                                                         if v.get("lot_number") not in unvisited_lots])
+            vehicles_with_images.extend(unvisited)
             
             print(f"\n✅ Image fetching complete: {len(vehicles_with_images)} vehicles processed")
             print(f"   - Vehicles with images: {sum(1 for v in vehicles_with_images if v.get('images') and len(v.get('images', [])) > 0)}")
@@ -660,249 +833,124 @@ class CopartScraper:
                     print("   ⚠️  No images found")
             print("=" * 80)
             
-            return vehicles_with_images
+            if stopped:
+                print(f"⏱️  Partial result: {stopped}")
+            elif journal:
+                journal.finish()
+            return ScrapeResult(vehicles_with_images, partial=bool(stopped), reason=stopped)
             
         except Exception as e:
             print(f"Error extracting vehicles: {str(e)}")
             import traceback
             traceback.print_exc()
-            return filtered_vehicles
+            return ScrapeResult(filtered_vehicles, partial=True, reason=str(e))
     
-    def _fetch_images_from_lot_page(self, lot_number):
-        """Fetch high-quality images from a specific lot page"""
-        if not self.page:
-            return []
+    def _attach_lot_images(self, vehicle, lot_number, lot_images=None):
+        """Store the first lot page image, at maximum quality, on the vehicle
         
+        lot_images are the lot page's image URLs; they are fetched here when not given.
+        """
         try:
-            # Remove "1-" prefix if present
-            if lot_number.startswith('1-'):
-                lot_number = lot_number[2:]
-            
-            copart_url = f"https://www.copart.com/lot/{lot_number}"
-            
-            # Navigate to the lot page
-            self.page.goto(copart_url, wait_until='networkidle', timeout=20000)
-            time.sleep(2)  # Wait for images to load
-            
-            # Get page source
-            page_source = self.page.content()
-            soup = BeautifulSoup(page_source, 'html.parser')
-            
-            images = []
-            
-            # Method 1: Use specific CSS classes for Copart image elements
-            # Look for images with classes: zoomImgElement p-image-item-box img-responsive ng-star-inserted
-            print(f"      🔍 Searching for images using CSS classes: zoomImgElement, p-image-item-box, img-responsive, ng-star-inserted")
-            
-            css_selectors = [
-                'img.zoomImgElement',
-                'img.p-image-item-box',
-                'img.img-responsive',
-                '.zoomImgElement img',
-                '.p-image-item-box img',
-                '.img-responsive img',
-                'img.ng-star-inserted'
-            ]
-            
-            for selector in css_selectors:
-                try:
-                    # Try using Playwright's CSS selector
-                    img_elements = self.page.query_selector_all(selector)
-                    print(f"      Found {len(img_elements)} elements with selector: {selector}")
-                    for img_elem in img_elements:
-                        img_src = img_elem.get_attribute('src') or img_elem.get_attribute('data-src') or img_elem.get_attribute('data-full') or img_elem.get_attribute('data-original')
-                        if img_src:
-                            if img_src.startswith('//'):
-                                img_src = 'https:' + img_src
-                            elif img_src.startswith('/'):
-                                img_src = 'https://www.copart.com' + img_src
-                            
-                            # CRITICAL: For Copart CDN images, reconstruct to maximum quality format
-                            if 'cs.copart.com' in img_src:
-                                copart_match = re.search(r'cs\.copart\.com/v1/AUTH_svc\.pdoc/(\d+)/(\d+)/(?:thumb|small|medium|large|full)/(\d+)_(\d+)\.jpg', img_src, re.IGNORECASE)
-                                if copart_match:
-                                    account, lot_num, lot_num2, img_num = copart_match.groups()
-                                    img_src = f"https://cs.copart.com/v1/AUTH_svc.pdoc/00000/{lot_num}/full/{lot_num}_{img_num}.jpg"
-                                else:
-                                    img_src = re.sub(r'/(thumb|small|medium|large)/', '/full/', img_src, flags=re.IGNORECASE)
-                                    img_src = re.sub(r'/v1/AUTH_svc\.pdoc/\d+/(\d+)/', r'/v1/AUTH_svc.pdoc/00000/\1/', img_src)
-                            else:
-                                img_src = img_src.replace('/thumb/', '/full/').replace('/small/', '/full/').replace('/medium/', '/full/').replace('/large/', '/full/')
-                            
-                            # Remove query parameters
-                            if '?' in img_src:
-                                img_src = img_src.split('?')[0]
-                            
-                            if img_src.startswith('http') and img_src not in images:
-                                images.append(img_src)
-                                print(f"         ✅ Found image: {img_src[:80]}...")
-                except Exception as e:
-                    pass
-            
-            # Method 1b: Also use BeautifulSoup to find images with these classes
-            # Look for images with classes: zoomImgElement p-image-item-box img-responsive ng-star-inserted
-            img_tags = soup.find_all('img', class_=lambda x: x and ('zoomImgElement' in str(x) or 'p-image-item-box' in str(x) or 'img-responsive' in str(x) or 'ng-star-inserted' in str(x)))
-            print(f"      Found {len(img_tags)} img tags with CSS classes using BeautifulSoup")
-            for img in img_tags:
-                # Prioritize high-quality attributes
-                img_src = img.get('data-full') or img.get('data-original') or img.get('data-src') or img.get('src') or img.get('data-lazy-src') or img.get('data-image')
-                if img_src:
-                    if img_src.startswith('//'):
-                        img_src = 'https:' + img_src
-                    elif img_src.startswith('/'):
-                        img_src = 'https://www.copart.com' + img_src
-                    
-                    # CRITICAL: For Copart CDN images, reconstruct to maximum quality format
-                    if 'cs.copart.com' in img_src:
-                        copart_match = re.search(r'cs\.copart\.com/v1/AUTH_svc\.pdoc/(\d+)/(\d+)/(?:thumb|small|medium|large|full)/(\d+)_(\d+)\.jpg', img_src, re.IGNORECASE)
-                        if copart_match:
-                            account, lot_num, lot_num2, img_num = copart_match.groups()
-                            img_src = f"https://cs.copart.com/v1/AUTH_svc.pdoc/00000/{lot_num}/full/{lot_num}_{img_num}.jpg"
-                        else:
-                            img_src = re.sub(r'/(thumb|small|medium|large)/', '/full/', img_src, flags=re.IGNORECASE)
-                            img_src = re.sub(r'/v1/AUTH_svc\.pdoc/\d+/(\d+)/', r'/v1/AUTH_svc.pdoc/00000/\1/', img_src)
-                    else:
-                        img_src = img_src.replace('/thumb/', '/full/').replace('/small/', '/full/').replace('/medium/', '/full/').replace('/large/', '/full/')
+            if lot_images is None:
+                lot_images = self._fetch_images_from_lot_page(lot_number)
+            if lot_images and len(lot_images) > 0:
+                # CRITICAL: Ensure ALL images maintain maximum quality - clean EVERY image URL
+                high_quality_images = []
+                for img_url in lot_images:
+                    # Clean URL to ensure maximum quality - apply ALL quality improvements
+                    clean_url = str(img_url).strip()
                     
-                    # Remove query parameters
-                    img_src = re.sub(r'[?&](width|height|w|h|size|quality|scale|resize|maxwidth|maxheight)=\d+', '', img_src)
-                    if '?' in img_src:
-                        img_src = img_src.split('?')[0]
+                    # Step 1: Replace ALL size paths with /full/ for maximum quality
+                    clean_url = clean_url.replace('/thumb/', '/full/')
+                    clean_url = clean_url.replace('/small/', '/full/')
+                    clean_url = clean_url.replace('/medium/', '/full/')
+                    clean_url = clean_url.replace('/large/', '/full/')
                     
-                    if img_src.startswith('http') and img_src not in images:
-                        images.append(img_src)
-                        print(f"         ✅ Found image from BeautifulSoup: {img_src[:80]}...")
-            
-            # Method 2: Construct maximum quality Copart image URLs directly
-            # Copart uses: https://cs.copart.com/v1/AUTH_svc.pdoc/00000/{lot}/full/{lot}_{num}.jpg
-            # Try image numbers 1-20 for maximum coverage
-            # IMPORTANT: Always add these URLs - they're the standard format and should work
-            for img_num in range(1, 21):
-                # Use the standard maximum quality URL format
-                img_url = f"https://cs.copart.com/v1/AUTH_svc.pdoc/00000/{lot_number}/full/{lot_number}_{img_num}.jpg"
-                if img_url not in images:
-                    images.append(img_url)
-            
-            # Method 2b: Also search for any Copart image URLs in the page and convert to max quality
-            copart_image_pattern = rf'https://cs\.copart\.com/v1/AUTH_svc\.pdoc/(\d+)/(\d+)/(?:thumb|small|medium|large|full)/(\d+)_(\d+)\.jpg'
-            image_matches = re.findall(copart_image_pattern, page_source, re.IGNORECASE)
-            for account, lot1, lot2, img_num in image_matches:
-                # Convert to maximum quality format
-                img_url = f"https://cs.copart.com/v1/AUTH_svc.pdoc/00000/{lot2}/full/{lot2}_{img_num}.jpg"
-                if img_url not in images:
-                    images.append(img_url)
-            
-            # Method 3: Try to find image gallery or carousel - get ALL images
-            # Look for data attributes that might contain image URLs
-            data_attrs = soup.find_all(attrs={'data-image': True})
-            for elem in data_attrs:
-                img_src = elem.get('data-image')
-                if img_src:
-                    if img_src.startswith('//'):
-                        img_src = 'https:' + img_src
-                    elif img_src.startswith('/'):
-                        img_src = 'https://www.copart.com' + img_src
+                    # Step 2: Remove ALL size/quality/scale/resize parameters
+                    clean_url = re.sub(r'[?&](width|height|w|h|size|quality|scale|resize|maxwidth|maxheight)=\d+', '', clean_url)
                     
-                    # CRITICAL: For Copart CDN images, construct maximum quality URL
-                    if 'cs.copart.com' in img_src:
+                    # Step 3: CRITICAL - For Copart CDN images, reconstruct to maximum quality format
+                    if 'cs.copart.com' in clean_url:
                         # Extract lot number and image number from URL
-                        copart_match = re.search(r'cs\.copart\.com/v1/AUTH_svc\.pdoc/(\d+)/(\d+)/(?:thumb|small|medium|large|full)/(\d+)_(\d+)\.jpg', img_src, re.IGNORECASE)
+                        copart_match = re.search(r'cs\.copart\.com/v1/AUTH_svc\.pdoc/(\d+)/(\d+)/(?:thumb|small|medium|large|full)/(\d+)_(\d+)\.jpg', clean_url, re.IGNORECASE)
                         if copart_match:
                             account, lot_num, lot_num2, img_num = copart_match.groups()
-                            # Use the standard maximum quality URL format
-                            img_src = f"https://cs.copart.com/v1/AUTH_svc.pdoc/00000/{lot_num}/full/{lot_num}_{img_num}.jpg"
+                            # Reconstruct to maximum quality format: /00000/{lot}/full/{lot}_{num}.jpg
+                            clean_url = f"https://cs.copart.com/v1/AUTH_svc.pdoc/00000/{lot_num}/full/{lot_num}_{img_num}.jpg"
                         else:
-                            # Fallback: replace any size with /full/
-                            img_src = re.sub(r'/(thumb|small|medium|large)/', '/full/', img_src, flags=re.IGNORECASE)
-                    else:
-                        # For non-Copart CDN images, replace size paths
-                        img_src = img_src.replace('/thumb/', '/full/').replace('/small/', '/full/').replace('/medium/', '/full/').replace('/large/', '/full/')
+                            # Fallback: replace any size path with /full/
+                            clean_url = re.sub(r'/(thumb|small|medium|large)/', '/full/', clean_url, flags=re.IGNORECASE)
+                            # Try to fix account number to 00000
+                            clean_url = re.sub(r'/v1/AUTH_svc\.pdoc/\d+/(\d+)/', r'/v1/AUTH_svc.pdoc/00000/\1/', clean_url)
                     
-                    # Remove ALL quality/size parameters
-                    img_src = re.sub(r'[?&](width|height|w|h|size|quality|scale|resize|maxwidth|maxheight)=\d+', '', img_src)
-                    # Remove query string entirely
-                    if '?' in img_src:
-                        img_src = img_src.split('?')[0]
+                    # Step 4: Remove trailing query parameters that might affect quality
+                    if '?' in clean_url:
+                        base_url = clean_url.split('?')[0]
+                        clean_url = base_url
                     
-                    if img_src.startswith('http') and img_src not in images:
-                        images.append(img_src)
-            
-            # Method 4: Look for image arrays in JavaScript/data attributes
-            # Some pages have image arrays in data attributes
-            for elem in soup.find_all(attrs={'data-images': True}):
-                try:
-                    import json
-                    images_json = elem.get('data-images')
-                    if images_json:
-                        img_list = json.loads(images_json)
-                        for img_url in img_list:
-                            if isinstance(img_url, str):
-                                if img_url.startswith('//'):
-                                    img_url = 'https:' + img_url
-                                elif img_url.startswith('/'):
-                                    img_url = 'https://www.copart.com' + img_url
-                                
-                                # CRITICAL: For Copart CDN images, construct maximum quality URL
-                                if 'cs.copart.com' in img_url:
-                                    copart_match = re.search(r'cs\.copart\.com/v1/AUTH_svc\.pdoc/(\d+)/(\d+)/(?:thumb|small|medium|large|full)/(\d+)_(\d+)\.jpg', img_url, re.IGNORECASE)
-                                    if copart_match:
-                                        account, lot_num, lot_num2, img_num = copart_match.groups()
-                                        img_url = f"https://cs.copart.com/v1/AUTH_svc.pdoc/00000/{lot_num}/full/{lot_num}_{img_num}.jpg"
-                                    else:
-                                        img_url = re.sub(r'/(thumb|small|medium|large)/', '/full/', img_url, flags=re.IGNORECASE)
-                                else:
-                                    img_url = img_url.replace('/thumb/', '/full/').replace('/small/', '/full/').replace('/medium/', '/full/').replace('/large/', '/full/')
-                                
-                                img_url = re.sub(r'[?&](width|height|w|h|size|quality|scale|resize)=\d+', '', img_url)
-                                # Remove query string entirely
-                                if '?' in img_url:
-                                    img_url = img_url.split('?')[0]
-                                
-                                if img_url.startswith('http') and img_url not in images:
-                                    images.append(img_url)
-                except:
-                    pass
-            
-            # Remove duplicates while preserving order
-            seen = set()
-            unique_images = []
-            for img in images:
-                # Normalize URL to avoid duplicates
-                normalized = img.split('?')[0]  # Remove query params for comparison
-                if normalized not in seen:
-                    seen.add(normalized)
-                    unique_images.append(img)
-            
-            # Ensure all images maintain maximum quality - clean them again
-            final_images = []
-            for img_url in unique_images:
-                # Final quality check - ensure /full/ path and no size params
-                clean_url = img_url
-                clean_url = clean_url.replace('/thumb/', '/full/').replace('/small/', '/full/').replace('/medium/', '/full/').replace('/large/', '/full/')
-                clean_url = re.sub(r'[?&](width|height|w|h|size|quality|scale|resize|maxwidth|maxheight)=\d+', '', clean_url)
-                # Ensure Copart images use /full/ path
-                if 'cs.copart.com' in clean_url:
-                    clean_url = re.sub(r'/(thumb|small|medium|large)/', '/full/', clean_url)
+                    # Step 5: Final validation - ensure it's a valid URL
+                    if clean_url.startswith('http') and 'copart' in clean_url.lower():
+                        high_quality_images.append(clean_url)
                 
-                # Validate URL - ensure it's a valid image URL
-                if clean_url.startswith('http') and ('copart' in clean_url.lower() or '.jpg' in clean_url.lower() or '.jpeg' in clean_url.lower() or '.png' in clean_url.lower()):
-                    # Ensure it's not a page URL, error URL, or Railway deployment URL
-                    invalid_patterns = ['railway.app', 'web-production', '/lot/', 'copart.com/lot', 'localhost', '127.0.0.1']
-                    if not any(pattern in clean_url.lower() for pattern in invalid_patterns):
-                        # Ensure it ends with an image extension or contains cs.copart.com
-                        if '.jpg' in clean_url.lower() or '.jpeg' in clean_url.lower() or '.png' in clean_url.lower() or 'cs.copart.com' in clean_url.lower():
-                            final_images.append(clean_url)
-            
-            # If we found images, return them (all at maximum quality)
-            if final_images:
-                return final_images
-            
-            # Fallback: Try Copart's standard high-quality image URLs (try more images: 1-10)
-            default_images = []
-            for img_num in range(1, 11):
-                default_images.append(f"https://cs.copart.com/v1/AUTH_svc.pdoc/00000/{lot_number}/full/{lot_number}_{img_num}.jpg")
-            return default_images
-            
+                # Store only the first image
+                vehicle["images"] = high_quality_images[:1] if high_quality_images else []
+                print(f"      ✅ Found {len(high_quality_images)} high-quality images, keeping first image only")
+                if vehicle["images"]:
+                    print(f"      📸 First image URL for lot {lot_number}: {vehicle['images'][0]}")
+            else:
+                # Fallback to default high-quality URL (first image only)
+                first_default_image = f"https://cs.copart.com/v1/AUTH_svc.pdoc/00000/{lot_number}/full/{lot_number}_1.jpg"
+                vehicle["images"] = [first_default_image]
+                print(f"      ⚠️  Using default high-quality image URL (first image only)")
+                print(f"      📸 Default image URL for lot {lot_number}: {first_default_image}")
+        except Exception as e:
+            print(f"      ⚠️  Error fetching images: {e}")
+            import traceback
+            traceback.print_exc()
+            # Fallback to default high-quality URL (first image only)
+            first_default_image = f"https://cs.copart.com/v1/AUTH_svc.pdoc/00000/{lot_number}/full/{lot_number}_1.jpg"
+            vehicle["images"] = [first_default_image]
+            print(f"      ✅ Using fallback high-quality URL (first image only)")
+            print(f"      📸 Fallback image URL for lot {lot_number}: {first_default_image}")
+    
+    @staticmethod
+    def _parse_loaded_lot(lot_number, loaded):
+        """Worker half of the image fetch (see LotPipeline); errors fall back to the default URLs"""
+        try:
+            return parse_lot_images(lot_number, *loaded)
+        except Exception as e:
+            print(f"      Error parsing lot page {lot_number}: {e}")
+            return [f"https://cs.copart.com/v1/AUTH_svc.pdoc/00000/{lot_number}/full/{lot_number}_{img_num}.jpg"
+                    for img_num in range(1, 21)]
+    
+    @profile_stage
+    def _fetch_images_from_lot_page(self, lot_number):
+        """Fetch high-quality images from a specific lot page"""
+        if not self.page:
+            return []
+        if lot_number.startswith('1-'):
+            lot_number = lot_number[2:]
+        return parse_lot_images(lot_number, *self._load_lot_page(lot_number))
+    
+    @profile_stage
+    def _load_lot_page(self, lot_number):
+        """Browser half of the image fetch: returns (page_source, DOM image sources, images)
+        
+        `images` is set (and page_source None) when the fast path or an error already
+        decided the result; otherwise parse_lot_images finishes without the browser.
+        A lot another scraper in this process is already loading is not loaded again.
+        """
+        # Remove "1-" prefix if present
+        if lot_number.startswith('1-'):
+            lot_number = lot_number[2:]
+        # Errors are caught here, outside the single flight, so waiters see the leader's real
+        # error - and a waiter with time left retries a leader that ran out of budget
+        try:
+            return self.image_flights.do(lot_number, lambda: self._open_lot_page(lot_number), self.deadline)
+        except DeadlineExceeded as e:
+            print(f"      ⏱️  {e}")
+            return None, [], [f"https://cs.copart.com/v1/AUTH_svc.pdoc/00000/{lot_number}/full/{lot_number}_{img_num}.jpg"
+                              for img_num in range(1, 21)]
         except Exception as e:
             print(f"      Error details: {e}")
             # Return default high-quality URLs as fallback (try 1-20 for better coverage)
@@ -914,791 +962,983 @@ class CopartScraper:
                 print(f"         {idx}. {img_url}")
             if len(default_images) > 10:
                 print(f"         ... and {len(default_images) - 10} more images")
-            return default_images
+            return None, [], default_images
+    
+    def _open_lot_page(self, lot_number):
+        """Load one lot page for its images (see _load_lot_page); raises if it can't be loaded"""
+        if self._use_fast_path():
+            images = self.http.fetch_lot_images(lot_number, self.deadline)
+            self._fast_path_result(images is not None)
+            if images:
+                return None, [], images
+        
+        copart_url = f"https://www.copart.com/lot/{lot_number}"
+        
+        # Navigate to the lot page
+        self._goto(copart_url, wait_until='networkidle', timeout=20000, kind='lot-images')
+        self.deadline.sleep(2)  # Wait for images to load
+        
+        # Get page source
+        page_source = self.page.content()
+        self._archive_page(LOT, lot_number, copart_url, page_source)
+        
+        # Method 1: Use specific CSS classes for Copart image elements (one round trip for all selectors)
+        # Look for images with classes: zoomImgElement p-image-item-box img-responsive ng-star-inserted
+        print(f"      🔍 Searching for images using CSS classes: zoomImgElement, p-image-item-box, img-responsive, ng-star-inserted")
+        dom_sources = []
+        try:
+            found = self.page.evaluate(
+                "(selectors) => selectors.map(s => Array.from(document.querySelectorAll(s)).map(img =>"
+                " img.getAttribute('src') || img.getAttribute('data-src') || img.getAttribute('data-full')"
+                " || img.getAttribute('data-original')))",
+                LOT_IMAGE_SELECTORS
+            )
+            for selector, sources in zip(LOT_IMAGE_SELECTORS, found):
+                print(f"      Found {len(sources)} elements with selector: {selector}")
+                dom_sources.extend(src for src in sources if src)
+        except Exception:
+            pass
+        return page_source, dom_sources, None
     
+    @profile_stage
     def scrape_copart_lot(self, lot_number):
-        """Scrape a single Copart lot page"""
+        """Scrape a single Copart lot page
+        
+        Returns the vehicle, or None if the lot does not pass the filters. A lot that could
+        not be read raises (DeadlineExceeded, BlockedError, browser errors), so callers can
+        tell it from a filtered one.
+        Concurrent calls for the same lot from other scrapers in this process share one fetch.
+        """
         if not self.page:
-            return None
+            raise RuntimeError("Browser is not set up")
+        
+        # Remove "1-" prefix if present
+        if lot_number.startswith('1-'):
+            lot_number = lot_number[2:]
+        # Scrapers filtering on other states must not share a result
+        key = lot_number if self.states is None else f"{lot_number} ({'/'.join(self.states)})"
+        return self.lot_flights.do(key, lambda: self._scrape_lot(lot_number), self.deadline)
+    
+    def _scrape_lot(self, lot_number):
+        """Fetch and parse one lot (see scrape_copart_lot)"""
+        copart_url = f"https://www.copart.com/lot/{lot_number}"
+        print(f"Scraping Copart lot: {lot_number}")
+        
+        if self._use_fast_path():
+            handled, vehicle = self._fetch_lot_via_http(lot_number)
+            if handled:
+                return vehicle
+        
+        self._goto(copart_url, wait_until='networkidle', timeout=30000, kind='lot')
+        self.deadline.sleep(2)
         
         try:
-            # Remove "1-" prefix if present
-            if lot_number.startswith('1-'):
-                lot_number = lot_number[2:]
-            
-            copart_url = f"https://www.copart.com/lot/{lot_number}"
-            print(f"Scraping Copart lot: {lot_number}")
-            
-            self.page.goto(copart_url, wait_until='networkidle', timeout=30000)
-            time.sleep(2)
-            
+            self._wait('lot:body', 10000, lambda ms: self.page.wait_for_selector('body', timeout=ms))
+        except:
+            pass
+        
+        self.deadline.sleep(1)
+        # A page cut short by the budget would parse as "filtered out"
+        self.deadline.check(f"reading lot {lot_number}")
+        
+        page_source = self.page.content()
+        
+        # Optimized body text extraction
+        try:
+            body_text = self.page.evaluate("() => document.body.innerText || document.body.textContent || ''")
+        except:
             try:
-                self.page.wait_for_selector('body', timeout=10000)
+                body_text = self.page.locator('body').inner_text()
             except:
-                pass
-            
-            time.sleep(1)
-            
-            page_source = self.page.content()
-            soup = BeautifulSoup(page_source, 'html.parser')
-            
-            # Optimized body text extraction
+                body_text = page_source
+        
+        self._archive_page(LOT, lot_number, copart_url, page_source, body_text)
+        return parse_lot_page(lot_number, page_source, body_text, states=self.states)
+    
+    @profile_run
+    def scrape_multiple_lots(self, lot_numbers, limit=100, journal=None, on_vehicle=None):
+        """Scrape multiple Copart lots (optimized for speed)
+        
+        With a journal, lots already recorded are not fetched again. Only read lots are
+        journaled (filtered ones as None); lots that failed are left for a resumed run, and
+        the journal is only finished when every lot was read.
+        on_vehicle is called with each vehicle that passes the filters as soon as it is scraped.
+        Stops when self.deadline runs out and returns a partial ScrapeResult.
+        """
+        vehicles = []
+        
+        # Initialize browser if not already done
+        if not self.page:
             try:
-                body_text = self.page.evaluate("() => document.body.innerText || document.body.textContent || ''")
-            except:
+                self.setup_browser()
+            except Exception as e:
+                print(f"Error initializing browser: {e}")
+                return vehicles
+        
+        if not self.page:
+            return vehicles
+        
+        total_to_scrape = min(len(lot_numbers), limit)
+        print(f"Scraping {total_to_scrape} Copart lots (optimized for speed)...")
+        
+        failed = 0
+        for i, lot_number in enumerate(lot_numbers[:limit], 1):
+            try:
+                if journal and journal.has_lot(lot_number):
+                    vehicle = journal.lot_result(lot_number)
+                    if vehicle:
+                        vehicles.append(vehicle)
+                        if on_vehicle:
+                            on_vehicle(vehicle)
+                    print(f"  [{i}/{total_to_scrape}] ↩ {lot_number}: already journaled")
+                    continue
+                
+                if self.deadline.expired():
+                    print(f"  ⏱️  Time budget used up after {i - 1}/{total_to_scrape} lots")
+                    return ScrapeResult(vehicles, partial=True,
+                                        reason=f"time budget used up after {i - 1}/{total_to_scrape} lots")
+                
                 try:
-                    body_text = self.page.locator('body').inner_text()
-                except:
-                    body_text = page_source
-            
-            # Initialize vehicle data
-            vehicle = {
-                "lot_number": lot_number,
-                "year": None,
-                "make": "Toyota",
-                "model": "Corolla",
-                "damage": "N/A",
-                "location": "N/A",
-                "odometer": "N/A",
-                "current_bid": "N/A",
-                "auction_countdown": "N/A",
-                "url": copart_url,
-                "images": []
-            }
-            
-            # Extract images from the lot page - prioritize high quality
-            img_tags = soup.find_all('img')
-            for img in img_tags:
-                # Try multiple attributes in order of preference (high quality first)
-                img_src = img.get('data-full') or img.get('data-original') or img.get('data-src') or img.get('src') or img.get('data-lazy-src')
-                if img_src and ('vehicle' in img_src.lower() or 'lot' in img_src.lower() or 'copart' in img_src.lower()):
-                    if img_src.startswith('//'):
-                        img_src = 'https:' + img_src
-                    elif img_src.startswith('/'):
-                        img_src = 'https://www.copart.com' + img_src
-                    # Replace thumbnail/small sizes with full size
-                    img_src = img_src.replace('/thumb/', '/full/').replace('/small/', '/full/').replace('/medium/', '/full/')
-                    # Remove size parameters
-                    img_src = re.sub(r'[?&](width|height|w|h|size|quality)=\d+', '', img_src)
-                    if img_src.startswith('http'):
-                        vehicle["images"].append(img_src)
-            
-            # Remove duplicates while preserving order
-            seen = set()
-            unique_images = []
-            for img in vehicle["images"]:
-                if img not in seen:
-                    seen.add(img)
-                    unique_images.append(img)
-            # Keep only the first image
-            vehicle["images"] = unique_images[:1] if unique_images else []
-            
-            # If no images found, use default high-quality Copart image URL (first image only)
-            if not vehicle["images"]:
-                first_default_image = f"https://cs.copart.com/v1/AUTH_svc.pdoc/00000/{lot_number}/full/{lot_number}_1.jpg"
-                vehicle["images"] = [first_default_image]
-            
-            # Extract Year - Look for "Year" tag on the page
-            year = None
-            
-            # Method 1: Look for "Year" tag/label followed by year value
-            # Find elements containing "Year" text
-            year_elements = soup.find_all(string=re.compile(r'^Year$|^Year:', re.IGNORECASE))
-            for elem in year_elements:
-                parent = elem.find_parent()
-                if parent:
-                    parent_text = parent.get_text()
-                    # Pattern: "Year: 2020" or "Year 2020"
-                    year_match = re.search(r'Year[:\s]+(\d{4})', parent_text, re.IGNORECASE)
-                    if year_match:
-                        year_val = year_match.group(1)
-                        try:
-                            year_val_int = int(year_val)
-                            if 2017 <= year_val_int <= 2023:
-                                year = year_val_int
-                                break
-                        except:
-                            pass
-                if year:
-                    break
-            
-            # Method 2: Look for label with "Year" and get value from next element
-            if not year:
-                year_labels = soup.find_all('label', string=re.compile(r'Year', re.IGNORECASE))
-                for label in year_labels:
-                    # Check next sibling for value
-                    next_sibling = label.find_next_sibling()
-                    if next_sibling:
-                        sibling_text = next_sibling.get_text().strip()
-                        year_match = re.search(r'(\d{4})', sibling_text)
-                        if year_match:
-                            try:
-                                year_val = int(year_match.group(1))
-                                if 2017 <= year_val <= 2023:
-                                    year = year_val
-                                    break
-                            except:
-                                pass
-                    # Check parent for value
-                    parent = label.find_parent()
-                    if parent:
-                        parent_text = parent.get_text()
-                        year_match = re.search(r'Year[:\s]+(\d{4})', parent_text, re.IGNORECASE)
-                        if year_match:
-                            try:
-                                year_val = int(year_match.group(1))
-                                if 2017 <= year_val <= 2023:
-                                    year = year_val
-                                    break
-                            except:
-                                pass
-                if year:
-                    pass
-            
-            # Method 3: Look for year in title tag (e.g., "2022 TOYOTA COROLLA SE")
-            if not year:
-                title_tag = soup.find('title')
-                if title_tag:
-                    title_text = title_tag.get_text()
-                    # Pattern: "YEAR TOYOTA COROLLA" - year comes BEFORE TOYOTA
-                    title_year_pattern = r'(\d{4})\s+TOYOTA\s+COROLLA'
-                    year_match = re.search(title_year_pattern, title_text, re.IGNORECASE)
-                    if year_match:
-                        year_val = year_match.group(1)
-                        try:
-                            year_val_int = int(year_val)
-                            if 2017 <= year_val_int <= 2023:
-                                year = year_val_int
-                        except:
-                            pass
-            
-            # Method 2: Look for year in headings (h1, h2, h3, h4) with Toyota Corolla
-            if not year:
-                heading_elements = soup.find_all(['h1', 'h2', 'h3', 'h4'])
-                for elem in heading_elements:
-                    elem_text = elem.get_text()
-                    # Look for pattern: "YEAR TOYOTA COROLLA" - year comes BEFORE TOYOTA
-                    if 'TOYOTA' in elem_text.upper() or 'COROLLA' in elem_text.upper():
-                        title_year_pattern = r'(\d{4})\s+TOYOTA\s+COROLLA'
-                        year_match = re.search(title_year_pattern, elem_text, re.IGNORECASE)
-                        if year_match:
-                            year_val = year_match.group(1)
-                            try:
-                                year_val_int = int(year_val)
-                                if 2017 <= year_val_int <= 2023:
-                                    year = year_val_int
-                                    break
-                            except:
-                                pass
-                if year:
-                    pass
-            
-            # Method 3: Look for year in body text near "Toyota Corolla"
-            if not year:
-                # Pattern: "YEAR TOYOTA COROLLA" - year comes BEFORE TOYOTA
-                toyota_year_pattern = r'(\d{4})\s+TOYOTA\s+COROLLA'
-                toyota_match = re.search(toyota_year_pattern, body_text, re.IGNORECASE)
-                if toyota_match:
-                    year_val = toyota_match.group(1)
-                    try:
-                        year_val_int = int(year_val)
+                    vehicle = self.scrape_copart_lot(lot_number)
+                except DeadlineExceeded as e:
+                    print(f"  ⏱️  {e}")
+                    return ScrapeResult(vehicles, partial=True,
+                                        reason=f"time budget used up after {i - 1}/{total_to_scrape} lots")
+                if journal:
+                    journal.record_lot(lot_number, vehicle)
+                if vehicle:
+                    vehicles.append(vehicle)
+                    if on_vehicle:
+                        on_vehicle(vehicle)
+                    # Shorter print message for speed
+                    print(f"  [{i}/{total_to_scrape}] ✓ {lot_number}: {vehicle.get('year')} - {vehicle.get('location')}")
+                else:
+                    print(f"  [{i}/{total_to_scrape}] ✗ {lot_number}: Filtered")
+                
+                # Pacing between lots is handled by the shared rate limiter in _goto
+                
+            except Exception as e:
+                failed += 1
+                print(f"  [{i}/{total_to_scrape}] ✗ {lot_number}: Error: {e}")
+                continue
+        
+        print(f"\n✅ Successfully scraped {len(vehicles)} vehicles from Copart")
+        if journal:
+            if failed:
+                print(f"  ↩ {failed} lots failed - the run journal stays open for --resume")
+            else:
+                journal.finish()
+        return ScrapeResult(vehicles)
+
+
+def passes_search_filters(vehicle, states=None):
+    """Check a search-row vehicle against the location, title and odometer filters"""
+    # Check location
+    location_state = vehicle.get("location_state", "N/A")
+    if location_state not in (states or ALLOWED_STATES):
+        return False
+    
+    # Check title (must be Salvage) - also check href for salvage keyword
+    title = vehicle.get("title", "").upper()
+    url = vehicle.get("url", "").upper()
+    if "SALVAGE" not in title and "SALVAGE" not in url:
+        # Check if href contains salvage (most reliable)
+        return False
+    
+    # Filter by odometer (must be under 100,000 miles)
+    odometer = vehicle.get('odometer', 'N/A')
+    if odometer == 'N/A':
+        # If odometer is N/A, skip this vehicle (we only want vehicles with known odometer)
+        return False
+    try:
+        # Remove commas and convert to int
+        odometer_value = int(str(odometer).replace(',', '').replace(' ', ''))
+    except (ValueError, AttributeError):
+        # If odometer can't be parsed, skip this vehicle
+        return False
+    return odometer_value < 100000  # Skip vehicles with 100,000+ miles
+
+
+def parse_search_page(page_source, limit=20, description="", fetched_at=None):
+    """Extract the vehicles of a search results page (no browser needed - also used by re-extraction)
+
+    fetched_at (epoch seconds, default now) is when the page was loaded; countdowns are relative to it.
+    """
+    vehicles = []
+    soup = BeautifulSoup(page_source, 'html.parser')
+    
+    # Extract vehicles from search results table/rows
+    # Copart search results are typically in table rows or div containers
+    vehicle_rows = []
+    
+    # Method 1: Look for table rows with lot data
+    table_rows = soup.find_all('tr')
+    method1_count = 0
+    for row in table_rows:
+        row_text = row.get_text()
+        # Check if row contains lot number pattern
+        if re.search(r'Lot\s*#\s*:?\s*\d{8}', row_text, re.IGNORECASE) or re.search(r'1-\d{8}', row_text):
+            vehicle_rows.append(row)
+            method1_count += 1
+    if method1_count > 0:
+        print(f"    Method 1 found {method1_count} rows")
+    
+    # Method 2: Look for div containers with lot data
+    if not vehicle_rows:
+        lot_containers = soup.find_all(['div', 'section'], attrs={'data-lot-number': True})
+        vehicle_rows.extend(lot_containers)
+        if lot_containers:
+            print(f"    Method 2 found {len(lot_containers)} containers")
+    
+    # Method 3: Look for elements with lot links - use link itself (href contains all data)
+    if not vehicle_rows:
+        print(f"    Trying Method 3: Looking for lot links...")
+        lot_links = soup.find_all('a', href=re.compile(r'/lot/\d+'))
+        print(f"    Found {len(lot_links)} lot links in page")
+        seen_lots = set()
+        for link in lot_links:
+            # Extract lot number from href
+            href = link.get('href', '')
+            lot_match = re.search(r'/lot/(\d+)', href)
+            if lot_match:
+                lot_num = lot_match.group(1)
+                if lot_num not in seen_lots:  # Avoid duplicates
+                    seen_lots.add(lot_num)
+                    # Use the link itself - it has the href with lot, year, location data
+                    vehicle_rows.append(link)
+        print(f"    Method 3 added {len(vehicle_rows)} unique links to vehicle_rows")
+    
+    # Method 4: Extract directly from lot links - use link itself as row element
+    if not vehicle_rows:
+        lot_links = soup.find_all('a', href=re.compile(r'/lot/\d+'))
+        seen_lots = set()
+        for link in lot_links[:limit*2]:  # Get more links to account for duplicates
+            href = link.get('href', '')
+            lot_match = re.search(r'/lot/(\d+)', href)
+            if lot_match:
+                lot_num = lot_match.group(1)
+                if lot_num not in seen_lots:
+                    seen_lots.add(lot_num)
+                    # Use the link itself as the row element (it contains the href with all data)
+                    vehicle_rows.append(link)
+    
+    print(f"  Found {len(vehicle_rows)} vehicle rows from {description}")
+    
+    # Extract data from each row
+    for i, row in enumerate(vehicle_rows[:limit], 1):
+        try:
+            # Debug: check what type of element we have
+            if i <= 3:  # Only debug first 3
+                if hasattr(row, 'name'):
+                    print(f"    Row {i}: {row.name}, href: {row.get('href', 'N/A')[:50] if row.name == 'a' else 'N/A'}")
+            
+            vehicle = CopartScraper._extract_vehicle_from_row(row, page_source, fetched_at)
+            if vehicle and vehicle.get("lot_number") != "N/A":
+                vehicles.append(vehicle)
+                if len(vehicles) >= limit:
+                    break
+            elif vehicle:
+                if i <= 3:
+                    print(f"    Row {i}: Extracted but lot_number is N/A")
+        except Exception as e:
+            print(f"  Error extracting vehicle {i}: {str(e)}")
+            continue
+    
+    print(f"  Extracted {len(vehicles)} vehicles from {description}")
+    return vehicles
+
+
+def parse_lot_page(lot_number, page_source, body_text=None, fetched_at=None, states=None):
+    """Extract and filter vehicle data from a rendered Copart lot page
+
+    Pure parsing - no browser needed, so it also runs over saved pages.
+    fetched_at (epoch seconds, default now) is when the page was loaded.
+    states: allowed location states - defaults to ALLOWED_STATES.
+    Returns None if the lot does not pass the filters.
+    """
+    states = states or ALLOWED_STATES
+    allowed = '/'.join(states)
+    soup = BeautifulSoup(page_source, 'html.parser')
+    if body_text is None:
+        body_text = soup.body.get_text('\n') if soup.body else soup.get_text('\n')
+    copart_url = f"https://www.copart.com/lot/{lot_number}"
+    
+    # Initialize vehicle data
+    vehicle = {
+        "lot_number": lot_number,
+        "year": None,
+        "make": "Toyota",
+        "model": "Corolla",
+        "damage": "N/A",
+        "location": "N/A",
+        "odometer": "N/A",
+        "current_bid": "N/A",
+        "auction_countdown": "N/A",
+        "url": copart_url,
+        "images": []
+    }
+
+    # Extract images from the lot page - prioritize high quality
+    img_tags = soup.find_all('img')
+    for img in img_tags:
+        # Try multiple attributes in order of preference (high quality first)
+        img_src = img.get('data-full') or img.get('data-original') or img.get('data-src') or img.get('src') or img.get('data-lazy-src')
+        if img_src and ('vehicle' in img_src.lower() or 'lot' in img_src.lower() or 'copart' in img_src.lower()):
+            if img_src.startswith('//'):
+                img_src = 'https:' + img_src
+            elif img_src.startswith('/'):
+                img_src = 'https://www.copart.com' + img_src
+            # Replace thumbnail/small sizes with full size
+            img_src = img_src.replace('/thumb/', '/full/').replace('/small/', '/full/').replace('/medium/', '/full/')
+            # Remove size parameters
+            img_src = re.sub(r'[?&](width|height|w|h|size|quality)=\d+', '', img_src)
+            if img_src.startswith('http'):
+                vehicle["images"].append(img_src)
+
+    # Remove duplicates while preserving order
+    seen = set()
+    unique_images = []
+    for img in vehicle["images"]:
+        if img not in seen:
+            seen.add(img)
+            unique_images.append(img)
+    # Keep only the first image
+    vehicle["images"] = unique_images[:1] if unique_images else []
+
+    # If no images found, use default high-quality Copart image URL (first image only)
+    if not vehicle["images"]:
+        first_default_image = f"https://cs.copart.com/v1/AUTH_svc.pdoc/00000/{lot_number}/full/{lot_number}_1.jpg"
+        vehicle["images"] = [first_default_image]
+
+    # Extract Year - Look for "Year" tag on the page
+    year = None
+
+    # Method 1: Look for "Year" tag/label followed by year value
+    # Find elements containing "Year" text
+    year_elements = soup.find_all(string=re.compile(r'^Year$|^Year:', re.IGNORECASE))
+    for elem in year_elements:
+        parent = elem.find_parent()
+        if parent:
+            parent_text = parent.get_text()
+            # Pattern: "Year: 2020" or "Year 2020"
+            year_match = re.search(r'Year[:\s]+(\d{4})', parent_text, re.IGNORECASE)
+            if year_match:
+                year_val = year_match.group(1)
+                try:
+                    year_val_int = int(year_val)
+                    if 2017 <= year_val_int <= 2023:
+                        year = year_val_int
+                        break
+                except:
+                    pass
+        if year:
+            break
+
+    # Method 2: Look for label with "Year" and get value from next element
+    if not year:
+        year_labels = soup.find_all('label', string=re.compile(r'Year', re.IGNORECASE))
+        for label in year_labels:
+            # Check next sibling for value
+            next_sibling = label.find_next_sibling()
+            if next_sibling:
+                sibling_text = next_sibling.get_text().strip()
+                year_match = re.search(r'(\d{4})', sibling_text)
+                if year_match:
+                    try:
+                        year_val = int(year_match.group(1))
+                        if 2017 <= year_val <= 2023:
+                            year = year_val
+                            break
+                    except:
+                        pass
+            # Check parent for value
+            parent = label.find_parent()
+            if parent:
+                parent_text = parent.get_text()
+                year_match = re.search(r'Year[:\s]+(\d{4})', parent_text, re.IGNORECASE)
+                if year_match:
+                    try:
+                        year_val = int(year_match.group(1))
+                        if 2017 <= year_val <= 2023:
+                            year = year_val
+                            break
+                    except:
+                        pass
+        if year:
+            pass
+
+    # Method 3: Look for year in title tag (e.g., "2022 TOYOTA COROLLA SE")
+    if not year:
+        title_tag = soup.find('title')
+        if title_tag:
+            title_text = title_tag.get_text()
+            # Pattern: "YEAR TOYOTA COROLLA" - year comes BEFORE TOYOTA
+            title_year_pattern = r'(\d{4})\s+TOYOTA\s+COROLLA'
+            year_match = re.search(title_year_pattern, title_text, re.IGNORECASE)
+            if year_match:
+                year_val = year_match.group(1)
+                try:
+                    year_val_int = int(year_val)
+                    if 2017 <= year_val_int <= 2023:
+                        year = year_val_int
+                except:
+                    pass
+
+    # Method 2: Look for year in headings (h1, h2, h3, h4) with Toyota Corolla
+    if not year:
+        heading_elements = soup.find_all(['h1', 'h2', 'h3', 'h4'])
+        for elem in heading_elements:
+            elem_text = elem.get_text()
+            # Look for pattern: "YEAR TOYOTA COROLLA" - year comes BEFORE TOYOTA
+            if 'TOYOTA' in elem_text.upper() or 'COROLLA' in elem_text.upper():
+                title_year_pattern = r'(\d{4})\s+TOYOTA\s+COROLLA'
+                year_match = re.search(title_year_pattern, elem_text, re.IGNORECASE)
+                if year_match:
+                    year_val = year_match.group(1)
+                    try:
+                        year_val_int = int(year_val)
                         if 2017 <= year_val_int <= 2023:
                             year = year_val_int
+                            break
                     except:
                         pass
-            
-            # Method 4: Look for "Year" keyword followed by year
-            if not year:
-                year_keywords = ['Year', 'Model Year', 'Vehicle Year', 'Lot Year']
-                for keyword in year_keywords:
-                    year_elements = soup.find_all(string=re.compile(keyword, re.IGNORECASE))
-                    for elem in year_elements:
-                        parent = elem.find_parent()
-                        if parent:
-                            parent_text = parent.get_text()
-                            year_match = re.search(rf'{keyword}[:\s]+(\d{{4}})', parent_text, re.IGNORECASE)
-                            if year_match:
-                                try:
-                                    year_val = int(year_match.group(1))
-                                    if 2017 <= year_val <= 2023:
-                                        year = year_val
-                                        break
-                                except:
-                                    pass
-                        if year:
-                            break
-                    if year:
-                        break
-            
-            # Method 5: Look for year in page source (2017-2023)
-            if not year:
-                year_pattern = r'\b(201[7-9]|202[0-3])\b'
-                year_matches = re.findall(year_pattern, page_source)
-                if year_matches:
-                    for year_str in year_matches:
+        if year:
+            pass
+
+    # Method 3: Look for year in body text near "Toyota Corolla"
+    if not year:
+        # Pattern: "YEAR TOYOTA COROLLA" - year comes BEFORE TOYOTA
+        toyota_year_pattern = r'(\d{4})\s+TOYOTA\s+COROLLA'
+        toyota_match = re.search(toyota_year_pattern, body_text, re.IGNORECASE)
+        if toyota_match:
+            year_val = toyota_match.group(1)
+            try:
+                year_val_int = int(year_val)
+                if 2017 <= year_val_int <= 2023:
+                    year = year_val_int
+            except:
+                pass
+
+    # Method 4: Look for "Year" keyword followed by year
+    if not year:
+        year_keywords = ['Year', 'Model Year', 'Vehicle Year', 'Lot Year']
+        for keyword in year_keywords:
+            year_elements = soup.find_all(string=re.compile(keyword, re.IGNORECASE))
+            for elem in year_elements:
+                parent = elem.find_parent()
+                if parent:
+                    parent_text = parent.get_text()
+                    year_match = re.search(rf'{keyword}[:\s]+(\d{{4}})', parent_text, re.IGNORECASE)
+                    if year_match:
                         try:
-                            year_val = int(year_str)
+                            year_val = int(year_match.group(1))
                             if 2017 <= year_val <= 2023:
                                 year = year_val
                                 break
                         except:
                             pass
-            
-            vehicle["year"] = year
-            
-            # Extract Location - EXACT text from Copart page
-            location = "N/A"
-            location_text = "N/A"
-            
-            # Method 1: Look for location keywords - extract FULL location text
-            location_keywords = ['Location', 'yard', 'facility', 'site', 'pickup']
-            for keyword in location_keywords:
-                location_elements = soup.find_all(string=re.compile(keyword, re.IGNORECASE))
-                for elem in location_elements:
-                    parent = elem.find_parent()
-                    if parent:
-                        parent_text = parent.get_text()
-                        # Extract full location text after keyword
-                        location_match = re.search(rf'{keyword}[:\s]+([^\n\r<]+?)(?:\n|$|</)', parent_text, re.IGNORECASE | re.DOTALL)
-                        if location_match:
-                            loc_text = location_match.group(1).strip()
-                            loc_text = re.sub(r'\s+', ' ', loc_text)
-                            loc_text = loc_text.split('\n')[0].strip()
-                            # Remove common suffixes
-                            loc_text = re.sub(r',\s*(?:USA|United States|US).*', '', loc_text, flags=re.IGNORECASE)
-                            loc_text = loc_text.strip()
-                            
-                            # Verify it contains one of our states and keep FULL text
-                            if re.search(r'\b(MD|Maryland)\b', loc_text, re.IGNORECASE):
-                                location_text = loc_text  # Keep full text like "Baltimore, MD"
-                                location = 'MD'
-                                break
-                            elif re.search(r'\b(NJ|New Jersey)\b', loc_text, re.IGNORECASE):
-                                location_text = loc_text
-                                location = 'NJ'
-                                break
-                            elif re.search(r'\b(DC|District of Columbia|Washington DC)\b', loc_text, re.IGNORECASE):
-                                location_text = loc_text
-                                location = 'DC'
-                                break
-                            elif re.search(r'\b(NY|New York)\b', loc_text, re.IGNORECASE):
-                                location_text = loc_text
-                                location = 'NY'
-                                break
-                    if location != "N/A":
-                        break
-                if location != "N/A":
+                if year:
                     break
-            
-            # Method 2: Search for city-state patterns (common cities)
-            if location == "N/A":
-                # Common cities in our target states
-                md_cities = ['Baltimore', 'Annapolis', 'Frederick', 'Rockville', 'Gaithersburg', 'Columbia', 'Germantown', 'Waldorf', 'Laurel', 'Bethesda', 'Silver Spring', 'Wheaton']
-                nj_cities = ['Newark', 'Jersey City', 'Paterson', 'Elizabeth', 'Edison', 'Woodbridge', 'Lakewood', 'Toms River', 'Hamilton', 'Trenton', 'Clifton', 'Camden']
-                dc_cities = ['Washington', 'District']
-                ny_cities = ['New York', 'Albany', 'Buffalo', 'Rochester', 'Syracuse', 'Yonkers', 'Utica', 'White Plains', 'Hempstead', 'Troy', 'Binghamton', 'Freeport']
-                
-                # Try MD cities first
-                for city in md_cities:
-                    pattern = rf'{city}[,\s]+(MD|Maryland)'
-                    match = re.search(pattern, body_text if body_text else page_source, re.IGNORECASE)
-                    if match:
-                        location_text = f"{city}, MD"
-                        location = 'MD'
-                        break
-                
-                # Try NJ cities
-                if location == "N/A":
-                    for city in nj_cities:
-                        pattern = rf'{city}[,\s]+(NJ|New Jersey)'
-                        match = re.search(pattern, body_text if body_text else page_source, re.IGNORECASE)
-                        if match:
-                            location_text = f"{city}, NJ"
-                            location = 'NJ'
-                            break
-                
-                # Try DC
-                if location == "N/A":
-                    for city in dc_cities:
-                        pattern = rf'{city}[,\s]*(DC|District of Columbia)'
-                        match = re.search(pattern, body_text if body_text else page_source, re.IGNORECASE)
-                        if match:
-                            location_text = f"{city}, DC"
-                            location = 'DC'
-                            break
-                
-                # Try NY cities
-                if location == "N/A":
-                    for city in ny_cities:
-                        pattern = rf'{city}[,\s]+(NY|New York)'
-                        match = re.search(pattern, body_text if body_text else page_source, re.IGNORECASE)
-                        if match:
-                            location_text = f"{city}, NY"
-                            location = 'NY'
-                            break
-            
-            # Method 2b: Generic city-state pattern
-            if location == "N/A":
-                city_state_pattern = r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)[,\s]+(MD|NJ|DC|NY|Maryland|New Jersey|District of Columbia|New York)'
-                match = re.search(city_state_pattern, body_text if body_text else page_source)
-                if match:
-                    city = match.group(1).strip()
-                    state = match.group(2).strip()
-                    # Normalize state abbreviation
-                    if state.upper() in ['MD', 'MARYLAND']:
-                        location_text = f"{city}, MD"
-                        location = 'MD'
-                    elif state.upper() in ['NJ', 'NEW JERSEY']:
-                        location_text = f"{city}, NJ"
-                        location = 'NJ'
-                    elif state.upper() in ['DC', 'DISTRICT OF COLUMBIA']:
-                        location_text = f"{city}, DC"
-                        location = 'DC'
-                    elif state.upper() in ['NY', 'NEW YORK']:
-                        location_text = f"{city}, NY"
-                        location = 'NY'
-            
-            # Method 3: Fallback - just state
-            if location == "N/A":
-                if re.search(r'\b(MD|Maryland)\b', page_source, re.IGNORECASE):
-                    location = 'MD'
-                    location_text = 'MD'
-                elif re.search(r'\b(NJ|New Jersey)\b', page_source, re.IGNORECASE):
-                    location = 'NJ'
-                    location_text = 'NJ'
-                elif re.search(r'\b(DC|District of Columbia|Washington DC)\b', page_source, re.IGNORECASE):
-                    location = 'DC'
-                    location_text = 'DC'
-                elif re.search(r'\b(NY|New York)\b', page_source, re.IGNORECASE):
-                    location = 'NY'
-                    location_text = 'NY'
-            
-            vehicle["location"] = location_text
-            vehicle["location_state"] = location
-            
-            # Extract Location/Lane field - ADDITIONAL CHECK
-            # This field appears on individual Copart lot pages
-            # This is a separate field from Location on Copart pages
-            location_lane_state = "N/A"
-            location_lane_keywords = ['Location / Lane', 'Location/Lane', 'Lane', 'Location Lane']
-            for keyword in location_lane_keywords:
-                lane_elements = soup.find_all(string=re.compile(keyword, re.IGNORECASE))
-                for elem in lane_elements:
-                    parent = elem.find_parent()
-                    if parent:
-                        parent_text = parent.get_text()
-                        # Extract text after Location/Lane keyword
-                        lane_match = re.search(rf'{re.escape(keyword)}[:\s]+([^\n\r<]+?)(?:\n|$|</)', parent_text, re.IGNORECASE | re.DOTALL)
-                        if lane_match:
-                            lane_text = lane_match.group(1).strip()
-                            lane_text = re.sub(r'\s+', ' ', lane_text)
-                            lane_text = lane_text.split('\n')[0].strip()
-                            
-                            # Check for our states in Location/Lane
-                            if re.search(r'\b(MD|Maryland)\b', lane_text, re.IGNORECASE):
-                                location_lane_state = 'MD'
-                                break
-                            elif re.search(r'\b(NJ|New Jersey)\b', lane_text, re.IGNORECASE):
-                                location_lane_state = 'NJ'
-                                break
-                            elif re.search(r'\b(DC|District of Columbia|Washington DC)\b', lane_text, re.IGNORECASE):
-                                location_lane_state = 'DC'
-                                break
-                            elif re.search(r'\b(NY|New York)\b', lane_text, re.IGNORECASE):
-                                location_lane_state = 'NY'
-                                break
-                    if location_lane_state != "N/A":
+            if year:
+                break
+
+    # Method 5: Look for year in page source (2017-2023)
+    if not year:
+        year_pattern = r'\b(201[7-9]|202[0-3])\b'
+        year_matches = re.findall(year_pattern, page_source)
+        if year_matches:
+            for year_str in year_matches:
+                try:
+                    year_val = int(year_str)
+                    if 2017 <= year_val <= 2023:
+                        year = year_val
                         break
-                if location_lane_state != "N/A":
+                except:
+                    pass
+
+    vehicle["year"] = year
+
+    # Location, Location/Lane and Sale doc - one gazetteer pass over the page text, then the
+    # page source (data attributes, JSON) for whatever the text did not show
+    places = resolve_page(body_text, page_source)
+    vehicle["location"] = places["location"] or "N/A"
+    vehicle["location_state"] = places["state"] or "N/A"
+    location_lane_state = places["lane_state"] or "N/A"
+    sale_doc_state = places["sale_doc_state"] or "N/A"
+
+    # Extract Damage
+    damage_keywords = ['primary damage', 'damage type', 'damage']
+    if body_text:
+        for keyword in damage_keywords:
+            damage_match = re.search(rf'{keyword}[:\s]+([A-Za-z\s/]+)', body_text, re.IGNORECASE)
+            if damage_match:
+                damage_value = damage_match.group(1).strip()
+                damage_value = re.sub(r'\s+', ' ', damage_value)
+                damage_value = re.sub(r'\s*(estimated retail value|secondary damage).*', '', damage_value, flags=re.IGNORECASE)
+                damage_value = damage_value.strip()
+                if len(damage_value) > 2:
+                    vehicle["damage"] = damage_value
                     break
-            
-            # Also search in page source for Location/Lane patterns
-            if location_lane_state == "N/A":
-                location_lane_patterns = [
-                    r'(?:Location\s*/\s*Lane|Location/Lane)[:\s]*[^<\n]{0,50}?\b(MD|NJ|DC|NY|Maryland|New Jersey|District of Columbia|New York)\b',
-                    r'Lane[:\s]+[^<\n]{0,50}?\b(MD|NJ|DC|NY|Maryland|New Jersey|District of Columbia|New York)\b',
-                ]
-                for pattern in location_lane_patterns:
-                    match = re.search(pattern, page_source, re.IGNORECASE)
-                    if match:
-                        state_text = match.group(1).strip()
-                        if state_text.upper() in ['MD', 'MARYLAND']:
-                            location_lane_state = 'MD'
-                            break
-                        elif state_text.upper() in ['NJ', 'NEW JERSEY']:
-                            location_lane_state = 'NJ'
-                            break
-                        elif state_text.upper() in ['DC', 'DISTRICT OF COLUMBIA']:
-                            location_lane_state = 'DC'
-                            break
-                        elif state_text.upper() in ['NY', 'NEW YORK']:
-                            location_lane_state = 'NY'
-                            break
-                    if location_lane_state != "N/A":
-                        break
-            
-            # Extract Sale Document/Location - CRITICAL CHECK
-            # This field on Copart shows where the sale document is located
-            sale_doc_state = "N/A"
-            
-            # Method 1: Search for Sale Doc/Document keywords in HTML elements
-            sale_doc_keywords = [
-                'Sale doc', 'Sale document', 'Sale location', 'Document location', 
-                'Sale yard', 'Sale Doc', 'Sale Document', 'saleDoc', 'saleDocLocation',
-                'Document', 'Doc Location', 'Sale Site'
-            ]
-            for keyword in sale_doc_keywords:
-                # Search in all text elements
-                sale_elements = soup.find_all(string=re.compile(keyword, re.IGNORECASE))
-                for elem in sale_elements:
-                    parent = elem.find_parent()
-                    if parent:
-                        parent_text = parent.get_text()
-                        # Extract text after keyword (more flexible pattern)
-                        sale_match = re.search(rf'{re.escape(keyword)}[:\s]*([^\n\r<]+?)(?:\n|$|</|br)', parent_text, re.IGNORECASE | re.DOTALL)
-                        if sale_match:
-                            sale_text = sale_match.group(1).strip()
-                            sale_text = re.sub(r'\s+', ' ', sale_text)
-                            sale_text = sale_text.split('\n')[0].strip()
-                            
-                            # Check for our states in sale doc
-                            if re.search(r'\b(MD|Maryland)\b', sale_text, re.IGNORECASE):
-                                sale_doc_state = 'MD'
-                                break
-                            elif re.search(r'\b(NJ|New Jersey)\b', sale_text, re.IGNORECASE):
-                                sale_doc_state = 'NJ'
-                                break
-                            elif re.search(r'\b(DC|District of Columbia|Washington DC)\b', sale_text, re.IGNORECASE):
-                                sale_doc_state = 'DC'
-                                break
-                            elif re.search(r'\b(NY|New York)\b', sale_text, re.IGNORECASE):
-                                sale_doc_state = 'NY'
-                                break
-                    if sale_doc_state != "N/A":
+
+    # Extract Odometer - Multiple methods for better extraction
+    odometer = "N/A"
+
+    # Method 1: Look for "Odometer" keyword
+    odometer_keywords = ['Odometer', 'Mileage', 'Miles', 'Odometer Reading']
+    for keyword in odometer_keywords:
+        odometer_elements = soup.find_all(string=re.compile(keyword, re.IGNORECASE))
+        for elem in odometer_elements:
+            parent = elem.find_parent()
+            if parent:
+                parent_text = parent.get_text()
+                # Pattern: "Odometer: 123,456 miles" or "Mileage: 123456"
+                odometer_match = re.search(rf'{keyword}[:\s]+(\d{{1,3}}[,\d]*)\s*(?:miles?|mi|km)?', parent_text, re.IGNORECASE)
+                if odometer_match:
+                    odometer_value = odometer_match.group(1).replace(',', '').strip()
+                    if odometer_value and odometer_value.isdigit():
+                        odometer = odometer_value
                         break
-                if sale_doc_state != "N/A":
+            if odometer != "N/A":
+                break
+        if odometer != "N/A":
+            break
+
+    # Method 2: Look for odometer patterns in page source
+    if odometer == "N/A":
+        odometer_patterns = [
+            r'odometer[:\s]+(\d{1,3}[,\d]*)\s*(?:miles?|mi)',
+            r'(\d{1,3}[,\d]*)\s*(?:miles?|mi)\s*odometer',
+            r'mileage[:\s]+(\d{1,3}[,\d]*)\s*(?:miles?|mi)',
+            r'(\d{1,3}[,\d]*)\s*(?:miles?|mi)\s*mileage',
+        ]
+        for pattern in odometer_patterns:
+            odometer_match = re.search(pattern, page_source, re.IGNORECASE)
+            if odometer_match:
+                odometer_value = odometer_match.group(1).replace(',', '').strip()
+                if odometer_value and odometer_value.isdigit():
+                    odometer = odometer_value
                     break
-            
-            # Method 2: Search in page source with multiple patterns (more specific)
-            if sale_doc_state == "N/A":
-                sale_doc_patterns = [
-                    # Look for "Sale doc" or "Sale document" followed by state (within 50 chars)
-                    r'(?:Sale\s+doc[ument]*|saleDoc)[:\s]*[^<\n]{0,50}?\b(MD|NJ|DC|NY|Maryland|New Jersey|District of Columbia|New York)\b',
-                    # Look for "Sale location" followed by state
-                    r'Sale\s+location[:\s]*[^<\n]{0,50}?\b(MD|NJ|DC|NY|Maryland|New Jersey|District of Columbia|New York)\b',
-                    # Look for "Document location" followed by state
-                    r'Document\s+location[:\s]*[^<\n]{0,50}?\b(MD|NJ|DC|NY|Maryland|New Jersey|District of Columbia|New York)\b',
-                    # Look in data attributes
-                    r'data-sale-doc[^=]*=[^>]*?\b(MD|NJ|DC|NY|Maryland|New Jersey|District of Columbia|New York)\b',
-                    # Look in JSON-like structures
-                    r'["\']saleDoc["\'][^}]*?["\'](MD|NJ|DC|NY|Maryland|New Jersey|District of Columbia|New York)["\']',
-                ]
-                for pattern in sale_doc_patterns:
-                    match = re.search(pattern, page_source, re.IGNORECASE)
-                    if match:
-                        state_text = match.group(1).strip()
-                        # Verify it's a valid state code (not part of another word)
-                        if state_text.upper() in ['MD', 'MARYLAND']:
-                            sale_doc_state = 'MD'
-                            break
-                        elif state_text.upper() in ['NJ', 'NEW JERSEY']:
-                            sale_doc_state = 'NJ'
-                            break
-                        elif state_text.upper() in ['DC', 'DISTRICT OF COLUMBIA']:
-                            sale_doc_state = 'DC'
-                            break
-                        elif state_text.upper() in ['NY', 'NEW YORK']:
-                            sale_doc_state = 'NY'
-                            break
-                    if sale_doc_state != "N/A":
-                        break
-            
-            # Method 3: Search in data attributes and JSON data
-            if sale_doc_state == "N/A":
-                # Look for JSON data in script tags
-                script_tags = soup.find_all('script')
-                for script in script_tags:
-                    if script.string:
-                        # Look for state codes near "sale" or "doc" keywords
-                        json_match = re.search(r'(?:sale|doc|location).*?(MD|NJ|DC|NY|Maryland|New Jersey|District of Columbia|New York)', script.string, re.IGNORECASE)
-                        if json_match:
-                            state_text = json_match.group(1).strip()
-                            if state_text.upper() in ['MD', 'MARYLAND']:
-                                sale_doc_state = 'MD'
-                                break
-                            elif state_text.upper() in ['NJ', 'NEW JERSEY']:
-                                sale_doc_state = 'NJ'
-                                break
-                            elif state_text.upper() in ['DC', 'DISTRICT OF COLUMBIA']:
-                                sale_doc_state = 'DC'
-                                break
-                            elif state_text.upper() in ['NY', 'NEW YORK']:
-                                sale_doc_state = 'NY'
-                                break
-                if sale_doc_state != "N/A":
-                    pass  # Found it
-            
-            # Extract Damage
-            damage_keywords = ['primary damage', 'damage type', 'damage']
-            if body_text:
-                for keyword in damage_keywords:
-                    damage_match = re.search(rf'{keyword}[:\s]+([A-Za-z\s/]+)', body_text, re.IGNORECASE)
-                    if damage_match:
-                        damage_value = damage_match.group(1).strip()
-                        damage_value = re.sub(r'\s+', ' ', damage_value)
-                        damage_value = re.sub(r'\s*(estimated retail value|secondary damage).*', '', damage_value, flags=re.IGNORECASE)
-                        damage_value = damage_value.strip()
-                        if len(damage_value) > 2:
-                            vehicle["damage"] = damage_value
-                            break
-            
-            # Extract Odometer - Multiple methods for better extraction
-            odometer = "N/A"
-            
-            # Method 1: Look for "Odometer" keyword
-            odometer_keywords = ['Odometer', 'Mileage', 'Miles', 'Odometer Reading']
-            for keyword in odometer_keywords:
-                odometer_elements = soup.find_all(string=re.compile(keyword, re.IGNORECASE))
-                for elem in odometer_elements:
-                    parent = elem.find_parent()
-                    if parent:
-                        parent_text = parent.get_text()
-                        # Pattern: "Odometer: 123,456 miles" or "Mileage: 123456"
-                        odometer_match = re.search(rf'{keyword}[:\s]+(\d{{1,3}}[,\d]*)\s*(?:miles?|mi|km)?', parent_text, re.IGNORECASE)
-                        if odometer_match:
-                            odometer_value = odometer_match.group(1).replace(',', '').strip()
-                            if odometer_value and odometer_value.isdigit():
-                                odometer = odometer_value
-                                break
-                    if odometer != "N/A":
+
+    # Method 3: Look for mileage in body text
+    if odometer == "N/A" and body_text:
+        mileage_patterns = [
+            r'(\d{1,3}[,\d]*)\s*(?:miles?|mi)\s*(?:on|odometer|mileage)',
+            r'(?:on|odometer|mileage)[:\s]+(\d{1,3}[,\d]*)\s*(?:miles?|mi)',
+        ]
+        for pattern in mileage_patterns:
+            mileage_match = re.search(pattern, body_text, re.IGNORECASE)
+            if mileage_match:
+                mileage_value = mileage_match.group(1).replace(',', '').strip()
+                if mileage_value and mileage_value.isdigit():
+                    # Validate reasonable mileage (0 to 200,000 miles)
+                    mileage_int = int(mileage_value)
+                    if 0 <= mileage_int <= 200000:
+                        odometer = mileage_value
                         break
-                if odometer != "N/A":
+
+    vehicle["odometer"] = odometer
+
+    # Color extraction removed (not needed)
+
+    # Extract Current Bid
+    bid_patterns = [
+        r'current bid[:\s]+\$?([\d,]+)',
+        r'bid[:\s]+\$?([\d,]+)',
+    ]
+    if body_text:
+        for pattern in bid_patterns:
+            bid_match = re.search(pattern, body_text, re.IGNORECASE)
+            if bid_match:
+                bid_value = bid_match.group(1).replace(',', '').strip()
+                if bid_value and bid_value != '0':
+                    vehicle["current_bid"] = f"${bid_value}"
                     break
-            
-            # Method 2: Look for odometer patterns in page source
-            if odometer == "N/A":
-                odometer_patterns = [
-                    r'odometer[:\s]+(\d{1,3}[,\d]*)\s*(?:miles?|mi)',
-                    r'(\d{1,3}[,\d]*)\s*(?:miles?|mi)\s*odometer',
-                    r'mileage[:\s]+(\d{1,3}[,\d]*)\s*(?:miles?|mi)',
-                    r'(\d{1,3}[,\d]*)\s*(?:miles?|mi)\s*mileage',
-                ]
-                for pattern in odometer_patterns:
-                    odometer_match = re.search(pattern, page_source, re.IGNORECASE)
-                    if odometer_match:
-                        odometer_value = odometer_match.group(1).replace(',', '').strip()
-                        if odometer_value and odometer_value.isdigit():
-                            odometer = odometer_value
-                            break
-            
-            # Method 3: Look for mileage in body text
-            if odometer == "N/A" and body_text:
-                mileage_patterns = [
-                    r'(\d{1,3}[,\d]*)\s*(?:miles?|mi)\s*(?:on|odometer|mileage)',
-                    r'(?:on|odometer|mileage)[:\s]+(\d{1,3}[,\d]*)\s*(?:miles?|mi)',
-                ]
-                for pattern in mileage_patterns:
-                    mileage_match = re.search(pattern, body_text, re.IGNORECASE)
-                    if mileage_match:
-                        mileage_value = mileage_match.group(1).replace(',', '').strip()
-                        if mileage_value and mileage_value.isdigit():
-                            # Validate reasonable mileage (0 to 200,000 miles)
-                            mileage_int = int(mileage_value)
-                            if 0 <= mileage_int <= 200000:
-                                odometer = mileage_value
-                                break
-            
-            vehicle["odometer"] = odometer
-            
-            # Color extraction removed (not needed)
-            
-            # Extract Current Bid
-            bid_patterns = [
-                r'current bid[:\s]+\$?([\d,]+)',
-                r'bid[:\s]+\$?([\d,]+)',
-            ]
-            if body_text:
-                for pattern in bid_patterns:
-                    bid_match = re.search(pattern, body_text, re.IGNORECASE)
-                    if bid_match:
-                        bid_value = bid_match.group(1).replace(',', '').strip()
-                        if bid_value and bid_value != '0':
-                            vehicle["current_bid"] = f"${bid_value}"
-                            break
-            
-            # Extract Auction Countdown
-            countdown_patterns = [
-                r'(\d+\s*(?:d|day|days)\s+\d+\s*(?:h|hour|hours)\s+\d+\s*(?:min|minute|minutes?))\s*(?:left|remaining)?',
-                r'(\d{1,2}:\d{2}:\d{2})\s*(?:left|remaining)',
-            ]
-            if body_text:
-                for pattern in countdown_patterns:
-                    countdown_match = re.search(pattern, body_text, re.IGNORECASE)
-                    if countdown_match:
-                        countdown_value = countdown_match.group(1).strip()
-                        vehicle["auction_countdown"] = countdown_value
-                        break
-            
-            # Extract Title - MUST contain "Salvage"
-            title = "N/A"
-            if "salvage" in page_source.lower() or "salvage" in body_text.lower():
-                title_patterns = [
-                    r'title[:\s]+(salvage)',
-                    r'title\s+type[:\s]+(salvage)',
-                    r'(salvage)\s+title',
-                ]
-                for pattern in title_patterns:
-                    title_match = re.search(pattern, page_source, re.IGNORECASE)
-                    if title_match:
-                        title = "Salvage"
-                        break
-            
-            vehicle["title"] = title
-            
-            # STRICT FILTERING - VERIFY FROM PAGE SOURCE AND SALE DOC
-            # 1. Check location (must be MD, DC, NJ, or NY) - FINAL VERIFICATION
-            location_state = vehicle.get("location_state", "N/A")
-            
-            # CRITICAL: Check Sale Document field - MUST include MD, DC, NJ, or NY
-            # This is the PRIMARY check - Sale doc location is the most reliable
-            if sale_doc_state != "N/A":
-                print(f"  ✓ Sale doc found: {sale_doc_state}")
-                if sale_doc_state not in ['MD', 'DC', 'NJ', 'NY']:
-                    print(f"  ❌ FILTERED OUT: Sale doc shows '{sale_doc_state}' which is NOT MD/DC/NJ/NY")
-                    return None
-                # Sale doc is the authoritative source - use it
-                location_state = sale_doc_state
-                vehicle["location_state"] = sale_doc_state
-                # Update location text if needed
-                if vehicle.get("location") == "N/A" or vehicle.get("location") not in ['MD', 'DC', 'NJ', 'NY']:
-                    vehicle["location"] = sale_doc_state
-                # If location_state was different, log it but use Sale doc
-                if vehicle.get("location_state", "N/A") != sale_doc_state:
-                    print(f"  ⚠️  Note: Location field showed different state, but Sale doc is authoritative")
-            else:
-                # If sale doc not found, check Location/Lane field
-                if location_lane_state != "N/A":
-                    print(f"  ✓ Location/Lane found: {location_lane_state}")
-                    if location_lane_state not in ['MD', 'DC', 'NJ', 'NY']:
-                        print(f"  ❌ FILTERED OUT: Location/Lane shows '{location_lane_state}' which is NOT MD/DC/NJ/NY")
-                        return None
-                    # Use Location/Lane as location state
-                    location_state = location_lane_state
-                    vehicle["location_state"] = location_lane_state
-                    if vehicle.get("location") == "N/A":
-                        vehicle["location"] = location_lane_state
-                else:
-                    # If neither Sale doc nor Location/Lane found, verify location field
-                    print(f"  ⚠️  Sale doc and Location/Lane not found - verifying location only")
-                    if location_state not in ['MD', 'DC', 'NJ', 'NY']:
-                        print(f"  ❌ FILTERED OUT: Location '{location_state}' is NOT MD/DC/NJ/NY")
-                        return None
-            
-            # Double-check location from page source
-            if location_state not in ['MD', 'DC', 'NJ', 'NY']:
-                # Final check: search page one more time
-                final_check = "N/A"
-                if re.search(r'\b(MD|Maryland)\b', page_source, re.IGNORECASE):
-                    # Make sure it's not part of another word
-                    md_context = re.search(r'[^A-Za-z](MD|Maryland)[^A-Za-z]', page_source, re.IGNORECASE)
-                    if md_context:
-                        final_check = 'MD'
-                elif re.search(r'\b(NJ|New Jersey)\b', page_source, re.IGNORECASE):
-                    nj_context = re.search(r'[^A-Za-z](NJ|New Jersey)[^A-Za-z]', page_source, re.IGNORECASE)
-                    if nj_context:
-                        final_check = 'NJ'
-                elif re.search(r'\b(DC|District of Columbia|Washington DC)\b', page_source, re.IGNORECASE):
-                    final_check = 'DC'
-                elif re.search(r'\b(NY|New York)\b', page_source, re.IGNORECASE):
-                    ny_context = re.search(r'[^A-Za-z](NY|New York)[^A-Za-z]', page_source, re.IGNORECASE)
-                    if ny_context:
-                        final_check = 'NY'
-                
-                if final_check in ['MD', 'DC', 'NJ', 'NY']:
-                    vehicle["location_state"] = final_check
-                    if vehicle.get("location") == "N/A" or vehicle.get("location") == location_state:
-                        vehicle["location"] = final_check
-                    location_state = final_check
-                else:
-                    print(f"  ❌ FILTERED OUT: Location '{location_state}' is NOT MD/DC/NJ/NY (verified from Copart page)")
-                    return None
-            
-            # Final verification - location_state MUST be one of our allowed states
-            if location_state not in ['MD', 'DC', 'NJ', 'NY']:
-                print(f"  ❌ FILTERED OUT: Final location check failed - '{location_state}'")
+
+    # Extract Auction Countdown
+    countdown_patterns = [
+        r'(\d+\s*(?:d|day|days)\s+\d+\s*(?:h|hour|hours)\s+\d+\s*(?:min|minute|minutes?))\s*(?:left|remaining)?',
+        r'(\d{1,2}:\d{2}:\d{2})\s*(?:left|remaining)',
+    ]
+    if body_text:
+        for pattern in countdown_patterns:
+            countdown_match = re.search(pattern, body_text, re.IGNORECASE)
+            if countdown_match:
+                countdown_value = countdown_match.group(1).strip()
+                vehicle["auction_countdown"] = countdown_value
+                break
+
+    # Extract Sale Date and Sale Status (refreshed often for lots closing soon)
+    if body_text:
+        sale_match = re.search(r'Sale\s+Date[:\s]+([^\n]+)', body_text, re.IGNORECASE)
+        if sale_match:
+            vehicle["sale_info"] = sale_match.group(1).strip()[:100]
+        status_match = re.search(r'Sale\s+Status[:\s]+([^\n]+)', body_text, re.IGNORECASE)
+        if status_match:
+            vehicle["sale_status"] = status_match.group(1).strip()[:60]
+    stamp_scrape_times(vehicle, fetched_at)
+
+    # Extract Title - MUST contain "Salvage"
+    title = "N/A"
+    if "salvage" in page_source.lower() or "salvage" in body_text.lower():
+        title_patterns = [
+            r'title[:\s]+(salvage)',
+            r'title\s+type[:\s]+(salvage)',
+            r'(salvage)\s+title',
+        ]
+        for pattern in title_patterns:
+            title_match = re.search(pattern, page_source, re.IGNORECASE)
+            if title_match:
+                title = "Salvage"
+                break
+
+    vehicle["title"] = title
+
+    # STRICT FILTERING - VERIFY FROM PAGE SOURCE AND SALE DOC
+    # 1. Check location (must be one of the allowed states) - FINAL VERIFICATION
+    location_state = vehicle.get("location_state", "N/A")
+
+    # CRITICAL: Check Sale Document field - MUST be an allowed state
+    # This is the PRIMARY check - Sale doc location is the most reliable
+    if sale_doc_state != "N/A":
+        print(f"  ✓ Sale doc found: {sale_doc_state}")
+        if sale_doc_state not in states:
+            print(f"  ❌ FILTERED OUT: Sale doc shows '{sale_doc_state}' which is NOT {allowed}")
+            return None
+        # Sale doc is the authoritative source - use it
+        location_state = sale_doc_state
+        vehicle["location_state"] = sale_doc_state
+        # Update location text if needed
+        if vehicle.get("location") == "N/A" or vehicle.get("location") not in states:
+            vehicle["location"] = sale_doc_state
+        # If location_state was different, log it but use Sale doc
+        if vehicle.get("location_state", "N/A") != sale_doc_state:
+            print(f"  ⚠️  Note: Location field showed different state, but Sale doc is authoritative")
+    else:
+        # If sale doc not found, check Location/Lane field
+        if location_lane_state != "N/A":
+            print(f"  ✓ Location/Lane found: {location_lane_state}")
+            if location_lane_state not in states:
+                print(f"  ❌ FILTERED OUT: Location/Lane shows '{location_lane_state}' which is NOT {allowed}")
                 return None
-            
-            # 2. Check title (must contain "Salvage")
-            if "SALVAGE" not in vehicle.get("title", "").upper():
-                print(f"  ❌ Filtered out: Title '{vehicle.get('title')}' does not contain 'Salvage'")
+            # Use Location/Lane as location state
+            location_state = location_lane_state
+            vehicle["location_state"] = location_lane_state
+            if vehicle.get("location") == "N/A":
+                vehicle["location"] = location_lane_state
+        else:
+            # If neither Sale doc nor Location/Lane found, verify location field
+            print(f"  ⚠️  Sale doc and Location/Lane not found - verifying location only")
+            if location_state not in states:
+                print(f"  ❌ FILTERED OUT: Location '{location_state}' is NOT {allowed}")
                 return None
-            
-            # 3. Filter by odometer (must be under 100,000 miles)
-            odometer = vehicle.get('odometer', 'N/A')
-            if odometer != 'N/A':
-                try:
-                    # Remove commas and convert to int
-                    odometer_value = int(str(odometer).replace(',', '').replace(' ', ''))
-                    if odometer_value >= 100000:
-                        print(f"  ❌ Filtered out: Odometer {odometer_value:,} miles is >= 100,000")
-                        return None
-                except (ValueError, AttributeError):
-                    # If odometer can't be parsed, skip this vehicle
-                    print(f"  ❌ Filtered out: Odometer '{odometer}' cannot be parsed")
-                    return None
-            else:
-                # If odometer is N/A, skip this vehicle (we only want vehicles with known odometer)
-                print(f"  ❌ Filtered out: Odometer is N/A (we only want vehicles with known odometer)")
+
+    # Final verification - location_state MUST be one of our allowed states
+    if location_state not in states:
+        print(f"  ❌ FILTERED OUT: Final location check failed - '{location_state}'")
+        return None
+
+    # 2. Check title (must contain "Salvage")
+    if "SALVAGE" not in vehicle.get("title", "").upper():
+        print(f"  ❌ Filtered out: Title '{vehicle.get('title')}' does not contain 'Salvage'")
+        return None
+
+    # 3. Filter by odometer (must be under 100,000 miles)
+    odometer = vehicle.get('odometer', 'N/A')
+    if odometer != 'N/A':
+        try:
+            # Remove commas and convert to int
+            odometer_value = int(str(odometer).replace(',', '').replace(' ', ''))
+            if odometer_value >= 100000:
+                print(f"  ❌ Filtered out: Odometer {odometer_value:,} miles is >= 100,000")
                 return None
-            
-            # 4. Check for upcoming/future
-            if body_text:
-                upcoming_patterns = [
-                    r'upcoming\s+auction',
-                    r'future\s+sale',
-                    r'scheduled\s+for\s+\d{4}',
-                ]
-                for pattern in upcoming_patterns:
-                    if re.search(pattern, body_text, re.IGNORECASE):
-                        print(f"  ❌ Filtered out: Upcoming/future auction")
-                        return None
-            
-            return vehicle
-            
-        except Exception as e:
-            print(f"Error scraping lot {lot_number}: {str(e)}")
+        except (ValueError, AttributeError):
+            # If odometer can't be parsed, skip this vehicle
+            print(f"  ❌ Filtered out: Odometer '{odometer}' cannot be parsed")
             return None
-    
-    def scrape_multiple_lots(self, lot_numbers, limit=100):
-        """Scrape multiple Copart lots (optimized for speed)"""
-        vehicles = []
-        
-        if not self.page:
-            return vehicles
-        
-        total_to_scrape = min(len(lot_numbers), limit)
-        print(f"Scraping {total_to_scrape} Copart lots (optimized for speed)...")
-        
-        for i, lot_number in enumerate(lot_numbers[:limit], 1):
-            try:
-                vehicle = self.scrape_copart_lot(lot_number)
-                if vehicle:
-                    vehicles.append(vehicle)
-                    # Shorter print message for speed
-                    print(f"  [{i}/{total_to_scrape}] ✓ {lot_number}: {vehicle.get('year')} - {vehicle.get('location')}")
+    else:
+        # If odometer is N/A, skip this vehicle (we only want vehicles with known odometer)
+        print(f"  ❌ Filtered out: Odometer is N/A (we only want vehicles with known odometer)")
+        return None
+
+    # 4. Check for upcoming/future
+    if body_text:
+        upcoming_patterns = [
+            r'upcoming\s+auction',
+            r'future\s+sale',
+            r'scheduled\s+for\s+\d{4}',
+        ]
+        for pattern in upcoming_patterns:
+            if re.search(pattern, body_text, re.IGNORECASE):
+                print(f"  ❌ Filtered out: Upcoming/future auction")
+                return None
+
+    return vehicle
+
+
+def parse_lot_images(lot_number, page_source, dom_sources=(), images=None):
+    """Find a lot page's images at maximum quality
+
+    Pure parsing, so it can run on a worker thread while the browser loads the next lot.
+    dom_sources are the src attributes _load_lot_page read from the live page;
+    `images`, when given (fast path or error fallback), is returned as is.
+    """
+    if images is not None:
+        return images
+    soup = BeautifulSoup(page_source, 'html.parser')
+    images = []
+
+    # Method 1: images with the Copart gallery classes (read from the live page)
+    for img_src in dom_sources:
+        if img_src.startswith('//'):
+            img_src = 'https:' + img_src
+        elif img_src.startswith('/'):
+            img_src = 'https://www.copart.com' + img_src
+
+        # CRITICAL: For Copart CDN images, reconstruct to maximum quality format
+        if 'cs.copart.com' in img_src:
+            copart_match = re.search(r'cs\.copart\.com/v1/AUTH_svc\.pdoc/(\d+)/(\d+)/(?:thumb|small|medium|large|full)/(\d+)_(\d+)\.jpg', img_src, re.IGNORECASE)
+            if copart_match:
+                account, lot_num, lot_num2, img_num = copart_match.groups()
+                img_src = f"https://cs.copart.com/v1/AUTH_svc.pdoc/00000/{lot_num}/full/{lot_num}_{img_num}.jpg"
+            else:
+                img_src = re.sub(r'/(thumb|small|medium|large)/', '/full/', img_src, flags=re.IGNORECASE)
+                img_src = re.sub(r'/v1/AUTH_svc\.pdoc/\d+/(\d+)/', r'/v1/AUTH_svc.pdoc/00000/\1/', img_src)
+        else:
+            img_src = img_src.replace('/thumb/', '/full/').replace('/small/', '/full/').replace('/medium/', '/full/').replace('/large/', '/full/')
+
+        # Remove query parameters
+        if '?' in img_src:
+            img_src = img_src.split('?')[0]
+
+        if img_src.startswith('http') and img_src not in images:
+            images.append(img_src)
+            print(f"         ✅ Found image: {img_src[:80]}...")
+
+    # Method 1b: Also use BeautifulSoup to find images with these classes
+    # Look for images with classes: zoomImgElement p-image-item-box img-responsive ng-star-inserted
+    img_tags = soup.find_all('img', class_=lambda x: x and ('zoomImgElement' in str(x) or 'p-image-item-box' in str(x) or 'img-responsive' in str(x) or 'ng-star-inserted' in str(x)))
+    print(f"      Found {len(img_tags)} img tags with CSS classes using BeautifulSoup")
+    for img in img_tags:
+        # Prioritize high-quality attributes
+        img_src = img.get('data-full') or img.get('data-original') or img.get('data-src') or img.get('src') or img.get('data-lazy-src') or img.get('data-image')
+        if img_src:
+            if img_src.startswith('//'):
+                img_src = 'https:' + img_src
+            elif img_src.startswith('/'):
+                img_src = 'https://www.copart.com' + img_src
+
+            # CRITICAL: For Copart CDN images, reconstruct to maximum quality format
+            if 'cs.copart.com' in img_src:
+                copart_match = re.search(r'cs\.copart\.com/v1/AUTH_svc\.pdoc/(\d+)/(\d+)/(?:thumb|small|medium|large|full)/(\d+)_(\d+)\.jpg', img_src, re.IGNORECASE)
+                if copart_match:
+                    account, lot_num, lot_num2, img_num = copart_match.groups()
+                    img_src = f"https://cs.copart.com/v1/AUTH_svc.pdoc/00000/{lot_num}/full/{lot_num}_{img_num}.jpg"
                 else:
-                    print(f"  [{i}/{total_to_scrape}] ✗ {lot_number}: Filtered")
-                
-                # Minimal delay - only if not last item
-                if i < total_to_scrape:
-                    time.sleep(0.1)  # Further reduced delay (from 0.2 to 0.1)
-                
-            except Exception as e:
-                print(f"  [{i}/{total_to_scrape}] ✗ {lot_number}: Error")
-                continue
-        
-        print(f"\n✅ Successfully scraped {len(vehicles)} vehicles from Copart")
-        return vehicles
+                    img_src = re.sub(r'/(thumb|small|medium|large)/', '/full/', img_src, flags=re.IGNORECASE)
+                    img_src = re.sub(r'/v1/AUTH_svc\.pdoc/\d+/(\d+)/', r'/v1/AUTH_svc.pdoc/00000/\1/', img_src)
+            else:
+                img_src = img_src.replace('/thumb/', '/full/').replace('/small/', '/full/').replace('/medium/', '/full/').replace('/large/', '/full/')
+
+            # Remove query parameters
+            img_src = re.sub(r'[?&](width|height|w|h|size|quality|scale|resize|maxwidth|maxheight)=\d+', '', img_src)
+            if '?' in img_src:
+                img_src = img_src.split('?')[0]
+
+            if img_src.startswith('http') and img_src not in images:
+                images.append(img_src)
+                print(f"         ✅ Found image from BeautifulSoup: {img_src[:80]}...")
+
+    # Method 2: Construct maximum quality Copart image URLs directly
+    # Copart uses: https://cs.copart.com/v1/AUTH_svc.pdoc/00000/{lot}/full/{lot}_{num}.jpg
+    # Try image numbers 1-20 for maximum coverage
+    # IMPORTANT: Always add these URLs - they're the standard format and should work
+    for img_num in range(1, 21):
+        # Use the standard maximum quality URL format
+        img_url = f"https://cs.copart.com/v1/AUTH_svc.pdoc/00000/{lot_number}/full/{lot_number}_{img_num}.jpg"
+        if img_url not in images:
+            images.append(img_url)
+
+    # Method 2b: Also search for any Copart image URLs in the page and convert to max quality
+    copart_image_pattern = rf'https://cs\.copart\.com/v1/AUTH_svc\.pdoc/(\d+)/(\d+)/(?:thumb|small|medium|large|full)/(\d+)_(\d+)\.jpg'
+    image_matches = re.findall(copart_image_pattern, page_source, re.IGNORECASE)
+    for account, lot1, lot2, img_num in image_matches:
+        # Convert to maximum quality format
+        img_url = f"https://cs.copart.com/v1/AUTH_svc.pdoc/00000/{lot2}/full/{lot2}_{img_num}.jpg"
+        if img_url not in images:
+            images.append(img_url)
+
+    # Method 3: Try to find image gallery or carousel - get ALL images
+    # Look for data attributes that might contain image URLs
+    data_attrs = soup.find_all(attrs={'data-image': True})
+    for elem in data_attrs:
+        img_src = elem.get('data-image')
+        if img_src:
+            if img_src.startswith('//'):
+                img_src = 'https:' + img_src
+            elif img_src.startswith('/'):
+                img_src = 'https://www.copart.com' + img_src
+
+            # CRITICAL: For Copart CDN images, construct maximum quality URL
+            if 'cs.copart.com' in img_src:
+                # Extract lot number and image number from URL
+                copart_match = re.search(r'cs\.copart\.com/v1/AUTH_svc\.pdoc/(\d+)/(\d+)/(?:thumb|small|medium|large|full)/(\d+)_(\d+)\.jpg', img_src, re.IGNORECASE)
+                if copart_match:
+                    account, lot_num, lot_num2, img_num = copart_match.groups()
+                    # Use the standard maximum quality URL format
+                    img_src = f"https://cs.copart.com/v1/AUTH_svc.pdoc/00000/{lot_num}/full/{lot_num}_{img_num}.jpg"
+                else:
+                    # Fallback: replace any size with /full/
+                    img_src = re.sub(r'/(thumb|small|medium|large)/', '/full/', img_src, flags=re.IGNORECASE)
+            else:
+                # For non-Copart CDN images, replace size paths
+                img_src = img_src.replace('/thumb/', '/full/').replace('/small/', '/full/').replace('/medium/', '/full/').replace('/large/', '/full/')
+
+            # Remove ALL quality/size parameters
+            img_src = re.sub(r'[?&](width|height|w|h|size|quality|scale|resize|maxwidth|maxheight)=\d+', '', img_src)
+            # Remove query string entirely
+            if '?' in img_src:
+                img_src = img_src.split('?')[0]
+
+            if img_src.startswith('http') and img_src not in images:
+                images.append(img_src)
+
+    # Method 4: Look for image arrays in JavaScript/data attributes
+    # Some pages have image arrays in data attributes
+    for elem in soup.find_all(attrs={'data-images': True}):
+        try:
+            import json
+            images_json = elem.get('data-images')
+            if images_json:
+                img_list = json.loads(images_json)
+                for img_url in img_list:
+                    if isinstance(img_url, str):
+                        if img_url.startswith('//'):
+                            img_url = 'https:' + img_url
+                        elif img_url.startswith('/'):
+                            img_url = 'https://www.copart.com' + img_url
+
+                        # CRITICAL: For Copart CDN images, construct maximum quality URL
+                        if 'cs.copart.com' in img_url:
+                            copart_match = re.search(r'cs\.copart\.com/v1/AUTH_svc\.pdoc/(\d+)/(\d+)/(?:thumb|small|medium|large|full)/(\d+)_(\d+)\.jpg', img_url, re.IGNORECASE)
+                            if copart_match:
+                                account, lot_num, lot_num2, img_num = copart_match.groups()
+                                img_url = f"https://cs.copart.com/v1/AUTH_svc.pdoc/00000/{lot_num}/full/{lot_num}_{img_num}.jpg"
+                            else:
+                                img_url = re.sub(r'/(thumb|small|medium|large)/', '/full/', img_url, flags=re.IGNORECASE)
+                        else:
+                            img_url = img_url.replace('/thumb/', '/full/').replace('/small/', '/full/').replace('/medium/', '/full/').replace('/large/', '/full/')
+
+                        img_url = re.sub(r'[?&](width|height|w|h|size|quality|scale|resize)=\d+', '', img_url)
+                        # Remove query string entirely
+                        if '?' in img_url:
+                            img_url = img_url.split('?')[0]
+
+                        if img_url.startswith('http') and img_url not in images:
+                            images.append(img_url)
+        except:
+            pass
+
+    # Remove duplicates while preserving order
+    seen = set()
+    unique_images = []
+    for img in images:
+        # Normalize URL to avoid duplicates
+        normalized = img.split('?')[0]  # Remove query params for comparison
+        if normalized not in seen:
+            seen.add(normalized)
+            unique_images.append(img)
+
+    # Ensure all images maintain maximum quality - clean them again
+    final_images = []
+    for img_url in unique_images:
+        # Final quality check - ensure /full/ path and no size params
+        clean_url = img_url
+        clean_url = clean_url.replace('/thumb/', '/full/').replace('/small/', '/full/').replace('/medium/', '/full/').replace('/large/', '/full/')
+        clean_url = re.sub(r'[?&](width|height|w|h|size|quality|scale|resize|maxwidth|maxheight)=\d+', '', clean_url)
+        # Ensure Copart images use /full/ path
+        if 'cs.copart.com' in clean_url:
+            clean_url = re.sub(r'/(thumb|small|medium|large)/', '/full/', clean_url)
+
+        # Validate URL - ensure it's a valid image URL
+        if clean_url.startswith('http') and ('copart' in clean_url.lower() or '.jpg' in clean_url.lower() or '.jpeg' in clean_url.lower() or '.png' in clean_url.lower()):
+            # Ensure it's not a page URL, error URL, or Railway deployment URL
+            invalid_patterns = ['railway.app', 'web-production', '/lot/', 'copart.com/lot', 'localhost', '127.0.0.1']
+            if not any(pattern in clean_url.lower() for pattern in invalid_patterns):
+                # Ensure it ends with an image extension or contains cs.copart.com
+                if '.jpg' in clean_url.lower() or '.jpeg' in clean_url.lower() or '.png' in clean_url.lower() or 'cs.copart.com' in clean_url.lower():
+                    final_images.append(clean_url)
+
+    # If we found images, return them (all at maximum quality)
+    if final_images:
+        return final_images
+
+    # Fallback: Try Copart's standard high-quality image URLs (try more images: 1-10)
+    default_images = []
+    for img_num in range(1, 11):
+        default_images.append(f"https://cs.copart.com/v1/AUTH_svc.pdoc/00000/{lot_number}/full/{lot_number}_{img_num}.jpg")
+    return default_images
+
+
+def parse_lot_details(lot_number, details, fetched_at=None, states=None):
+    """Build and filter a vehicle from Copart's lot details JSON (the lot page's data source)
+
+    Fills the same fields and applies the same filters as parse_lot_page, so a lot read
+    here and one read from its page compare equal. Returns None for lots that fail them.
+    states: allowed location states - defaults to ALLOWED_STATES.
+    """
+    states = states or ALLOWED_STATES
+    copart_url = f"https://www.copart.com/lot/{lot_number}"
+    dynamic = details.get('dynamicLotDetails') or {}
+
+    # Yard names look like "MD - BALTIMORE"
+    yard = str(details.get('yn') or '')
+    state = str(details.get('locState') or '').strip().upper()
+    if not state:
+        yard_state = re.match(r'\s*([A-Z]{2})\s*-', yard)
+        state = yard_state.group(1) if yard_state else 'N/A'
+    city = yard.split('-', 1)[1].strip().title() if '-' in yard else yard.strip().title()
+    location = f"{city}, {state}" if city and state != 'N/A' else (state if state != 'N/A' else "N/A")
+
+    odometer = details.get('orr')
+    bid = dynamic.get('currentBid') or details.get('hb')
+    vehicle = {
+        "lot_number": lot_number,
+        "year": parse_year(details.get('lcy')),
+        "make": str(details.get('mkn') or 'Toyota').title(),
+        "model": str(details.get('lm') or details.get('lmg') or 'Corolla').title(),
+        "damage": str(details.get('dd') or 'N/A'),
+        "location": location,
+        "location_state": state,
+        "odometer": str(int(float(odometer))) if odometer not in (None, '') else "N/A",
+        "current_bid": f"${int(float(bid))}" if bid else "N/A",
+        "auction_countdown": "N/A",
+        "url": copart_url,
+        "images": [f"https://cs.copart.com/v1/AUTH_svc.pdoc/00000/{lot_number}/full/{lot_number}_1.jpg"],
+    }
+    sale_ms = details.get('ad')
+    if sale_ms:
+        vehicle["sale_info"] = format_sale_info(float(sale_ms) / 1000)
+    if details.get('lcd'):
+        vehicle["condition"] = str(details['lcd']).strip()[:50]
+    if dynamic.get('saleStatus'):
+        vehicle["sale_status"] = str(dynamic['saleStatus'])[:60]
+    title_text = f"{details.get('tgd') or ''} {details.get('td') or ''}"
+    vehicle["title"] = "Salvage" if "SALVAGE" in title_text.upper() else (title_text.strip() or "N/A")
+
+    stamp_scrape_times(vehicle, fetched_at)
+    if sale_ms:
+        vehicle["sale_time_utc"] = format_utc(float(sale_ms) / 1000)
+
+    if state not in states:
+        print(f"  ❌ FILTERED OUT: Location '{state}' is NOT {'/'.join(states)}")
+        return None
+    if vehicle["title"] != "Salvage":
+        print(f"  ❌ Filtered out: Title '{vehicle['title']}' does not contain 'Salvage'")
+        return None
+    if vehicle["odometer"] == "N/A" or int(vehicle["odometer"]) >= 100000:
+        print(f"  ❌ Filtered out: Odometer {vehicle['odometer']} is N/A or >= 100,000")
+        return None
+    return vehicle
 
 
 def extract_lot_numbers_from_bidcars():
@@ -1708,11 +1948,26 @@ def extract_lot_numbers_from_bidcars():
     return []
 
 
-def scrape_copart_vehicles_from_lots(lot_numbers, limit=100):
-    """Scrape vehicle data from Copart using lot numbers"""
+def scrape_copart_vehicles_from_lots(lot_numbers, limit=100, workers=None, states=None):
+    """Scrape vehicle data from Copart using lot numbers
+
+    workers defaults to SCRAPER_WORKERS or the CPU count; with more than one the lots
+    are sharded across processes, each with its own browser.
+    states: allowed location states - defaults to ALLOWED_STATES.
+    """
+    from sharded import resolve_worker_count
+    workers = resolve_worker_count(workers)
+    if workers > 1:
+        from sharded import scrape_lots_sharded, LiveLotTask
+        try:
+            return scrape_lots_sharded(lot_numbers, limit=limit, workers=workers, task=LiveLotTask(states=states))
+        except Exception as e:
+            print(f"Error scraping Copart: {str(e)}")
+            return []
+    
     scraper = None
     try:
-        scraper = CopartScraper()
+        scraper = CopartScraper(states=states)
         vehicles = scraper.scrape_multiple_lots(lot_numbers, limit=limit)
         return vehicles
     except Exception as e:
@@ -1723,23 +1978,41 @@ def scrape_copart_vehicles_from_lots(lot_numbers, limit=100):
             scraper.close()
 
 
-def scrape_copart_corolla(limit=100):
+@profile_run
+def scrape_copart_corolla(limit=100, journal=None, resume=False, searches=None, states=None, on_vehicle=None, budget=None):
     """Main function to scrape Toyota Corolla data (OPTIMIZED - extracts all data from search page)
     
     NEW APPROACH: Extract all data directly from search results page - MUCH FASTER!
     No need to visit individual lot pages.
+    
+    With resume=True, continues the newest unfinished run journal (or starts one), so a
+    run that crashed halfway only redoes the lot that was in flight.
+    searches, states and on_vehicle are passed to extract_vehicles_from_search_results.
+    
+    budget: total seconds for the run. Every wait uses the time left, and when it runs
+    out the vehicles gathered so far are returned in a ScrapeResult with partial=True.
     """
+    owns_journal = False
     try:
+        if journal is None and resume:
+            from journal import RunJournal
+            journal = RunJournal.resume_or_start()
+            owns_journal = True
+        
         print("Extracting vehicle data directly from Copart search results...")
         print("       (Much faster - no individual page visits needed)")
         scraper = CopartScraper()
+        scraper.deadline = Deadline(budget)
         try:
-            vehicles = scraper.extract_vehicles_from_search_results(filter_by_location=False)
+            vehicles = scraper.extract_vehicles_from_search_results(
+                filter_by_location=False, journal=journal,
+                searches=searches, states=states, on_vehicle=on_vehicle, limit=limit
+            )
             print(f"Found {len(vehicles)} vehicles")
             
             # Limit results if needed
             if limit and len(vehicles) > limit:
-                vehicles = vehicles[:limit]
+                vehicles = ScrapeResult(vehicles[:limit], partial=vehicles.partial, reason=vehicles.reason)
                 print(f"Limited to {limit} vehicles")
         finally:
             scraper.close()
@@ -1749,4 +2022,7 @@ def scrape_copart_corolla(limit=100):
         print(f"Scraping failed: {str(e)}")
         import traceback
         traceback.print_exc()
-        return []
+        return ScrapeResult(partial=True, reason=str(e))
+    finally:
+        if owns_journal and journal:
+            journal.close()
@@ -0,0 +1,206 @@
+"""
+Full-text search over the vehicle snapshot for the /api/search endpoint
+An inverted index (term -> {lot: weight}) is kept in step with the snapshot through its
+change log: a new version only re-indexes the lots that were added, updated or removed.
+Query terms match by prefix over a sorted vocabulary, and hits are ranked by field
+weight x inverse document frequency.
+"""
+import re
+import math
+import heapq
+import threading
+from bisect import bisect_left, insort
+from operator import itemgetter
+
+from snapshot import vehicle_key
+
+
+# Searchable fields and how much a hit in each counts
+FIELD_WEIGHTS = {
+    "lot_number": 5.0,
+    "location": 3.0,
+    "location_state": 2.0,
+    "damage": 3.0,
+    "condition": 2.0,
+    "title": 2.0,
+    "sale_info": 1.0,
+    "year": 1.5,
+    "make": 1.0,
+    "model": 1.0,
+}
+
+# Prefix matches count less than a whole-word match, and a short prefix expands to at most
+# this many terms (the most common ones)
+PREFIX_WEIGHT = 0.6
+MAX_PREFIX_TERMS = 100
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text):
+    if text is None:
+        return []
+    return _TOKEN.findall(str(text).lower())
+
+
+def vehicle_terms(vehicle):
+    """Return {term: weight} for one vehicle"""
+    terms = {}
+    for field, weight in FIELD_WEIGHTS.items():
+        value = vehicle.get(field)
+        if value in (None, "N/A"):
+            continue
+        for term in tokenize(value):
+            terms[term] = max(terms.get(term, 0.0), weight)
+    return terms
+
+
+class SearchIndex:
+    """Inverted index over one VehicleSnapshot, updated incrementally per version"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None  # snapshot version the index reflects
+        self.vehicles = {}  # lot -> vehicle
+        self.doc_terms = {}  # lot -> {term: weight}
+        self.postings = {}  # term -> {lot: weight}
+        self.vocabulary = []  # sorted terms, for prefix lookups
+        self.rebuilds = 0
+        self.incremental_updates = 0
+
+    def __len__(self):
+        return len(self.vehicles)
+
+    # -- maintenance -----------------------------------------------------
+
+    def _remove(self, key):
+        for term in self.doc_terms.pop(key, {}):
+            posting = self.postings[term]
+            del posting[key]
+            if not posting:
+                del self.postings[term]
+                del self.vocabulary[bisect_left(self.vocabulary, term)]
+        self.vehicles.pop(key, None)
+
+    def _add(self, vehicle):
+        key = vehicle_key(vehicle)
+        self._remove(key)
+        terms = vehicle_terms(vehicle)
+        self.vehicles[key] = vehicle
+        self.doc_terms[key] = terms
+        for term, weight in terms.items():
+            posting = self.postings.get(term)
+            if posting is None:
+                posting = self.postings[term] = {}
+                insort(self.vocabulary, term)
+            posting[key] = weight
+
+    def update(self, snapshot):
+        """Catch up with `snapshot`: apply its changes since the indexed version, or rebuild"""
+        with self.lock:
+            if self.version == snapshot.version:
+                return
+            changes = snapshot.changes_since(self.version) if self.version is not None else None
+            if changes is None:
+                version, vehicles = snapshot.version, snapshot.as_list()
+                self.vehicles, self.doc_terms, self.postings, self.vocabulary = {}, {}, {}, []
+                postings = self.postings
+                for vehicle in vehicles:
+                    key = vehicle_key(vehicle)
+                    terms = vehicle_terms(vehicle)
+                    self.vehicles[key] = vehicle
+                    self.doc_terms[key] = terms
+                    for term, weight in terms.items():
+                        postings.setdefault(term, {})[key] = weight
+                self.vocabulary = sorted(postings)
+                self.version = version
+                self.rebuilds += 1
+                return
+            for key in changes["removed"]:
+                self._remove(str(key))
+            for vehicle in changes["added"] + changes["updated"]:
+                self._add(vehicle)
+            self.version = changes["version"]
+            self.incremental_updates += 1
+
+    # -- queries ---------------------------------------------------------
+
+    def _expand(self, token):
+        """Terms matching `token`: itself (whole word) and up to MAX_PREFIX_TERMS longer terms"""
+        vocabulary = self.vocabulary
+        position = bisect_left(vocabulary, token)
+        matches = []
+        while position < len(vocabulary) and vocabulary[position].startswith(token):
+            matches.append(vocabulary[position])
+            position += 1
+        exact = [term for term in matches if term == token]
+        longer = [term for term in matches if term != token]
+        if len(longer) > MAX_PREFIX_TERMS:
+            longer = heapq.nlargest(MAX_PREFIX_TERMS, longer, key=lambda term: len(self.postings[term]))
+        return exact, longer
+
+    def _token_scores(self, exact, longer, count, candidates=None):
+        """{lot: best score} for one query word; only lots in `candidates` when given"""
+        scores = {}
+        for terms, factor in ((exact, 1.0), (longer, PREFIX_WEIGHT)):
+            for term in terms:
+                posting = self.postings[term]
+                scale = math.log(1 + count / len(posting)) * factor
+                if candidates is not None and len(candidates) < len(posting):
+                    pairs = ((key, posting[key]) for key in candidates if key in posting)
+                else:
+                    pairs = posting.items()
+                if not scores:
+                    scores = {key: weight * scale for key, weight in pairs
+                              if candidates is None or key in candidates}
+                    continue
+                for key, weight in pairs:
+                    if candidates is not None and key not in candidates:
+                        continue
+                    score = weight * scale
+                    if score > scores.get(key, 0.0):
+                        scores[key] = score
+        return scores
+
+    def search(self, query, offset=0, limit=20):
+        """Return (total hits, [(score, vehicle)] for the requested page)
+
+        Every query word must match (as a whole word or a prefix) in some field.
+        The rarest word is scored first, and later words only look at its hits.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return 0, []
+        with self.lock:
+            count = max(1, len(self.vehicles))
+            expanded = []
+            for token in tokens:
+                exact, longer = self._expand(token)
+                size = sum(len(self.postings[term]) for term in exact + longer)
+                if not size:
+                    return 0, []
+                expanded.append((size, exact, longer))
+            expanded.sort(key=lambda item: item[0])
+
+            scores = None
+            for _, exact, longer in expanded:
+                token_scores = self._token_scores(exact, longer, count, candidates=scores)
+                if scores is None:
+                    scores = token_scores
+                else:
+                    scores = {key: scores[key] + score for key, score in token_scores.items()}
+                if not scores:
+                    return 0, []
+            top = heapq.nlargest(offset + limit, scores.items(), key=itemgetter(1))
+            return len(scores), [(round(score, 3), self.vehicles[key]) for key, score in top[offset:]]
+
+    def stats(self):
+        with self.lock:
+            return {
+                "version": self.version,
+                "documents": len(self.vehicles),
+                "terms": len(self.postings),
+                "rebuilds": self.rebuilds,
+                "incremental_updates": self.incremental_updates,
+            }
+
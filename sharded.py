@@ -0,0 +1,219 @@
+"""
+Process-pool sharded lot scraping
+Each worker process owns its own CopartScraper (and browser); results stream back
+through a queue and are merged back into input order
+"""
+import os
+import sys
+import time
+import queue
+import multiprocessing
+
+
+class LiveLotTask:
+    """Scrape lots live - one CopartScraper and browser per worker process
+
+    `workers` is set by iter_lots_sharded; each worker's rate limiter takes a 1/workers
+    share of SCRAPER_RATE / SCRAPER_MAX_RATE / SCRAPER_BURST. With a `budget` (seconds,
+    counted from when the task is created) lots the workers reach after it ran out fail
+    with DeadlineExceeded.
+    """
+
+    workers = 1
+
+    def __init__(self, log_to_stderr=False, states=None, budget=None):
+        self.log_to_stderr = log_to_stderr
+        self.states = states
+        # Wall clock, since time.monotonic() values do not carry across processes
+        self.ends_at = None if budget is None else time.time() + budget
+
+    def open(self):
+        if self.log_to_stderr:
+            # Keep stdout clean for callers that stream results on it (cli.py)
+            sys.stdout = sys.stderr
+        from scraper import CopartScraper
+        from throttle import get_limiter
+        from deadline import Deadline
+        get_limiter().share(self.workers)
+        self.scraper = CopartScraper(states=self.states)
+        if self.ends_at is not None:
+            self.scraper.deadline = Deadline(max(0.0, self.ends_at - time.time()))
+        self.scraper.setup_browser()
+
+    def run(self, lot_number):
+        self.scraper.deadline.check(f"lot {lot_number}")
+        return self.scraper.scrape_copart_lot(lot_number)
+
+    def close(self):
+        self.scraper.close()
+
+
+class ReplayLotTask:
+    """Parse saved lot pages (<pages_dir>/<lot>.html) with no browser - used for benchmarks"""
+
+    def __init__(self, pages_dir, quiet=True):
+        self.pages_dir = pages_dir
+        self.quiet = quiet
+
+    def open(self):
+        if self.quiet:
+            sys.stdout = open(os.devnull, 'w')
+
+    def run(self, lot_number):
+        from scraper import parse_lot_page
+        with open(os.path.join(self.pages_dir, f"{lot_number}.html"), encoding='utf-8') as f:
+            page_source = f.read()
+        return parse_lot_page(lot_number, page_source)
+
+    def close(self):
+        if self.quiet:
+            sys.stdout.close()
+            sys.stdout = sys.__stdout__
+
+
+class ArchiveTask:
+    """Rerun the current extractors over archived pages (items are archive entry ids) - no browser"""
+
+    def __init__(self, directory=None, quiet=True):
+        self.directory = directory
+        self.quiet = quiet
+
+    def open(self):
+        if self.quiet:
+            sys.stdout = open(os.devnull, 'w')
+        from page_archive import PageArchive
+        self.archive = PageArchive(self.directory)
+
+    def run(self, entry_id):
+        from page_archive import reextract_entry
+        return reextract_entry(self.archive, self.archive.entry(entry_id))
+
+    def close(self):
+        if self.quiet:
+            sys.stdout.close()
+            sys.stdout = sys.__stdout__
+
+
+def _shard_worker(task, shard, results):
+    """Run one shard of (index, lot_number) pairs and stream each (index, lot, vehicle, ok) back"""
+    try:
+        task.open()
+    except Exception as e:
+        print(f"❌ Worker {os.getpid()} could not start: {e}")
+        for index, lot_number in shard:
+            results.put((index, lot_number, None, False))
+        results.put((None, None, None, None))
+        return
+
+    try:
+        for index, lot_number in shard:
+            try:
+                results.put((index, lot_number, task.run(lot_number), True))
+            except Exception as e:
+                print(f"  Error scraping lot {lot_number} in worker {os.getpid()}: {e}")
+                results.put((index, lot_number, None, False))
+    finally:
+        try:
+            task.close()
+        except Exception:
+            pass
+        results.put((None, None, None, None))
+
+
+def resolve_worker_count(workers=None):
+    """Worker count from the argument, SCRAPER_WORKERS, or the number of CPUs"""
+    if workers is None:
+        workers = int(os.environ.get('SCRAPER_WORKERS', 0)) or os.cpu_count() or 1
+    return max(1, int(workers))
+
+
+def iter_lots_sharded(lot_numbers, workers=None, task=None, failed=None):
+    """Scrape lots across a process pool, yielding (lot_number, vehicle) in input order
+
+    Lots are dealt round-robin so the in-order merge advances evenly. Lots that raised,
+    and those left unfinished by a worker that died (OOM, browser crash), are yielded
+    with vehicle=None and added to the `failed` set if one is given.
+    """
+    lots = list(lot_numbers)
+    if not lots:
+        return
+    workers = min(resolve_worker_count(workers), len(lots))
+    task = task or LiveLotTask()
+    task.workers = workers  # Pickled into every worker, e.g. to split the rate limit
+
+    indexed = list(enumerate(lots))
+    shards = [indexed[i::workers] for i in range(workers)]
+
+    # Playwright does not survive fork(), so every worker starts fresh
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    processes = [context.Process(target=_shard_worker, args=(task, shard, results), daemon=True)
+                 for shard in shards]
+    for process in processes:
+        process.start()
+
+    pending = {}
+    next_index = 0
+    finished = 0
+    try:
+        while next_index < len(lots) and finished < workers:
+            try:
+                index, lot_number, vehicle, ok = results.get(timeout=1)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes):
+                    break
+                continue
+
+            if index is None:
+                finished += 1
+                continue
+
+            if not ok and failed is not None:
+                failed.add(lot_number)
+            pending[index] = (lot_number, vehicle)
+            while next_index in pending:
+                yield pending.pop(next_index)
+                next_index += 1
+
+        # Pick up anything still buffered, then fill gaps left by crashed workers
+        while True:
+            try:
+                index, lot_number, vehicle, ok = results.get(timeout=0.1)
+            except queue.Empty:
+                break
+            if index is not None:
+                if not ok and failed is not None:
+                    failed.add(lot_number)
+                pending[index] = (lot_number, vehicle)
+        while next_index < len(lots):
+            if next_index not in pending and failed is not None:
+                failed.add(lots[next_index])
+            yield pending.pop(next_index, (lots[next_index], None))
+            next_index += 1
+    finally:
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+
+def scrape_lots_sharded(lot_numbers, limit=100, workers=None, task=None):
+    """Scrape lots across a process pool and return the vehicles that passed the filters, in order"""
+    lot_numbers = list(lot_numbers)[:limit]
+    workers = min(resolve_worker_count(workers), max(1, len(lot_numbers)))
+    print(f"Scraping {len(lot_numbers)} Copart lots across {workers} worker processes...")
+
+    vehicles = []
+    failed = set()
+    for i, (lot_number, vehicle) in enumerate(iter_lots_sharded(lot_numbers, workers=workers, task=task,
+                                                                failed=failed), 1):
+        if vehicle:
+            vehicles.append(vehicle)
+            print(f"  [{i}/{len(lot_numbers)}] ✓ {lot_number}: {vehicle.get('year')} - {vehicle.get('location')}")
+        elif lot_number in failed:
+            print(f"  [{i}/{len(lot_numbers)}] ✗ {lot_number}: Error")
+        else:
+            print(f"  [{i}/{len(lot_numbers)}] ✗ {lot_number}: Filtered")
+
+    print(f"\n✅ Successfully scraped {len(vehicles)} vehicles from Copart")
+    return vehicles
@@ -0,0 +1,111 @@
+"""
+Single-flight coalescing of lot fetches
+When several scrapers in one process (concurrent searches, overlapping refreshes) want the
+same lot at the same time, the first one fetches it and the rest wait for that result
+instead of loading the page again. Waiters get their own copy of the result.
+"""
+import copy
+import threading
+
+from deadline import DeadlineExceeded
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """In-flight calls keyed by lot number; `do` runs fn once per key at a time"""
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> _Call
+        self.fetches = 0  # calls that ran fn
+        self.coalesced = 0  # calls that shared another call's result
+        self.waiter_timeouts = 0
+        self.leader_timeouts_retried = 0  # waiters that fetched again after the leader's budget ran out
+
+    def do(self, key, fn, deadline=None):
+        """Return fn() - or the result of the same key's call already in flight
+
+        The leader's exception is raised in every waiter, except DeadlineExceeded: that was
+        the leader's budget, so a waiter with time left runs fn itself as the next leader.
+        A waiter whose deadline runs out before the leader finishes gets DeadlineExceeded.
+        """
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                if call is None:
+                    call = self._calls[key] = _Call()
+                    self.fetches += 1
+                    leader = True
+                else:
+                    call.waiters += 1
+                    self.coalesced += 1
+                    leader = False
+
+            if leader:
+                try:
+                    result = fn()
+                except BaseException as e:
+                    call.error = e
+                    raise
+                else:
+                    # Waiters copy this private copy, never the object the leader's caller mutates
+                    call.result = copy.deepcopy(result)
+                    return result
+                finally:
+                    with self._lock:
+                        del self._calls[key]
+                    call.done.set()
+
+            print(f"      🔗 Lot {key} is already being fetched ({self.name}) - waiting for that result")
+            if not call.done.wait(deadline.remaining() if deadline is not None else None):
+                with self._lock:
+                    self.waiter_timeouts += 1
+                raise DeadlineExceeded(f"Time budget used up waiting for lot {key} ({self.name})")
+            if isinstance(call.error, DeadlineExceeded) and (deadline is None or not deadline.expired()):
+                with self._lock:
+                    self.leader_timeouts_retried += 1
+                print(f"      🔁 Lot {key}: the fetch we waited on ran out of its time budget - fetching it ourselves")
+                continue
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+    def stats(self):
+        with self._lock:
+            calls = self.fetches + self.coalesced
+            return {
+                "fetches": self.fetches,
+                "coalesced": self.coalesced,
+                "coalesced_rate": round(self.coalesced / calls, 3) if calls else None,
+                "waiter_timeouts": self.waiter_timeouts,
+                "leader_timeouts_retried": self.leader_timeouts_retried,
+                "in_flight": len(self._calls),
+                "waiting": sum(call.waiters for call in self._calls.values()),
+            }
+
+
+_groups = {}
+_groups_lock = threading.Lock()
+
+
+def get_group(name):
+    """Return the process-wide single-flight group `name` (e.g. "lot", "lot-images")"""
+    with _groups_lock:
+        if name not in _groups:
+            _groups[name] = SingleFlight(name)
+        return _groups[name]
+
+
+def stats():
+    """Counters of every group"""
+    with _groups_lock:
+        groups = list(_groups.values())
+    return {group.name: group.stats() for group in groups}
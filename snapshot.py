@@ -0,0 +1,173 @@
+"""
+Versioned vehicle snapshot with a change log for delta sync
+Each publish bumps the version and records which lots were added, removed or updated
+"""
+import threading
+from collections import deque
+
+
+def vehicle_key(vehicle):
+    """Return the key a vehicle is tracked by (its lot number)"""
+    return str(vehicle.get("lot_number", "N/A"))
+
+
+# Scrape bookkeeping kept on each vehicle; a change to these alone is not an update
+BOOKKEEPING_FIELDS = ("refreshed_at",)
+
+
+def same_vehicle(old, new):
+    """True if two versions of a lot differ at most in their BOOKKEEPING_FIELDS"""
+    if old == new:
+        return True
+    strip = lambda vehicle: {k: v for k, v in vehicle.items() if k not in BOOKKEEPING_FIELDS}
+    return strip(old) == strip(new)
+
+
+def diff_vehicles(old_vehicles, new_vehicles):
+    """Return (added, removed, updated) lot keys between two {lot: vehicle} maps"""
+    added = [key for key in new_vehicles if key not in old_vehicles]
+    removed = [key for key in old_vehicles if key not in new_vehicles]
+    updated = [key for key in new_vehicles
+               if key in old_vehicles and not same_vehicle(old_vehicles[key], new_vehicles[key])]
+    return added, removed, updated
+
+
+class VehicleSnapshot:
+    """Current vehicle list plus a bounded log of per-version changes
+
+    With a `store` (see snapshot_store.SnapshotStore) the snapshot is persisted and
+    shared between processes; call sync() to pick up versions written elsewhere.
+    With a `history` (see bid_history.BidHistory) every publish also appends bid changes.
+    With `alerts` (see alerts.AlertEngine) every publish checks the changed lots against
+    the saved alert rules.
+    """
+
+    def __init__(self, max_changes=100, store=None, history=None, alerts=None):
+        self.version = 0
+        self.bookkeeping = 0  # store's bookkeeping generation (refreshed_at-only rewrites)
+        self.vehicles = {}  # lot_number -> vehicle, in scrape order
+        self.changes = deque(maxlen=max_changes)  # (version, added, removed, updated) lot keys
+        self.store = store
+        self.history = history
+        self.alerts = alerts
+        self.lock = threading.Lock()
+        self._derived = {}  # name -> (version, value) built from the vehicle list
+
+    def publish(self, vehicles):
+        """Replace the snapshot with a new vehicle list and log the diff
+
+        Returns the change entry, or None if nothing changed (version is not bumped).
+        A re-scrape that only moves `refreshed_at` keeps the new vehicles without a version.
+        """
+        new_vehicles = {}
+        for vehicle in vehicles:
+            key = vehicle_key(vehicle)
+            if key != "N/A":
+                new_vehicles[key] = vehicle
+
+        if self.history is not None:
+            try:
+                self.history.record(new_vehicles.values())
+            except Exception as e:
+                print(f"Warning: Could not record bid history: {e}")
+
+        if self.store is not None:
+            entry = self.store.write(new_vehicles, diff_vehicles)
+            if not self.sync() and entry is None:
+                with self.lock:
+                    self.vehicles = new_vehicles
+        else:
+            with self.lock:
+                added, removed, updated = diff_vehicles(self.vehicles, new_vehicles)
+                if not added and not removed and not updated and list(new_vehicles) == list(self.vehicles):
+                    self.vehicles = new_vehicles
+                    return None
+
+                self.version += 1
+                self.vehicles = new_vehicles
+                entry = (self.version, added, removed, updated)
+                self.changes.append(entry)
+
+        if entry and self.alerts is not None:
+            try:
+                self.alerts.evaluate(entry, new_vehicles)
+            except Exception as e:
+                print(f"Warning: Could not evaluate alerts: {e}")
+        return entry
+
+    def sync(self):
+        """Reload from the store if another process wrote a newer version, or rewrote
+        bookkeeping fields (refreshed_at) without one
+
+        Only a single meta lookup when nothing changed.
+        """
+        if self.store is None:
+            return False
+        version, bookkeeping = self.store.generation()
+        if version == self.version and bookkeeping == self.bookkeeping:
+            return False
+        version, vehicles, changes = self.store.load(self.changes.maxlen)
+        with self.lock:
+            self.version = version
+            self.bookkeeping = bookkeeping
+            self.vehicles = vehicles
+            self.changes.clear()
+            self.changes.extend(changes)
+        return True
+
+    def as_list(self):
+        """Return all vehicles in scrape order"""
+        with self.lock:
+            return list(self.vehicles.values())
+
+    def derived(self, name, build):
+        """Return `build(vehicles)` for the current version, building it at most once per version"""
+        with self.lock:
+            version = self.version
+            cached = self._derived.get(name)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            vehicles = list(self.vehicles.values())
+        value = build(vehicles)
+        with self.lock:
+            if self.version == version:
+                self._derived[name] = (version, value)
+        return value
+
+    def __len__(self):
+        return len(self.vehicles)
+
+    def changes_since(self, since):
+        """Return the net changes between version `since` and the current version
+
+        Returns None when `since` is unknown (too old, or from before a restart) -
+        the caller should then send the full list instead.
+        """
+        with self.lock:
+            if since == self.version:
+                return {"version": self.version, "added": [], "removed": [], "updated": []}
+            if since > self.version or not self.changes or since < self.changes[0][0] - 1:
+                return None
+
+            # For every lot touched after `since`, the first event tells us whether
+            # the client had it; whether it is in the current snapshot tells us
+            # whether it should have it now.
+            existed_before = {}
+            for version, added, removed, updated in self.changes:
+                if version <= since:
+                    continue
+                for key in added:
+                    existed_before.setdefault(key, False)
+                for key in removed:
+                    existed_before.setdefault(key, True)
+                for key in updated:
+                    existed_before.setdefault(key, True)
+
+            result = {"version": self.version, "added": [], "removed": [], "updated": []}
+            for key, existed in existed_before.items():
+                vehicle = self.vehicles.get(key)
+                if vehicle is not None:
+                    result["updated" if existed else "added"].append(vehicle)
+                elif existed:
+                    result["removed"].append(key)
+            return result
@@ -0,0 +1,154 @@
+"""
+Durable SQLite snapshot store shared by every web worker and scraper process
+Writes happen in one transaction, so readers see either the old or the new snapshot
+"""
+import os
+import json
+import sqlite3
+import threading
+
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'snapshot.db')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS vehicles (
+    lot_number TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS vehicles_position ON vehicles (position);
+CREATE TABLE IF NOT EXISTS changes (
+    version INTEGER PRIMARY KEY,
+    added TEXT NOT NULL,
+    removed TEXT NOT NULL,
+    updated TEXT NOT NULL
+);
+"""
+
+
+class SnapshotStore:
+    """Versioned vehicle snapshot persisted in SQLite"""
+
+    def __init__(self, path=None, keep_changes=1000):
+        self.path = path or os.environ.get('SNAPSHOT_DB', DEFAULT_PATH)
+        self.keep_changes = keep_changes
+        self._local = threading.local()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connection(self):
+        """Return this thread's connection (reopened after a fork, e.g. gunicorn --preload)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def version(self):
+        """Return the current snapshot version (0 if nothing was ever written)"""
+        row = self._connection().execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        return row[0] if row else 0
+
+    def generation(self):
+        """Return (version, bookkeeping generation) in one lookup
+
+        The bookkeeping generation moves when a write only rewrote bookkeeping fields
+        (refreshed_at), which does not make a new version.
+        """
+        rows = dict(self._connection().execute("SELECT key, value FROM meta WHERE key IN ('version', 'bookkeeping')"))
+        return rows.get('version', 0), rows.get('bookkeeping', 0)
+
+    def load(self, max_changes=100):
+        """Return (version, {lot: vehicle} in scrape order, [(version, added, removed, updated)])"""
+        conn = self._connection()
+        conn.execute('BEGIN')
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            version = row[0] if row else 0
+            vehicles = {lot: json.loads(data) for lot, data in
+                        conn.execute('SELECT lot_number, data FROM vehicles ORDER BY position')}
+            changes = [(v, json.loads(added), json.loads(removed), json.loads(updated))
+                       for v, added, removed, updated in
+                       conn.execute('SELECT version, added, removed, updated FROM changes '
+                                    'ORDER BY version DESC LIMIT ?', (max_changes,))]
+        finally:
+            conn.execute('COMMIT')
+        changes.reverse()
+        return version, vehicles, changes
+
+    def iter_vehicles(self, batch=1000):
+        """Return (version, iterator over the stored vehicles in scrape order)
+
+        Reads on its own connection inside one transaction, so the rows match `version`
+        even if a new snapshot is written meanwhile; only `batch` rows are held at a time.
+        The connection is closed when the iterator is exhausted or closed.
+        """
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute('BEGIN')
+        row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+
+        def rows():
+            try:
+                cursor = conn.execute('SELECT data FROM vehicles ORDER BY position')
+                while True:
+                    chunk = cursor.fetchmany(batch)
+                    if not chunk:
+                        return
+                    for (data,) in chunk:
+                        yield json.loads(data)
+            finally:
+                conn.close()
+        return (row[0] if row else 0), rows()
+
+    def write(self, new_vehicles, diff):
+        """Atomically replace the stored snapshot with `new_vehicles` ({lot: vehicle})
+
+        `diff(old_vehicles, new_vehicles)` returns (added, removed, updated) keys; it
+        runs inside the write transaction against what is actually stored, so
+        concurrent writers from other processes never lose a change.
+        Returns the new change entry, or None if nothing changed. Lots whose bookkeeping
+        fields (refreshed_at) moved are still rewritten then, bumping the bookkeeping
+        generation instead of the version so other processes reload them.
+        """
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            version = row[0] if row else 0
+            old_vehicles = {lot: json.loads(data) for lot, data in
+                            conn.execute('SELECT lot_number, data FROM vehicles ORDER BY position')}
+            added, removed, updated = diff(old_vehicles, new_vehicles)
+            if not added and not removed and not updated and list(old_vehicles) == list(new_vehicles):
+                rewritten = [(json.dumps(vehicle), lot) for lot, vehicle in new_vehicles.items()
+                             if vehicle != old_vehicles[lot]]
+                if rewritten:
+                    conn.executemany('UPDATE vehicles SET data = ? WHERE lot_number = ?', rewritten)
+                    conn.execute("INSERT INTO meta (key, value) VALUES ('bookkeeping', 1) "
+                                 "ON CONFLICT(key) DO UPDATE SET value = value + 1")
+                conn.execute('COMMIT')
+                return None
+
+            version += 1
+            conn.execute('DELETE FROM vehicles')
+            conn.executemany('INSERT INTO vehicles (lot_number, position, data) VALUES (?, ?, ?)',
+                             ((lot, position, json.dumps(vehicle))
+                              for position, (lot, vehicle) in enumerate(new_vehicles.items())))
+            conn.execute('INSERT INTO changes (version, added, removed, updated) VALUES (?, ?, ?, ?)',
+                         (version, json.dumps(added), json.dumps(removed), json.dumps(updated)))
+            conn.execute('DELETE FROM changes WHERE version <= ?', (version - self.keep_changes,))
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (version,))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return (version, added, removed, updated)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Checks the gazetteer against lot page texts, page sources and URL slugs with known places"""
+from gazetteer import resolve, resolve_page, resolve_slug
+
+
+# Page texts with a known (state, lane, sale doc): labels and values on separate lines,
+# yards, bare codes, and states outside MD/DC/NJ/NY. benchmark.py locations reports them too.
+LOCATION_CASES = [
+    ("Location\nTrenton, NJ", ("NJ", None, None)),
+    ("Sale Doc\nTrenton, NJ\nOdometer\n12,345 mi", ("NJ", None, "NJ")),
+    ("Location Trenton, NJ\nSale doc: MD - BALTIMORE", ("NJ", None, "MD")),
+    ("Location:\nCherry Hill, New Jersey\nLocation / Lane\nNJ - GLASSBORO EAST / A-12", ("NJ", "NJ", None)),
+    ("Sale Document\n\nDC - WASHINGTON DC", ("DC", None, "DC")),
+    ("Location: Altoona, PA\nSale doc: PA - SALVAGE", ("PA", None, "PA")),
+    ("Sign In OR Register\nYard: IN - INDIANAPOLIS", ("IN", None, None)),
+    ("Copart offices in New York and Maryland\nLocation: Sacramento, CA", ("CA", None, None)),
+]
+
+# (href, (state, yard)) - lot URLs name the yard at the end of the slug
+SLUG_CASES = [
+    ("https://www.copart.com/lot/71234567/salvage-2021-toyota-corolla-le-nj-trenton", ("NJ", "NJ - TRENTON")),
+    ("/lot/71234567/clean-title-2020-toyota-corolla-md-baltimore-east/", ("MD", "MD - BALTIMORE EAST")),
+    ("/lot/71234567/salvage-2021-toyota-corolla", (None, None)),
+]
+
+# (body text, page source, expected fields) - the page source fills what the text missed
+PAGE_CASES = [
+    ("Odometer 12,345", '<div data-yard="NJ - SOMERVILLE"></div>',
+     {"state": "NJ", "yard": "NJ - SOMERVILLE", "sale_doc_state": None}),
+    ("Location\nTrenton, NJ", '<script>{"saleDoc": "MD - BALTIMORE"}</script>',
+     {"state": "NJ", "location": "Trenton, NJ", "sale_doc_state": "MD"}),
+    ("Location\nTrenton, NJ\nSale doc\nNJ", '<span>Sale Doc:</span> <span>NY - SYRACUSE</span>',
+     {"state": "NJ", "sale_doc_state": "NJ"}),
+]
+
+
+def check_location_cases():
+    """Return the LOCATION_CASES the gazetteer gets wrong, as (text, expected, got)"""
+    wrong = []
+    for text, expected in LOCATION_CASES:
+        places = resolve(text)
+        got = (places["state"], places["lane_state"], places["sale_doc_state"])
+        if got != expected:
+            wrong.append((text, expected, got))
+    return wrong
+
+
+def test_location_cases():
+    assert check_location_cases() == []
+
+
+def test_resolve_slug():
+    for href, expected in SLUG_CASES:
+        assert resolve_slug(href) == expected, href
+
+
+def test_resolve_page():
+    for body_text, page_source, expected in PAGE_CASES:
+        found = resolve_page(body_text, page_source)
+        assert {field: found[field] for field in expected} == expected, (body_text, page_source, found)
+
+
+if __name__ == '__main__':
+    test_location_cases()
+    test_resolve_slug()
+    test_resolve_page()
+    print("✅ Gazetteer checks passed")
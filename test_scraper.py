@@ -1,18 +1,14 @@
 #!/usr/bin/env python3
 """Test script to see what Copart actually returns"""
-from scraper import CopartScraper
+from scraper import CopartScraper, COROLLA_SEARCH_URL
 import json
 
 print("Testing Copart scraper...")
 scraper = CopartScraper()
 
 try:
-    vehicles = scraper.search_copart(
-        make="Toyota",
-        model="Corolla",
-        years=[2017, 2018, 2019, 2020],
-        locations=["MD", "NJ", "DC"],
-        limit=5  # Just get 5 for testing
+    vehicles = scraper.extract_vehicles_from_search_results(
+        searches=[("MD/DC/NJ", COROLLA_SEARCH_URL, 5)]  # Just get 5 for testing
     )
     
     print(f"\nFound {len(vehicles)} vehicles")
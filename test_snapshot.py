@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Checks that re-publishing an unchanged scrape is not logged as a change"""
+import os
+import tempfile
+
+from snapshot import VehicleSnapshot
+from snapshot_store import SnapshotStore
+from vehicle_fields import stamp_scrape_times
+
+
+def scrape(now):
+    vehicles = [
+        {"lot_number": "71234567", "location_state": "NJ", "current_bid": "$1,200", "auction_countdown": "2D 3H 10min"},
+        {"lot_number": "71234568", "location_state": "MD", "current_bid": "$900", "auction_countdown": "N/A"},
+    ]
+    for vehicle in vehicles:
+        stamp_scrape_times(vehicle, now)
+    return vehicles
+
+
+def check_republish(snapshot):
+    first = snapshot.publish(scrape(1_800_000_000))
+    assert first is not None, "first publish should add the lots"
+    assert snapshot.publish(scrape(1_800_000_005)) is None, "identical re-scrape was logged as a change"
+    assert snapshot.as_list()[0]["refreshed_at"].endswith(":05Z"), "refreshed_at of the re-scrape was not kept"
+
+    changed = scrape(1_800_000_010)
+    changed[1]["current_bid"] = "$950"
+    entry = snapshot.publish(changed)
+    assert entry is not None and entry[3] == ["71234568"], f"expected only the re-bid lot to update, got {entry}"
+
+
+def test_republish_in_memory():
+    check_republish(VehicleSnapshot())
+
+
+def test_republish_with_store():
+    with tempfile.TemporaryDirectory() as directory:
+        store = SnapshotStore(os.path.join(directory, "snapshot.db"))
+        other = VehicleSnapshot(store=store)
+        check_republish(VehicleSnapshot(store=store))
+        assert other.sync(), "a second process should load the stored snapshot"
+        assert other.as_list()[0]["refreshed_at"].endswith(":10Z")
+
+
+def test_refreshed_at_reaches_other_processes():
+    with tempfile.TemporaryDirectory() as directory:
+        store = SnapshotStore(os.path.join(directory, "snapshot.db"))
+        writer, reader = VehicleSnapshot(store=store), VehicleSnapshot(store=store)
+        writer.publish(scrape(1_800_000_000))
+        reader.sync()
+        assert writer.publish(scrape(1_800_000_005)) is None
+        assert reader.sync(), "a refreshed_at-only rewrite should make other processes reload"
+        assert reader.version == writer.version
+        assert reader.as_list()[0]["refreshed_at"].endswith(":05Z")
+        assert not reader.sync()
+
+
+if __name__ == '__main__':
+    test_republish_in_memory()
+    test_republish_with_store()
+    test_refreshed_at_reaches_other_processes()
+    print("✅ Snapshot checks passed")
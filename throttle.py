@@ -0,0 +1,189 @@
+"""
+Adaptive rate limiting and block-page detection for Copart navigation
+One token bucket is shared by every page in the process (sharded worker processes each
+take a slice of it). It backs off when Copart serves a block/CAPTCHA page (or HTTP 403/429)
+and ramps back up while requests succeed.
+"""
+import os
+import re
+import time
+import threading
+
+
+class BlockedError(Exception):
+    """Raised when a navigation lands on a block / CAPTCHA interstitial"""
+
+    def __init__(self, reason, url=None):
+        super().__init__(f"Blocked by Copart ({reason})" + (f": {url}" if url else ""))
+        self.reason = reason
+        self.url = url
+
+
+# Block markers - one pass over the page head. Only the interstitial's incident ID counts
+# on any page: Copart pages behind Imperva load an _Incapsula_Resource script themselves,
+# and mention CAPTCHAs in scripts, so every other marker only counts on a small page.
+_BLOCK_PATTERN = re.compile(
+    r'(?P<incapsula>Incapsula incident ID)'
+    r'|(?P<incapsula_script>_Incapsula_Resource|incapsula\.com/)'
+    r'|(?P<captcha>g-recaptcha|h-captcha|hcaptcha\.com|captcha-delivery\.com|geo\.captcha|'
+    r'Please verify you are a human|Press (?:&amp;|&) Hold)'
+    r'|(?P<denied>Access Denied</title>|Request unsuccessful|Pardon Our Interruption|'
+    r'You have been blocked|Too Many Requests)',
+    re.IGNORECASE
+)
+
+# Real Copart pages are large Angular apps; interstitials are tiny
+_BLOCK_PAGE_MAX_SIZE = 30000
+
+
+def detect_block(status=None, html=None, size=None):
+    """Return a block reason ("http-429", "incapsula", "captcha", ...) or None
+
+    Only the head of the document is scanned. An Incapsula incident ID is a block on
+    any page; the other markers only count on small pages, so a normal lot page that
+    loads Imperva's script or mentions "captcha" is not a block.
+    `size` is the full page length when `html` is just its head.
+    """
+    if status in (403, 429):
+        return f"http-{status}"
+    if not html:
+        return None
+    small = (size if size is not None else len(html)) < _BLOCK_PAGE_MAX_SIZE
+    for match in _BLOCK_PATTERN.finditer(html, 0, _BLOCK_PAGE_MAX_SIZE):
+        if match.lastgroup == 'incapsula':
+            return 'incapsula'
+        if small:
+            return 'incapsula' if match.lastgroup == 'incapsula_script' else match.lastgroup
+    return None
+
+
+class AdaptiveRateLimiter:
+    """Token bucket whose rate adapts to Copart's tolerance (AIMD)
+
+    Each success adds `increase` requests/s up to `max_rate`; each block multiplies
+    the rate by `backoff` (down to `min_rate`) and pauses everyone for `cooldown` seconds.
+    """
+
+    def __init__(self, rate=1.0, burst=3, min_rate=0.05, max_rate=5.0,
+                 increase=0.05, backoff=0.5, cooldown=20.0):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.backoff = backoff
+        self.cooldown = cooldown
+
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+        # Counters
+        self.requests = 0
+        self.successes = 0
+        self.blocks = 0
+        self.blocks_by_reason = {}
+        self.throttled_seconds = 0.0
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, deadline=None):
+        """Wait for a token; returns the seconds spent waiting
+
+        With a `deadline` (time.monotonic() value), gives up and returns early once it
+        passes - the caller's own timeout handling takes over from there.
+        """
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    self.requests += 1
+                    self.throttled_seconds += waited
+                    return waited
+                if now < self.paused_until:
+                    delay = self.paused_until - now
+                else:
+                    delay = (1 - self.tokens) / self.rate
+            if deadline is not None:
+                delay = min(delay, deadline - time.monotonic())
+                if delay <= 0:
+                    with self.lock:
+                        self.throttled_seconds += waited
+                    return waited
+            time.sleep(delay)
+            waited += delay
+
+    def try_acquire(self):
+        """Take a token only if one is free right now (for optional requests like hedges)"""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self.paused_until or self.tokens < 1:
+                return False
+            self.tokens -= 1
+            self.requests += 1
+            return True
+
+    def share(self, workers):
+        """Scale the bucket down to a 1/workers slice, for one of `workers` processes that
+        each have their own bucket, so together they keep to the configured rates"""
+        if workers <= 1:
+            return
+        with self.lock:
+            self.rate /= workers
+            self.min_rate /= workers
+            self.max_rate /= workers
+            self.increase /= workers
+            self.burst = max(1, round(self.burst / workers))
+            self.tokens = min(self.tokens, self.burst)
+
+    def on_success(self):
+        """Ramp the rate back up after a clean response"""
+        with self.lock:
+            self.successes += 1
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_block(self, reason):
+        """Back off hard after a block page or 403/429"""
+        with self.lock:
+            self.blocks += 1
+            self.blocks_by_reason[reason] = self.blocks_by_reason.get(reason, 0) + 1
+            self.rate = max(self.min_rate, self.rate * self.backoff)
+            self.tokens = 0.0
+            self.paused_until = max(self.paused_until, time.monotonic() + self.cooldown)
+        print(f"🛑 Block detected ({reason}) - slowing down to {self.rate:.2f} req/s, pausing {self.cooldown:.0f}s")
+
+    def stats(self):
+        with self.lock:
+            return {
+                "rate": round(self.rate, 3),
+                "requests": self.requests,
+                "successes": self.successes,
+                "blocks": self.blocks,
+                "blocks_by_reason": dict(self.blocks_by_reason),
+                "throttled_seconds": round(self.throttled_seconds, 2),
+                "paused_for": round(max(0.0, self.paused_until - time.monotonic()), 2),
+            }
+
+
+_shared_limiter = None
+_shared_lock = threading.Lock()
+
+
+def get_limiter():
+    """Return the process-wide limiter (configured from SCRAPER_RATE / SCRAPER_MAX_RATE / SCRAPER_BURST)"""
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = AdaptiveRateLimiter(
+                rate=float(os.environ.get('SCRAPER_RATE', 1.0)),
+                max_rate=float(os.environ.get('SCRAPER_MAX_RATE', 5.0)),
+                burst=int(os.environ.get('SCRAPER_BURST', 3)),
+            )
+        return _shared_limiter
@@ -0,0 +1,208 @@
+"""
+Normalizers for scraped vehicle fields
+The scraper stores display strings ("$1,234", "2d 3h 15min", "N/A"); these turn them into numbers
+"""
+import re
+import time
+from datetime import datetime, timedelta, timezone
+
+
+def parse_int(value):
+    """Parse an integer out of a display string like "$1,234" or "45,120 mi" (None if missing)"""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    digits = re.sub(r'[^\d]', '', str(value))
+    if not digits:
+        return None
+    return int(digits)
+
+
+def parse_money(value):
+    """Parse a bid like "$1,234" into whole dollars"""
+    return parse_int(value)
+
+
+def parse_odometer(value):
+    """Parse an odometer reading like "45,120" into miles"""
+    return parse_int(value)
+
+
+def parse_year(value):
+    """Parse a model year, ignoring anything that isn't a plausible year"""
+    year = parse_int(value)
+    if year is None or not 1900 <= year <= 2100:
+        return None
+    return year
+
+
+_COUNTDOWN_PARTS = re.compile(r'(\d+)\s*(d|day|days|h|hr|hrs|hour|hours|m|min|mins|minute|minutes|s|sec|secs|seconds?)\b', re.IGNORECASE)
+_CLOCK = re.compile(r'^\s*(\d{1,3}):(\d{2})(?::(\d{2}))?\s*$')
+
+
+def parse_countdown(value):
+    """Parse an auction countdown ("2d 3h 15min" or "03:15:00") into seconds"""
+    if not value or value == "N/A":
+        return None
+    text = str(value)
+
+    clock = _CLOCK.match(text)
+    if clock:
+        hours, minutes, seconds = clock.groups()
+        return int(hours) * 3600 + int(minutes) * 60 + int(seconds or 0)
+
+    total = 0
+    found = False
+    for amount, unit in _COUNTDOWN_PARTS.findall(text):
+        unit = unit.lower()
+        if unit.startswith('d'):
+            total += int(amount) * 86400
+        elif unit.startswith('h'):
+            total += int(amount) * 3600
+        elif unit.startswith('m'):
+            total += int(amount) * 60
+        else:
+            total += int(amount)
+        found = True
+    return total if found else None
+
+
+def parse_timestamp(value):
+    """Parse an ISO-8601 UTC timestamp (or epoch seconds) into epoch seconds"""
+    if value is None or value == "N/A":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+# Copart prints sale times in the yard's local time, e.g. "Tue. Oct 21, 10:00 AM EDT"
+_SALE_DATE = re.compile(
+    r'(?P<month>Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.?\s+(?P<day>\d{1,2}),?\s*(?P<year>\d{4})?'
+    r'|(?P<m>\d{1,2})/(?P<d>\d{1,2})/(?P<y>\d{4})',
+    re.IGNORECASE
+)
+_SALE_CLOCK = re.compile(r'(\d{1,2}):(\d{2})\s*(AM|PM)?\s*(?P<zone>[ECMP][SD]T)?', re.IGNORECASE)
+_MONTHS = {name: number for number, name in enumerate(
+    ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], 1)}
+_ZONE_OFFSETS = {'EST': -5, 'EDT': -4, 'CST': -6, 'CDT': -5, 'MST': -7, 'MDT': -6, 'PST': -8, 'PDT': -7}
+
+
+def parse_sale_info(value, now=None):
+    """Parse a sale date like "Tue. Oct 21, 10:00 AM EDT" or "10/21/2026 10:00 am" into epoch seconds
+
+    Without a zone the time is taken as US Eastern (EDT); without a year, the next
+    occurrence of that date is assumed.
+    """
+    if not value or value == "N/A":
+        return None
+    text = str(value)
+    date = _SALE_DATE.search(text)
+    if not date:
+        return None
+    now = now if now is not None else time.time()
+    if date.group('month'):
+        month = _MONTHS[date.group('month')[:3].lower()]
+        day = int(date.group('day'))
+        year = int(date.group('year')) if date.group('year') else None
+    else:
+        month, day, year = int(date.group('m')), int(date.group('d')), int(date.group('y'))
+
+    hour = minute = 0
+    offset = _ZONE_OFFSETS['EDT']
+    clock = _SALE_CLOCK.search(text, date.end())
+    if clock:
+        hour, minute = int(clock.group(1)), int(clock.group(2))
+        meridiem = (clock.group(3) or '').upper()
+        if meridiem == 'PM' and hour < 12:
+            hour += 12
+        elif meridiem == 'AM' and hour == 12:
+            hour = 0
+        if clock.group('zone'):
+            offset = _ZONE_OFFSETS[clock.group('zone').upper()]
+
+    zone = timezone(timedelta(hours=offset))
+    try:
+        if year is None:
+            year = datetime.fromtimestamp(now, zone).year
+            sale = datetime(year, month, day, hour, minute, tzinfo=zone)
+            # A date more than a month in the past belongs to next year ("Jan 3" seen in December)
+            if sale.timestamp() < now - 30 * 86400:
+                sale = sale.replace(year=year + 1)
+        else:
+            sale = datetime(year, month, day, hour, minute, tzinfo=zone)
+    except ValueError:
+        return None
+    return sale.timestamp()
+
+
+def format_utc(timestamp):
+    """Format epoch seconds as an ISO-8601 UTC string ("2026-10-21T14:00:00Z")"""
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def format_sale_info(timestamp):
+    """Format epoch seconds the way lot pages show a sale date ("Tue. Oct 21, 2026 10:00 AM EDT")
+
+    Uses US Eastern time, which parse_sale_info assumes for zoneless dates.
+    """
+    try:
+        from zoneinfo import ZoneInfo
+        sale = datetime.fromtimestamp(timestamp, ZoneInfo('America/New_York'))
+    except Exception:  # No tz database - Copart's zone would only be a guess
+        sale = datetime.fromtimestamp(timestamp, timezone(timedelta(hours=_ZONE_OFFSETS['EDT'])))
+        return sale.strftime('%a. %b %d, %Y %I:%M %p EDT')
+    return sale.strftime('%a. %b %d, %Y %I:%M %p ') + sale.tzname()
+
+
+def stamp_scrape_times(vehicle, now=None):
+    """Set `refreshed_at` and `sale_time_utc` on a freshly scraped vehicle
+
+    The sale time comes from the countdown, or the sale info when there is none.
+    The countdown is relative to the scrape, so it is rounded to the minute (its
+    resolution). `refreshed_at` is bookkeeping - snapshot.diff_vehicles ignores it.
+    Returns the sale timestamp, or None if neither field could be parsed.
+    """
+    now = now if now is not None else time.time()
+    vehicle["refreshed_at"] = format_utc(now)
+    seconds = parse_countdown(vehicle.get("auction_countdown"))
+    if seconds is not None:
+        sale_time = round((now + seconds) / 60) * 60
+    else:
+        sale_time = parse_sale_info(vehicle.get("sale_info"), now)
+    if sale_time is None:
+        return None
+    vehicle["sale_time_utc"] = format_utc(sale_time)
+    return sale_time
+
+
+def sale_timestamp(vehicle, now=None):
+    """Return the sale time of a vehicle as epoch seconds
+
+    Uses `sale_time_utc` when the scraper recorded one, otherwise the countdown
+    relative to `now`.
+    """
+    sale_time = parse_timestamp(vehicle.get("sale_time_utc"))
+    if sale_time is not None:
+        return sale_time
+    seconds = parse_countdown(vehicle.get("auction_countdown"))
+    if seconds is None:
+        return None
+    return (now if now is not None else time.time()) + seconds
+
+
+def normalize_label(value):
+    """Normalize a categorical field (state, damage, title) for exact matching"""
+    if value is None:
+        return None
+    text = re.sub(r'\s+', ' ', str(value)).strip().upper()
+    if not text or text == "N/A":
+        return None
+    return text
@@ -0,0 +1,176 @@
+"""
+In-memory indexes over a vehicle snapshot for the /api/vehicles query endpoint
+Built once per snapshot version; queries never scan the whole vehicle list
+"""
+import time
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+from vehicle_fields import (
+    parse_money, parse_odometer, parse_year, sale_timestamp, normalize_label
+)
+
+
+# Numeric fields kept as sorted arrays (range filters and sorting)
+SORTED_FIELDS = {
+    "odometer": lambda vehicle, now: parse_odometer(vehicle.get("odometer")),
+    "bid": lambda vehicle, now: parse_money(vehicle.get("current_bid")),
+    "year": lambda vehicle, now: parse_year(vehicle.get("year")),
+    "sale_time": lambda vehicle, now: sale_timestamp(vehicle, now),
+}
+
+# Categorical fields kept as hash indexes (exact match filters)
+HASH_FIELDS = {
+    "state": lambda vehicle: normalize_label(vehicle.get("location_state")),
+    "damage": lambda vehicle: normalize_label(vehicle.get("damage")),
+    "title": lambda vehicle: normalize_label(vehicle.get("title")),
+}
+
+
+def vehicle_filter(equals=None, ranges=None):
+    """Return predicate(vehicle, now) for the same filters as VehicleIndex.query
+
+    For checking vehicles one at a time (streams, alert rules) instead of through an index.
+    """
+    equals = {field: {normalize_label(value) for value in values}
+              for field, values in (equals or {}).items() if values}
+    ranges = [(field, low, high) for field, (low, high) in (ranges or {}).items()
+              if low is not None or high is not None]
+    for field in equals:
+        if field not in HASH_FIELDS:
+            raise ValueError(f"Cannot filter on '{field}'")
+    for field, _, _ in ranges:
+        if field not in SORTED_FIELDS:
+            raise ValueError(f"Cannot range-filter on '{field}'")
+
+    def matches(vehicle, now):
+        for field, accepted in equals.items():
+            if HASH_FIELDS[field](vehicle) not in accepted:
+                return False
+        for field, low, high in ranges:
+            value = SORTED_FIELDS[field](vehicle, now)
+            if value is None or value != value:  # missing (None or NaN)
+                return False
+            if (low is not None and value < low) or (high is not None and value > high):
+                return False
+        return True
+    return matches
+
+
+class VehicleIndex:
+    """Sorted and hash indexes over one snapshot of vehicles"""
+
+    def __init__(self, vehicles):
+        now = time.time()
+        self.vehicles = list(vehicles)
+        self.sorted_keys = {}  # field -> sorted values (missing values excluded)
+        self.sorted_positions = {}  # field -> vehicle positions in the same order
+        self.missing = {}  # field -> positions with no value, in scrape order
+        self.ranks = {}  # field -> rank of each position in ascending order, missing last
+        self.hashes = {}  # field -> {normalized value: sorted positions}
+
+        for field, extract in SORTED_FIELDS.items():
+            column = np.array([extract(vehicle, now) for vehicle in self.vehicles], dtype=float)
+            present = np.flatnonzero(~np.isnan(column))
+            order = present[np.argsort(column[present], kind="stable")]
+            missing = np.flatnonzero(np.isnan(column))
+            rank = np.empty(len(self.vehicles), dtype=np.int64)
+            rank[np.concatenate([order, missing])] = np.arange(len(self.vehicles))
+            self.sorted_positions[field] = order
+            self.sorted_keys[field] = column[order].tolist()
+            self.missing[field] = missing
+            self.ranks[field] = rank
+
+        for field, extract in HASH_FIELDS.items():
+            buckets = {}
+            for pos, vehicle in enumerate(self.vehicles):
+                value = extract(vehicle)
+                if value is not None:
+                    buckets.setdefault(value, []).append(pos)
+            self.hashes[field] = {value: np.array(positions, dtype=np.int64)
+                                  for value, positions in buckets.items()}
+
+    def __len__(self):
+        return len(self.vehicles)
+
+    def _range_positions(self, field, low, high):
+        """Return the positions with low <= value <= high (a slice of the sorted array)"""
+        keys = self.sorted_keys[field]
+        start = bisect_left(keys, low) if low is not None else 0
+        end = bisect_right(keys, high) if high is not None else len(keys)
+        return self.sorted_positions[field][start:max(start, end)]
+
+    def _sort_order(self, field, descending):
+        """Return all positions ordered by `field`, missing values last"""
+        order = self.sorted_positions[field]
+        if descending:
+            order = order[::-1]
+        return np.concatenate([order, self.missing[field]])
+
+    def query(self, equals=None, ranges=None, sort=None, descending=False, offset=0, limit=50):
+        """Filter, sort and paginate the snapshot
+
+        equals: {hash field: [accepted values]}
+        ranges: {sorted field: (low, high)} - either bound may be None
+        Returns (total matches, list of vehicles for the requested page).
+        """
+        equals = {field: values for field, values in (equals or {}).items() if values}
+        ranges = {field: bounds for field, bounds in (ranges or {}).items()
+                  if bounds[0] is not None or bounds[1] is not None}
+
+        for field in equals:
+            if field not in HASH_FIELDS:
+                raise ValueError(f"Cannot filter on '{field}'")
+        for field in ranges:
+            if field not in SORTED_FIELDS:
+                raise ValueError(f"Cannot range-filter on '{field}'")
+        if sort is not None and sort not in SORTED_FIELDS:
+            raise ValueError(f"Cannot sort by '{sort}'")
+
+        # Each constraint resolves to a list of positions straight from an index
+        selections = []
+        for field, values in equals.items():
+            buckets = self.hashes[field]
+            accepted = {normalize_label(value) for value in values}
+            selections.append(np.concatenate([buckets[value] for value in accepted if value in buckets]
+                                             or [np.empty(0, dtype=np.int64)]))
+        for field, (low, high) in ranges.items():
+            selections.append(self._range_positions(field, low, high))
+
+        if not selections:
+            total = len(self.vehicles)
+            if sort is None:
+                positions = range(offset, min(total, offset + limit))
+            else:
+                positions = self._sort_order(sort, descending)[offset:offset + limit]
+            return total, [self.vehicles[pos] for pos in positions]
+
+        # Intersect as bitmaps, starting from the most selective index
+        selections.sort(key=len)
+        mask = np.zeros(len(self.vehicles), dtype=bool)
+        mask[selections[0]] = True
+        for selection in selections[1:]:
+            if not mask.any():
+                break
+            hits = np.zeros(len(self.vehicles), dtype=bool)
+            hits[selection] = True
+            mask &= hits
+
+        candidates = np.flatnonzero(mask)
+        total = len(candidates)
+        if sort is None:
+            positions = candidates[offset:offset + limit]
+        elif total * 16 < len(self.vehicles):
+            # Few matches: order them by their precomputed rank
+            rank = self.ranks[sort][candidates]
+            if descending:
+                present = len(self.sorted_positions[sort])
+                rank = np.where(rank < present, present - 1 - rank, rank)
+            positions = candidates[np.argsort(rank, kind="stable")][offset:offset + limit]
+        else:
+            # Many matches: walk the presorted array and keep the hits
+            order = self._sort_order(sort, descending)
+            positions = order[mask[order]][offset:offset + limit]
+
+        return total, [self.vehicles[pos] for pos in positions]